@@ -1,14 +1,13 @@
 import os
 import json
-from typing import Dict, List
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
-from langchain.chat_models.base import BaseChatModel
+from typing import Dict, List, Union
 from langchain.schema import BaseOutputParser
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers.openai_tools import JsonOutputKeyToolsParser
 from langchain.output_parsers import ResponseSchema, StructuredOutputParser
+from fraud_research_agent.utils.llm_governor import get_llm_governor, governed_invoke
+from fraud_research_agent.utils.prompt_compaction import compact_paper, finalize_prompt
 from fraud_research_agent.prompts import (
     query_prompt,
     classify_prompt,
@@ -63,92 +62,82 @@ def run_generate_queries_chain(user_topic: str, llm) -> List[str]:
     parser = QueriesListParser()
     querry_chain = chat_prompt | llm | parser
 
-    queries = querry_chain.invoke({"topic": user_topic})
+    queries = get_llm_governor().call(querry_chain.invoke, {"topic": user_topic})
     return queries
 
 
-def run_category_extraction_chain(query, llm, paper: Dict) -> Dict:
+# 单篇论文结构化提取的字段定义
+EXTRACTION_RESPONSE_SCHEMAS = [
+    ResponseSchema(
+        name="data_source_type",
+        description="Data source category (industry or platform type of the data used, e.g., e-commerce, payment, banking). Infer if not explicitly mentioned. Output as a list."
+    ),
+    ResponseSchema(
+        name="data_source_name",
+        description="Specific data source name (e.g., Taobao, eBay, Binance). Output as a list."
+    ),
+    ResponseSchema(
+        name="fraud_type",
+        description="Specific fraud or risk scenario addressed (e.g., 'credit card fraud', 'fake account registration'). If non-fraud, specify the problem scenario. Output as a string."
+    ),
+    ResponseSchema(
+        name="technical_approach_category",
+        description="Broad technical categories used in the paper (e.g., feature engineering, RNN/LSTM, Transformer, GNN, anomaly detection, GAN, multimodal fusion, explainable AI). Include any other relevant approaches. Output as a list."
+    ),
+    ResponseSchema(
+        name="technical_approach_method",
+        description="Specific technical methods used (e.g., 'Bi-LSTM', 'Temporal Graph Network'). Output as a list."
+    ),
+    ResponseSchema(
+        name="technical_approach_description",
+        description="Core method description (objective summary from abstract, max 100 words). Output as a string."
+    ),
+    ResponseSchema(
+        name="innovation_points",
+        description="Explicit innovation points stated in abstract (max 100 words). Output as a string."
+    ),
+    ResponseSchema(
+        name="github_repo",
+        description="GitHub repository URL if explicitly mentioned, else leave empty. Output as a string."
+    ),
+]
+
+# 单次调用模式额外输出的相关性字段
+RELEVANCE_RESPONSE_SCHEMA = ResponseSchema(
+    name="relevant",
+    description="1 if the paper is relevant to the user query, else 0. Output as an integer."
+)
+
+
+def build_paper_prompt(prompt_name: str, template: str, papers: Union[Dict, List[Dict]], **kwargs) -> str:
     """
-    对单篇论文进行分类，提取结构化信息。
-    
-    Args:
-        paper: 包含 "title" 和 "abstract" 等论文信息
-    Returns:
-        分类结果的字典（JSON）
+    用压缩后的论文填充提示词模板：单篇论文填入 {paper}，多篇论文按 "[i] 论文" 逐行填入 {papers}。
+
+    最终提示词经 finalize_prompt 压缩空白，并按 prompt_name 记录 token 数；
+    以整篇论文缩进 JSON 填充的提示词作为基线，统计压缩节省的 token。
     """
-    
-    # 判断找到的文章是否与用户查询语义相关，过滤不相关文章
-    paper_str = json.dumps(paper, ensure_ascii=False, indent=2)
-    prompt = '''
-        判断这篇论文是否与用户查询 '{query}' 相关: '{paper}'，
-        ⚠️ **只输出 0 或 1，且不要加任何解释、符号或空格**：
-        - 如果相关，输出 1
-        - 如果不相关，输出 0'''.format(query=query, paper=paper_str)
-    match_str = llm.invoke(prompt).content
-    match = normalize_match_output(match_str)
+    truncated = 0
 
-    print(paper['title'], match)
-    if not match:
-        return {}
+    def _compact(paper: Dict) -> str:
+        nonlocal truncated
+        text, was_truncated = compact_paper(paper, prompt_name)
+        truncated += was_truncated
+        return text
 
+    def _fill(render) -> str:
+        if isinstance(papers, dict):
+            return template.format(paper=render(papers), **kwargs)
+        return template.format(papers="\n".join(f"[{i}] {render(paper)}" for i, paper in enumerate(papers)), **kwargs)
 
-    response_schemas = [
-        ResponseSchema(
-            name="data_source_type",
-            description="Data source category (industry or platform type of the data used, e.g., e-commerce, payment, banking). Infer if not explicitly mentioned. Output as a list."
-        ),
-        ResponseSchema(
-            name="data_source_name",
-            description="Specific data source name (e.g., Taobao, eBay, Binance). Output as a list."
-        ),
-        ResponseSchema(
-            name="fraud_type",
-            description="Specific fraud or risk scenario addressed (e.g., 'credit card fraud', 'fake account registration'). If non-fraud, specify the problem scenario. Output as a string."
-        ),
-        ResponseSchema(
-            name="technical_approach_category",
-            description="Broad technical categories used in the paper (e.g., feature engineering, RNN/LSTM, Transformer, GNN, anomaly detection, GAN, multimodal fusion, explainable AI). Include any other relevant approaches. Output as a list."
-        ),
-        ResponseSchema(
-            name="technical_approach_method",
-            description="Specific technical methods used (e.g., 'Bi-LSTM', 'Temporal Graph Network'). Output as a list."
-        ),
-        ResponseSchema(
-            name="technical_approach_description",
-            description="Core method description (objective summary from abstract, max 100 words). Output as a string."
-        ),
-        ResponseSchema(
-            name="innovation_points",
-            description="Explicit innovation points stated in abstract (max 100 words). Output as a string."
-        ),
-        ResponseSchema(
-            name="github_repo",
-            description="GitHub repository URL if explicitly mentioned, else leave empty. Output as a string."
-        ),
-    ]
-
-    # 构建 parser
-    # parser = StructuredOutputParser.from_response_schemas(response_schemas)
-
-    # prompt = PromptTemplate.from_template(
-    #     "请从以下文本中提取论文信息，并严格按照 JSON 输出：\n{paper}\n\n{format_instructions}"
-    # )
-
-    # classification_chain = (
-    #     prompt.partial(format_instructions=parser.get_format_instructions())
-    #     | llm
-    #     | parser
-    # )
-    
-    # classification_result = classification_chain.invoke({'paper': paper})
-    parser = StructuredOutputParser.from_response_schemas(response_schemas)
+    text = _fill(_compact)
+    baseline = lambda: _fill(lambda paper: json.dumps(paper, ensure_ascii=False, indent=4, default=str))
+    return finalize_prompt(prompt_name, text, baseline=baseline, truncated=truncated)
 
-    # prompt_template = PromptTemplate.from_template(
-    #     "请从以下文本中提取论文信息，并严格按照 JSON 输出：\n{paper}\n\n{format_instructions}"
-    # )
-    prompt_text = classify_prompt.classification_prompt.template.format(paper=paper_str)
-    resp = llm.invoke(prompt_text)
 
+def parse_structured_output(resp, parser: StructuredOutputParser) -> Dict:
+    """
+    将 LLM 返回解析为结构化字典，解析失败返回空字典。
+    """
     # 兼容不同返回类型
     if hasattr(resp, "content"):  # DeepSeek ChatResult
         raw_output = resp.content
@@ -159,16 +148,170 @@ def run_category_extraction_chain(query, llm, paper: Dict) -> Dict:
 
     # 去掉前后空格
     raw_output = raw_output.strip()
-    
+
     # 如果返回 JSON 被 ```json 包裹，去掉 ```json ``` 前后标记
     if raw_output.startswith("```json"):
         raw_output = "\n".join(raw_output.split("\n")[1:-1])
-    
+
     try:
-        classification_result = parser.parse(raw_output)
+        return parser.parse(raw_output)
     except Exception as e:
         print(f"[WARN] LLM 输出无法解析为 JSON, 返回空字典. 错误: {e}")
-        classification_result = {}
+        return {}
+
+
+def build_extraction_prompt(query, paper: Dict, relevance_checked: bool = False) -> str:
+    """
+    构建单篇论文的提取提示词：已通过相关性筛选的论文只做结构化提取，
+    否则使用单次调用提示词同时输出相关性与提取字段。
+    """
+    if relevance_checked:
+        return build_paper_prompt("extraction", classify_prompt.classification_prompt.template, paper)
+    return build_paper_prompt(
+        "single_pass", classify_prompt.single_pass_classification_prompt.template, paper, query=query
+    )
+
+
+def parse_extraction_response(resp, relevance_checked: bool = False) -> Dict:
+    """
+    解析 build_extraction_prompt 对应的 LLM 输出。
 
+    Returns:
+        提取结果字典；单次调用提示词判断为不相关或解析失败时返回空字典
+    """
+    if relevance_checked:
+        return parse_structured_output(resp, StructuredOutputParser.from_response_schemas(EXTRACTION_RESPONSE_SCHEMAS))
+
+    parser = StructuredOutputParser.from_response_schemas(
+        [RELEVANCE_RESPONSE_SCHEMA] + EXTRACTION_RESPONSE_SCHEMAS
+    )
+    classification_result = parse_structured_output(resp, parser)
+    if not normalize_match_output(str(classification_result.pop("relevant", 0))):
+        return {}
     return classification_result
 
+
+def run_single_pass_extraction_chain(query, llm, paper: Dict) -> Dict:
+    """
+    单次调用完成相关性判断与结构化提取。
+
+    一次结构化输出同时包含 relevant 标记与全部提取字段，
+    相比先判断相关性再提取的两次调用，输入 token 与往返次数约减半。
+
+    Args:
+        query: 用户研究主题
+        paper: 包含 "title" 和 "abstract" 等论文信息
+    Returns:
+        分类结果的字典（JSON），不相关或解析失败时返回空字典
+    """
+    classification_result = parse_extraction_response(governed_invoke(llm, build_extraction_prompt(query, paper)))
+    print(paper['title'], int(bool(classification_result)))
+    return classification_result
+
+
+# 单篇相关性判断提示词
+RELEVANCE_CHECK_TEMPLATE = '''
+        判断这篇论文是否与用户查询 '{query}' 相关: '{paper}'，
+        ⚠️ **只输出 0 或 1，且不要加任何解释、符号或空格**：
+        - 如果相关，输出 1
+        - 如果不相关，输出 0'''
+
+
+def run_relevance_check_chain(query, llm, paper: Dict) -> int:
+    """
+    判断单篇论文是否与用户查询语义相关。
+
+    Returns:
+        1 表示相关，0 表示不相关
+    """
+    prompt = build_paper_prompt("relevance", RELEVANCE_CHECK_TEMPLATE, paper, query=query)
+    match_str = governed_invoke(llm, prompt).content
+    match = normalize_match_output(match_str)
+
+    print(paper['title'], match)
+    return match
+
+
+def parse_relevance_verdicts(text: str, expected: int) -> List[int]:
+    """
+    解析批量相关性判断输出的 0/1 向量。
+
+    Raises:
+        ValueError: 输出不是长度为 expected 的 JSON 数组
+    """
+    text = text.strip()
+    # 移除可能的 Markdown 包裹
+    if text.startswith("```"):
+        text = "\n".join(text.split("\n")[1:-1])
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end < start:
+        raise ValueError(f"未找到 JSON 数组: {text}")
+
+    verdicts = json.loads(text[start:end + 1])
+    if not isinstance(verdicts, list) or len(verdicts) != expected:
+        raise ValueError(f"判断结果数量不符，期望 {expected} 个: {verdicts}")
+    return [normalize_match_output(str(v)) for v in verdicts]
+
+
+def run_batch_relevance_chain(query, llm, papers: List[Dict]) -> List[int]:
+    """
+    批量判断多篇论文与用户查询的相关性，一次 LLM 调用返回每篇论文的 0/1 判断。
+
+    输出格式异常时将批次一分为二分别重试，直到退化为单篇判断。
+
+    Args:
+        query: 用户研究主题
+        papers: 论文列表
+    Returns:
+        与 papers 一一对应的 0/1 列表
+    """
+    if not papers:
+        return []
+    if len(papers) == 1:
+        return [run_relevance_check_chain(query, llm, papers[0])]
+
+    prompt_text = build_paper_prompt(
+        "batch_relevance", classify_prompt.batch_relevance_prompt.template, papers, query=query, count=len(papers)
+    )
+    resp = governed_invoke(llm, prompt_text)
+    try:
+        verdicts = parse_relevance_verdicts(resp.content if hasattr(resp, "content") else str(resp), len(papers))
+    except Exception as e:
+        print(f"[WARN] 批量相关性判断输出异常，拆分为两批重试 ({len(papers)} 篇). 错误: {e}")
+        mid = len(papers) // 2
+        return (
+            run_batch_relevance_chain(query, llm, papers[:mid])
+            + run_batch_relevance_chain(query, llm, papers[mid:])
+        )
+
+    for paper, match in zip(papers, verdicts):
+        print(paper['title'], match)
+    return verdicts
+
+
+def run_category_extraction_chain(
+    query,
+    llm,
+    paper: Dict,
+    single_pass: bool = False,
+    relevance_checked: bool = False
+) -> Dict:
+    """
+    对单篇论文进行分类，提取结构化信息。
+    
+    Args:
+        paper: 包含 "title" 和 "abstract" 等论文信息
+        single_pass: 是否将相关性判断与结构化提取合并为一次 LLM 调用
+        relevance_checked: 论文已通过批量相关性筛选时为 True，跳过单篇相关性判断
+    Returns:
+        分类结果的字典（JSON）
+    """
+    if single_pass and not relevance_checked:
+        return run_single_pass_extraction_chain(query, llm, paper)
+
+    # 判断找到的文章是否与用户查询语义相关，过滤不相关文章
+    if not relevance_checked and not run_relevance_check_chain(query, llm, paper):
+        return {}
+
+    prompt_text = build_extraction_prompt(query, paper, relevance_checked=True)
+    return parse_extraction_response(governed_invoke(llm, prompt_text), relevance_checked=True)
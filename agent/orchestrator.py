@@ -1,16 +1,21 @@
 # fraud_research_agent/agent/orchestrator.py
 
 import os
+import re
 import json
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 
 # 引入子 agent
-from fraud_research_agent.agent.paper_search_agent import paper_search_agent
+from fraud_research_agent.agent.paper_search_agent import paper_search_agent, paper_search_agent_batch, paper_search_agent_stream
 from fraud_research_agent.agent.paper_classification_agent import paper_classification_agent
 from fraud_research_agent.agent.paper_report_agent import paper_report_agent
+from fraud_research_agent.config import settings
+from fraud_research_agent.utils.context_utils import ContextThreadPoolExecutor
+from fraud_research_agent.utils.llm_cache import get_llm_cache
+from fraud_research_agent.utils.run_metrics import start_run
 
 
-def orchestrator(user_topic: str) -> Dict:
+def orchestrator(user_topic: str, streaming: bool = False) -> Dict:
     """
     反欺诈领域论文搜索与研究报告生成 Orchestrator
 
@@ -21,23 +26,33 @@ def orchestrator(user_topic: str) -> Dict:
 
     Args:
         user_topic (str): 用户研究主题，例如 "fraud detection behavior sequence"
+        streaming (bool): 流式模式，边抓取边分类，不必等待全部时间窗口抓取完成
 
     Returns:
         Dict: 包含 field_mapping, clean_papers, report 三部分的结果
     """
 
     print(f"\n🚀 开始执行 orchestrator，研究主题: {user_topic}")
+    metrics = start_run(user_topic)
 
-    # Step 1: 论文搜索
-    papers = paper_search_agent(user_topic)
-    print(f"✅ 获取论文 {len(papers)} 篇")
+    # Step 1: 论文搜索（流式模式下为边抓取边产出的生成器，抓取耗时计入分类阶段）
+    with metrics.stage("search") as stage_info:
+        if streaming:
+            papers = paper_search_agent_stream(user_topic)
+        else:
+            papers = paper_search_agent(user_topic)
+            stage_info["papers_out"] = len(papers)
+            print(f"✅ 获取论文 {len(papers)} 篇")
 
     # Step 2: 论文分类与清洗
-    field_mapping, clean_papers = paper_classification_agent(user_topic, papers)
+    with metrics.stage("classification", papers_in=None if streaming else len(papers)) as stage_info:
+        field_mapping, clean_papers = paper_classification_agent(user_topic, papers)
+        stage_info["papers_out"] = len(clean_papers)
     print(f"✅ 分类后论文 {len(clean_papers)} 篇")
 
     # Step 3: 研究报告生成
-    report = paper_report_agent(user_topic, clean_papers)
+    with metrics.stage("report", papers_in=len(clean_papers)):
+        report = paper_report_agent(user_topic, clean_papers)
     print("✅ 已生成研究报告")
 
     # 聚合结果
@@ -48,15 +63,95 @@ def orchestrator(user_topic: str) -> Dict:
     }
 
     # 保存 orchestrator 输出结果
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    save_path = os.path.join(current_dir, '..', 'data', 'report', 'report.md')
+    report_dir = os.path.join(settings.DATA_DIR, 'report')
+    os.makedirs(report_dir, exist_ok=True)
+    save_path = os.path.join(report_dir, 'report.md')
     with open(save_path, "w", encoding="utf-8") as f:
         json.dump(result, f, ensure_ascii=False, indent=2)
 
+    cache_stats = get_llm_cache().stats()
+    print(f"🗄️ LLM 缓存命中 {cache_stats['hits']} 次，未命中 {cache_stats['misses']} 次")
+    print(f"📊 运行指标已保存至 {metrics.write()}")
+
     print(f"\n📂 Orchestrator 执行完成，结果已保存至 {save_path}")
     return result
 
 
+def topic_slug(user_topic: str) -> str:
+    """将主题转为可用作目录/文件名的短标识"""
+    return re.sub(r"[^\w]+", "_", user_topic.lower()).strip("_") or "topic"
+
+
+def batch_orchestrator(user_topics: List[str], max_report_workers: Optional[int] = None) -> Dict[str, Dict]:
+    """
+    多主题批量 Orchestrator：抓取与去重只做一次，API 与 LLM 开销随不同论文数增长，而不是主题数 × 论文数
+
+    执行流程：
+    1. 为所有主题生成查询，对查询并集统一抓取，并按论文 ID 全局去重
+    2. 按主题依次分类清洗（每个主题内每篇论文只分类一次，结果分别保存在 data/processed/topics/<主题>/）
+    3. 并行生成各主题的研究报告（各报告的论文数据绑定在各自的会话上下文中，图表与结果保存在 data/report/<主题>/）
+
+    Args:
+        user_topics (List[str]): 研究主题列表
+        max_report_workers (int): 并行生成报告的主题数，默认取 settings.BATCH_REPORT_MAX_WORKERS
+
+    Returns:
+        Dict: {主题: {field_mapping, clean_papers, report}}
+    """
+    user_topics = list(dict.fromkeys(t.strip() for t in user_topics if t.strip()))
+    if max_report_workers is None:
+        max_report_workers = settings.BATCH_REPORT_MAX_WORKERS
+    print(f"\n🚀 开始执行 batch orchestrator，共 {len(user_topics)} 个研究主题")
+    metrics = start_run("batch")
+
+    # Step 1: 统一抓取与去重
+    with metrics.stage("search") as stage_info:
+        papers, topic_papers = paper_search_agent_batch(user_topics)
+        stage_info["papers_out"] = len(papers)
+    print(f"✅ 获取论文 {len(papers)} 篇")
+
+    # Step 2: 按主题分类清洗（共享类别体系，依次执行；每个主题内部已并发调用 LLM）
+    classified = {}
+    for topic in user_topics:
+        output_dir = os.path.join(settings.DATA_DIR, 'processed', 'topics', topic_slug(topic))
+        with metrics.stage("classification", papers_in=len(topic_papers[topic])) as stage_info:
+            classified[topic] = paper_classification_agent(topic, topic_papers[topic], output_dir=output_dir)
+            stage_info["papers_out"] = len(classified[topic][1])
+        print(f"✅ [{topic}] 分类后论文 {len(classified[topic][1])} 篇")
+
+    # Step 3: 并行生成各主题报告（每个主题单独的报告目录，并行绘制的同名图表互不覆盖）
+    report_dirs = {topic: os.path.join(settings.DATA_DIR, 'report', topic_slug(topic)) for topic in user_topics}
+    with metrics.stage("report", papers_in=sum(len(c[1]) for c in classified.values())), \
+            ContextThreadPoolExecutor(max_workers=max(1, min(max_report_workers, len(user_topics)))) as executor:
+        reports = dict(zip(
+            user_topics,
+            executor.map(
+                lambda topic: paper_report_agent(topic, classified[topic][1], report_dir=report_dirs[topic]),
+                user_topics
+            )
+        ))
+
+    results = {}
+    for topic in user_topics:
+        field_mapping, clean_papers = classified[topic]
+        results[topic] = {
+            "field_mapping": field_mapping,
+            "clean_papers": clean_papers,
+            "report": reports[topic]
+        }
+        os.makedirs(report_dirs[topic], exist_ok=True)
+        save_path = os.path.join(report_dirs[topic], "report.md")
+        with open(save_path, "w", encoding="utf-8") as f:
+            json.dump(results[topic], f, ensure_ascii=False, indent=2)
+        print(f"📂 [{topic}] 结果已保存至 {save_path}")
+
+    cache_stats = get_llm_cache().stats()
+    print(f"🗄️ LLM 缓存命中 {cache_stats['hits']} 次，未命中 {cache_stats['misses']} 次")
+    print(f"📊 运行指标已保存至 {metrics.write()}")
+    print(f"\n📂 Batch orchestrator 执行完成，共 {len(results)} 个主题")
+    return results
+
+
 # ===========================
 # 示例调用
 # ===========================
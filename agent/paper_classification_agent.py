@@ -1,42 +1,411 @@
 import os
 import json
-from fraud_research_agent.agent.chain_builder import run_category_extraction_chain
-from fraud_research_agent.tools.categorization_tool import categorize_and_map_field
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from fraud_research_agent.agent.chain_builder import (
+    build_extraction_prompt,
+    parse_extraction_response,
+    run_batch_relevance_chain,
+    run_category_extraction_chain,
+)
+from fraud_research_agent.config import settings
+from fraud_research_agent.tools.categorization_tool import apply_field_mapping, build_field_mapping
+from fraud_research_agent.utils.batch_client import OpenAIBatchClient, build_batch_request
+from fraud_research_agent.utils.context_utils import ContextThreadPoolExecutor
 from fraud_research_agent.utils.llm_utils import get_llm
+from fraud_research_agent.utils.paper_store import read_jsonl, write_jsonl
+from fraud_research_agent.utils.relevance_filter import ACCEPT, AMBIGUOUS, DROP, RelevancePreFilter
+from fraud_research_agent.utils.run_metrics import get_run_metrics
+from fraud_research_agent.utils.stream_utils import bounded_prefetch
+from fraud_research_agent.utils.taxonomy_store import TaxonomyStore
 
 
-def paper_classification_agent(query, paper_list):
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(current_dir, '..', 'data', 'processed')
-    save_path = os.path.join(file_path, 'arxiv_results.json')
-    
+def _chain_future(source: Future, target: Future) -> None:
+    """source 完成后将其结果或异常转交给 target"""
+    def _copy(done: Future):
+        if done.exception() is not None:
+            target.set_exception(done.exception())
+        else:
+            target.set_result(done.result())
+    source.add_done_callback(_copy)
+
+
+def _extract_or_none(query, llm, paper: Dict, single_pass: bool = False,
+                     relevance_checked: bool = False) -> Optional[Dict]:
+    """
+    执行单篇论文的提取；LLM 调用在重试用尽后仍失败时返回 None，不中断整个分类流程。
+    返回 None 的论文不写入台账，下次增量运行会重新处理。
+    """
+    try:
+        return run_category_extraction_chain(query, llm, paper, single_pass, relevance_checked)
+    except Exception as e:
+        print(f"⚠️ 论文提取失败，下次运行重试: {paper.get('title')} ({type(e).__name__}: {e})")
+        return None
+
+
+def _submit_screened_batch(executor, query, llm, batch) -> None:
+    """
+    提交一批论文的批量相关性筛选；筛选完成后仅为相关论文提交结构化提取，
+    不相关论文的结果直接置为空字典。
+
+    Args:
+        batch: [(论文, 该论文最终结果的 Future)]
+    """
+    screening = executor.submit(run_batch_relevance_chain, query, llm, [paper for paper, _ in batch])
+
+    def _on_screened(done: Future):
+        if done.exception() is not None:
+            # 筛选失败时整批论文视为提取失败，不写入台账，下次运行重试
+            print(f"⚠️ 批量相关性筛选失败，{len(batch)} 篇论文下次运行重试: {done.exception()!r}")
+            for _, target in batch:
+                target.set_result(None)
+            return
+        for (paper, target), match in zip(batch, done.result()):
+            if not match:
+                target.set_result({})
+                continue
+            _chain_future(executor.submit(_extract_or_none, query, llm, paper, False, True), target)
+
+    screening.add_done_callback(_on_screened)
+
+
+def extract_papers_concurrently(
+    query,
+    llm,
+    paper_list: Iterable[Dict],
+    max_workers: int,
+    previous_results: Optional[Dict[str, Dict]] = None,
+    single_pass: bool = False,
+    screen_batch_size: int = 0,
+    prefilter: Optional[RelevancePreFilter] = None
+) -> Iterator[Tuple[Dict, Dict]]:
+    """
+    用有界线程池并发执行单篇论文的信息提取。
+
+    结果按输入顺序逐条产出，便于流式写盘且输出顺序确定，队首结果一旦完成即产出；
+    在途任务数不超过 2 * max_workers（开启批量筛选时乘以批大小），内存占用有界。
+
+    Args:
+        query: 用户研究主题
+        llm: ChatModel（速率限制由 get_llm 按提供商统一处理）
+        paper_list: 论文列表或迭代器
+        max_workers: 并发线程数
+        previous_results: load_previous_results 的返回值，id 与 updated 均未变化的论文不再调用 LLM
+        single_pass: 是否用一次 LLM 调用同时完成相关性判断与结构化提取（仅在未开启批量筛选时生效）
+        screen_batch_size: 大于 1 时，先以该批大小做批量相关性筛选，再只对相关论文做结构化提取；
+            与 single_pass 同时设置时批量筛选优先
+        prefilter: 本地语义预筛选，明显不相关的论文直接丢弃、明显相关的跳过 LLM 相关性判断
+    Yields:
+        (原始论文, 提取结果)，不相关论文的提取结果为空字典，LLM 调用失败的论文为 None
+    """
+    max_workers = max(1, max_workers)
+    previous_results = previous_results or {}
+    screening = screen_batch_size > 1
+    max_pending = max_workers * 2 * (screen_batch_size if screening else 1)
+    pending = deque()
+    batch = []
+    verdicts = prefilter.screen(query, paper_list) if prefilter else ((paper, AMBIGUOUS) for paper in paper_list)
+    with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+        for paper, verdict in verdicts:
+            reusable = reusable_result(previous_results, paper)
+            if reusable is not None:
+                future = Future()
+                future.set_result(reusable)
+            elif verdict == DROP:
+                future = Future()
+                future.set_result({})
+            elif verdict == ACCEPT:
+                future = executor.submit(_extract_or_none, query, llm, paper, False, True)
+            elif screening:
+                future = Future()
+                batch.append((paper, future))
+                if len(batch) >= screen_batch_size:
+                    _submit_screened_batch(executor, query, llm, batch)
+                    batch = []
+            else:
+                future = executor.submit(_extract_or_none, query, llm, paper, single_pass)
+            pending.append((paper, future))
+            # 队列已满时会阻塞等待队首结果；队首可能仍在未提交的筛选批次中，先提交该批次以免死锁
+            if batch and len(pending) >= max_pending:
+                _submit_screened_batch(executor, query, llm, batch)
+                batch = []
+            while pending and (len(pending) >= max_pending or pending[0][1].done()):
+                done_paper, done_future = pending.popleft()
+                yield done_paper, done_future.result()
+
+        if batch:
+            _submit_screened_batch(executor, query, llm, batch)
+
+        while pending:
+            done_paper, done_future = pending.popleft()
+            yield done_paper, done_future.result()
+
+
+def extract_papers_batch(
+    query,
+    llm,
+    paper_list: Iterable[Dict],
+    max_workers: int,
+    work_dir: str,
+    previous_results: Optional[Dict[str, Dict]] = None,
+    prefilter: Optional[RelevancePreFilter] = None,
+    client: Optional[OpenAIBatchClient] = None
+) -> Iterator[Tuple[Dict, Dict]]:
+    """
+    批量 API 模式的信息提取：所有待提取论文的提示词写入 JSONL 批任务文件，
+    通过 OpenAI 兼容的 Batch API 提交并轮询，完成后按输入顺序产出结果。
+
+    批任务是异步的，无法先筛选再提取，因此未经预筛选确认的论文使用单次调用提示词（相关性 + 提取）；
+    批任务中失败或缺失的请求回退为实时调用，不会被当作不相关论文丢弃；
+    批任务本身无法提交（上传、创建或鉴权失败）时，全部待提取论文改走 extract_papers_concurrently。
+
+    Args:
+        work_dir: 批任务请求文件的保存目录
+        client: Batch API 客户端，默认按 settings.BATCH_API_* 创建
+    Yields:
+        (原始论文, 提取结果)，不相关论文的提取结果为空字典，LLM 调用失败的论文为 None
+    """
+    previous_results = previous_results or {}
+    verdicts = prefilter.screen(query, paper_list) if prefilter else ((paper, AMBIGUOUS) for paper in paper_list)
+
+    items = []  # [(论文, 已确定的结果或 None, relevance_checked)]
+    for paper, verdict in verdicts:
+        reusable = reusable_result(previous_results, paper)
+        if reusable is not None:
+            items.append((paper, reusable, False))
+        elif verdict == DROP:
+            items.append((paper, {}, False))
+        else:
+            items.append((paper, None, verdict == ACCEPT))
+
+    requests = [
+        build_batch_request(str(index), build_extraction_prompt(query, paper, relevance_checked))
+        for index, (paper, result, relevance_checked) in enumerate(items) if result is None
+    ]
+    responses = {}
+    if requests:
+        try:
+            responses = (client or OpenAIBatchClient()).run(requests, work_dir)
+        except Exception as e:
+            # 上传、创建批任务或鉴权失败：全部待提取论文改走实时并发提取
+            print(f"⚠️ 批任务提交失败，{len(requests)} 篇论文改为实时提取: {e!r}")
+            pending = [paper for paper, result, _ in items if result is None]
+            realtime = extract_papers_concurrently(
+                query, llm, pending, max_workers, single_pass=settings.CLASSIFY_SINGLE_PASS,
+                screen_batch_size=settings.CLASSIFY_SCREEN_BATCH_SIZE
+            )
+            for paper, result, _ in items:
+                yield (paper, result) if result is not None else next(realtime)
+            return
+
+    results, fallback = [], []
+    input_tokens = output_tokens = 0
+    for index, (paper, result, relevance_checked) in enumerate(items):
+        if result is None:
+            content, usage = responses.get(str(index), (None, {}))
+            input_tokens += usage.get("prompt_tokens", 0)
+            output_tokens += usage.get("completion_tokens", 0)
+            if content is None:
+                fallback.append(index)
+            else:
+                result = parse_extraction_response(content, relevance_checked)
+        results.append(result)
+    get_run_metrics().record_batch(len(requests), len(fallback), input_tokens, output_tokens)
+
+    if fallback:
+        print(f"⚠️ 批任务中 {len(fallback)} 条请求失败，回退为实时调用")
+        with ContextThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            retried = executor.map(
+                lambda index: _extract_or_none(query, llm, items[index][0], True, items[index][2]),
+                fallback
+            )
+            for index, result in zip(fallback, retried):
+                results[index] = result
+
+    for (paper, _, _), result in zip(items, results):
+        yield paper, result
+
+
+def load_previous_results(query, save_path: str, ledger_path: str) -> Dict[str, Dict]:
+    """
+    加载上一次运行的提取结果，用于增量分类。
+
+    - save_path: 相关论文的提取结果（JSONL，按 id 去重，后写入者为准）
+    - ledger_path: 每篇已判定论文的记录 {query, id, updated, relevant}，不相关论文也会记录；
+      被语义预筛选直接丢弃的论文另记 screened_by="prefilter"
+
+    Returns:
+        {论文 id: {"updated": ..., "result": 提取结果}}，不相关论文的 result 为空字典；
+        只返回同一 query 下、结果完整可复用的论文。预筛选丢弃的论文不是 LLM 的最终判定，不复用，下次运行重新筛选
+    """
+    records = {record["id"]: record for record in read_jsonl(save_path) if "id" in record}
+
+    previous = {}
+    for entry in read_jsonl(ledger_path):
+        if entry.get("query") != query:
+            continue
+        paper_id = entry.get("id")
+        if entry.get("screened_by") == "prefilter":
+            previous.pop(paper_id, None)
+            continue
+        if entry.get("relevant"):
+            # 相关但结果行丢失（例如上次运行中途崩溃），需要重新提取
+            if paper_id not in records:
+                previous.pop(paper_id, None)
+                continue
+            result = records[paper_id]
+        else:
+            result = {}
+        previous[paper_id] = {"updated": entry.get("updated"), "result": result}
+    return previous
+
+
+def load_other_queries_state(query, save_path: str, ledger_path: str) -> Tuple[List[Dict], List[Dict]]:
+    """
+    读取其他 query 的增量状态，压缩文件时原样保留，避免运行一个主题抹掉其他主题的结果。
+
+    Returns:
+        (其他 query 下相关论文的提取结果, 其他 query 的台账记录)，均按 id 去重、后写入者为准
+    """
+    other_ledger = {}
+    for entry in read_jsonl(ledger_path):
+        if entry.get("query") != query and "id" in entry:
+            other_ledger[(entry.get("query"), entry["id"])] = entry
+    relevant_ids = {entry["id"] for entry in other_ledger.values() if entry.get("relevant")}
+    other_results = {
+        record["id"]: record for record in read_jsonl(save_path) if record.get("id") in relevant_ids
+    }
+    return list(other_results.values()), list(other_ledger.values())
+
+
+def reusable_result(previous_results: Dict[str, Dict], paper: Dict) -> Optional[Dict]:
+    """论文 id 与 updated 均未变化时返回上次的提取结果，否则返回 None"""
+    previous = previous_results.get(paper["id"])
+    if previous is not None and previous["updated"] == paper.get("updated"):
+        return previous["result"]
+    return None
+
+
+def paper_classification_agent(
+    query,
+    paper_list,
+    max_workers=None,
+    incremental=None,
+    single_pass=None,
+    screen_batch_size=None,
+    output_dir=None,
+    prefilter=None,
+    batch_mode=None
+):
+    if output_dir is None:
+        output_dir = os.path.join(settings.DATA_DIR, 'processed')
+    os.makedirs(output_dir, exist_ok=True)
+    save_path = os.path.join(output_dir, 'arxiv_results.json')
+    ledger_path = os.path.join(output_dir, 'arxiv_results_ledger.jsonl')
+
+    if max_workers is None:
+        max_workers = settings.CLASSIFY_MAX_WORKERS
+    if incremental is None:
+        incremental = settings.CLASSIFY_INCREMENTAL
+    if single_pass is None:
+        single_pass = settings.CLASSIFY_SINGLE_PASS
+    if screen_batch_size is None:
+        screen_batch_size = settings.CLASSIFY_SCREEN_BATCH_SIZE
+    if single_pass and screen_batch_size > 1:
+        print(f"⚠️ 已开启批量相关性筛选（批大小 {screen_batch_size}），单次调用模式不生效；"
+              f"如需单次调用模式请设置 CLASSIFY_SCREEN_BATCH_SIZE=0")
+    if prefilter is None:
+        prefilter = settings.RELEVANCE_PREFILTER
+    if batch_mode is None:
+        batch_mode = settings.CLASSIFY_BATCH_MODE
+    relevance_prefilter = RelevancePreFilter() if prefilter else None
+
+    # 增量模式：id 与 updated 均未变化的论文直接复用上次结果
+    previous_results = load_previous_results(query, save_path, ledger_path) if incremental else {}
+    # 结果文件与台账由所有 query 共用，先读出其他 query 的记录，压缩时保留
+    other_results, other_ledger = load_other_queries_state(query, save_path, ledger_path)
+
+    # 流式输入（如边抓取边产出的生成器）放到后台线程，经有界队列交给分类，抓取与分类并行推进
+    if not isinstance(paper_list, (list, tuple)):
+        paper_list = bounded_prefetch(paper_list, max_workers * 4)
+
     llm = get_llm()
     paper_extract = []
-    with open(save_path, "w", encoding="utf-8") as f:
-        for paper in paper_list:
-            paper_ = run_category_extraction_chain(query, llm, paper)
+    ledger = []
+    reused_count = 0
+    failed_count = 0
+    metrics = get_run_metrics()
+    # 始终以追加方式打开：非增量模式下旧记录也保留到运行结束时的压缩，批任务超时或中途崩溃不会丢失已有结果
+    with metrics.stage("extraction") as stage_info, \
+            open(save_path, "a", encoding="utf-8") as f, open(ledger_path, "a", encoding="utf-8") as ledger_f:
+        if batch_mode:
+            extracted = extract_papers_batch(
+                query, llm, paper_list, max_workers, os.path.join(output_dir, 'batch'), previous_results,
+                relevance_prefilter
+            )
+        else:
+            extracted = extract_papers_concurrently(
+                query, llm, paper_list, max_workers, previous_results, single_pass, screen_batch_size,
+                relevance_prefilter
+            )
+        for paper, paper_ in extracted:
+            if paper_ is None:
+                failed_count += 1
+                continue
+            entry = {"query": query, "id": paper["id"], "updated": paper.get("updated"), "relevant": bool(paper_)}
+            if relevance_prefilter is not None and paper["id"] in relevance_prefilter.dropped:
+                entry["screened_by"] = "prefilter"
+            ledger.append(entry)
             if paper_:
                 merged_data = {**paper, **paper_}
                 paper_extract.append(merged_data)
+            if reusable_result(previous_results, paper) is not None:
+                reused_count += 1
+                continue
+
+            if paper_:
                 f.write(json.dumps(merged_data, ensure_ascii=False) + "\n")
-                f.flush()  # 立刻写入磁盘，防止程序中途崩溃丢数据 
-        
+                f.flush()  # 立刻写入磁盘，防止程序中途崩溃丢数据
+            ledger_f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            ledger_f.flush()
+        stage_info.update(
+            papers_in=len(ledger) + failed_count, papers_out=len(paper_extract), reused=reused_count,
+            failed=failed_count
+        )
+
+    # 合并完成后压缩文件：去掉当前 query 下被更新覆盖的旧版本与本次未出现的论文，其他 query 的记录保留
+    current_ids = {paper["id"] for paper in paper_extract}
+    write_jsonl(save_path, [record for record in other_results if record["id"] not in current_ids] + paper_extract)
+    write_jsonl(ledger_path, other_ledger + ledger)
+    if incremental:
+        print(f"♻️ 增量模式：复用已有结果 {reused_count} 篇，新处理 {len(ledger) - reused_count} 篇")
+    if failed_count:
+        print(f"⚠️ {failed_count} 篇论文提取失败，未写入台账，下次运行将重试")
+    if relevance_prefilter is not None:
+        print(f"🧭 语义预筛选：{relevance_prefilter.summary()}")
+
     paper_list = paper_extract
     print("去掉不相关论文后，还剩论文数量： ", len(paper_list))
 
-    field_mapping = {}
+    # 各字段的类别映射相互独立，并发构建后再统一写入 _clean 字段
+    fields = ['data_source_type','fraud_type','technical_approach_category']
+    with metrics.stage("categorization", papers_in=len(paper_list)) as stage_info, \
+            ContextThreadPoolExecutor(max_workers=len(fields)) as executor:
+        futures = {
+            field: executor.submit(build_field_mapping, paper_list, field, 20, store=TaxonomyStore(field))
+            for field in fields
+        }
+        field_mapping = {field: futures[field].result() for field in fields}
+        stage_info["papers_out"] = len(paper_list)
 
-    for field in ['data_source_type','fraud_type','technical_approach_category']:
-        print(field)
-        new_field = field+'_clean'
-        category_result = categorize_and_map_field(paper_list, field, new_field, 20)
-        field_mapping[field] = category_result['mapping']
-        paper_list = category_result['data']
-    
-    clean_save_path = os.path.join(file_path, 'arxiv_results_clean.json')
+    for field in fields:
+        paper_list = apply_field_mapping(paper_list, field, field+'_clean', field_mapping[field])
+
+    clean_save_path = os.path.join(output_dir, 'arxiv_results_clean.json')
     with open(clean_save_path, 'w', encoding='utf-8') as f:
         json.dump(paper_list, f, ensure_ascii=False, indent=4)
-    
+
     return (field_mapping, paper_list)
 
 
@@ -2,13 +2,14 @@
 import os
 import json
 from langchain.agents import create_tool_calling_agent
-from fraud_research_agent.tools.count_tool import count_distribution_tool
+from fraud_research_agent.tools.count_tool import count_distribution_tool, crosstab_tool, top_k_tool, growth_rate_tool
 from fraud_research_agent.tools.plot_tool import plot_histogram_tool
 from fraud_research_agent.tools.report_tool import table_tool, filter_nonempty_tool
 from fraud_research_agent.utils.llm_utils import get_llm
+from fraud_research_agent.utils.llm_governor import GovernedChatModel
 from fraud_research_agent.prompts.report_prompt import report_prompt_template
 from langchain.agents import AgentExecutor
-from fraud_research_agent.utils.global_state import set_global_papers
+from fraud_research_agent.utils.global_state import report_session
 
 
 def sanitize_papers(paper_list):
@@ -28,18 +29,12 @@ def minimal_papers(paper_list):
     return [{k: v for k, v in p.items() if k in keys} for p in paper_list]
 
 
-def set_global_papers(papers):
-    """设置全局论文数据"""
-    global global_papers
-    global_papers = papers
-
-
-def paper_report_agent(query, paper_list):
+def paper_report_agent(query, paper_list, report_dir=None):
     paper_list = minimal_papers(paper_list)
-    set_global_papers(paper_list)
 
-    llm = get_llm()
-    tools = [count_distribution_tool, plot_histogram_tool, table_tool, filter_nonempty_tool]
+    # Agent 内部的每次 LLM 调用都经过共享调度器
+    llm = GovernedChatModel(inner=get_llm())
+    tools = [count_distribution_tool, crosstab_tool, top_k_tool, growth_rate_tool, plot_histogram_tool, table_tool, filter_nonempty_tool]
 
     agent = create_tool_calling_agent(
         llm=llm,
@@ -50,11 +45,14 @@ def paper_report_agent(query, paper_list):
     # 创建 AgentExecutor
     agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
 
-    # 使用 AgentExecutor 来运行
-    response = agent_executor.invoke({
-        "query": query
-        # "intermediate_steps": []
-    })
+    # 论文数据（及图表输出目录）绑定到当前上下文的报告会话，工具在每次调用时解析；加载时预计算各字段分布
+    with report_session(paper_list, report_dir) as session:
+        session.stats
+        # 使用 AgentExecutor 来运行
+        response = agent_executor.invoke({
+            "query": query
+            # "intermediate_steps": []
+        })
     
     return response
 
@@ -1,11 +1,75 @@
 # fraud_research_agent/agent/paper_search_agent.py
 import os
+import re
 import json
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from fraud_research_agent.agent.chain_builder import run_generate_queries_chain
-from fraud_research_agent.tools.arxiv_tool import search_arxiv
+from fraud_research_agent.config import settings
+from fraud_research_agent.tools.arxiv_tool import iter_arxiv, normalize_query, search_arxiv
+from fraud_research_agent.utils.context_utils import ContextThreadPoolExecutor
+from fraud_research_agent.utils.dedup_utils import NearDuplicateDetector, normalize_arxiv_id, paper_freshness
 from fraud_research_agent.utils.llm_utils import get_llm
 
+
+def dedup_papers(papers: Iterable[Dict], near_duplicates: Optional[bool] = None,
+                 streaming: bool = False) -> Iterator[Dict]:
+    """
+    论文去重：
+    1. 去掉版本后缀后的 arXiv ID 相同视为同一篇，保留版本号最高（其次更新时间最晚）的记录，位置按首次出现，
+       各记录的 source_queries 合并
+    2. 开启近重复检测时，标题+摘要近似相同（如交叉投递、重复提交）的论文也合并
+
+    Args:
+        streaming: 在线去重，边读边产出；已产出的记录无法替换，因此保留首次出现的版本
+            （同一次抓取中 arXiv 对同一篇论文返回的都是当前版本，流式抓取时两者等价）
+    """
+    if near_duplicates is None:
+        near_duplicates = settings.DEDUP_NEAR_DUPLICATES
+    detector = NearDuplicateDetector() if near_duplicates else None
+    version_dups, near_dups = 0, 0
+    latest = {}
+
+    def first_seen() -> Iterator[Dict]:
+        nonlocal version_dups
+        for paper in papers:
+            paper_id = normalize_arxiv_id(paper["id"])
+            if paper_id in latest:
+                version_dups += latest[paper_id]["id"] != paper["id"]
+                continue
+            latest[paper_id] = paper
+            yield paper
+
+    if streaming:
+        candidates = first_seen()
+    else:
+        for paper in papers:
+            paper_id = normalize_arxiv_id(paper["id"])
+            if paper_id in latest:
+                kept = latest[paper_id]
+                version_dups += kept["id"] != paper["id"]
+                # 合并各条记录的来源查询词：同一篇论文可能由不同查询、不同运行抓取到
+                source_queries = list(dict.fromkeys(kept.get("source_queries", []) + paper.get("source_queries", [])))
+                if paper_freshness(paper) > paper_freshness(kept):
+                    kept = paper
+                if source_queries:
+                    kept = {**kept, "source_queries": source_queries}
+                latest[paper_id] = kept
+                continue
+            latest[paper_id] = paper
+        candidates = list(latest.values())
+
+    for paper in candidates:
+        paper_id = normalize_arxiv_id(paper["id"])
+        if detector is not None:
+            duplicate_of = detector.add(paper_id, f"{paper.get('title', '')} {paper.get('abstract', '')}")
+            if duplicate_of is not None:
+                near_dups += 1
+                continue
+        yield paper
+    if version_dups or near_dups:
+        print(f"🧬 去重：合并不同版本 {version_dups} 篇，近重复论文 {near_dups} 篇")
+
+
 def paper_search_agent(user_topic: str) -> List[Dict]:
     """
     高层封装的论文搜索 Agent：
@@ -33,19 +97,13 @@ def paper_search_agent(user_topic: str) -> List[Dict]:
     #     results = search_arxiv(q, file_name)
     #     all_results.extend(results)
     
-    file_name = 'arxiv_results_raw.json'
+    file_name = 'arxiv_results_raw.jsonl'
     all_results = search_arxiv(queries, file_name)
     # Step 3: 去重（基于论文 ID）
-    seen = set()
-    unique_results = []
-    for paper in all_results:
-        if paper["id"] not in seen:
-            seen.add(paper["id"])
-            unique_results.append(paper)
-    
+    unique_results = list(dedup_papers(all_results))
 
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(current_dir, '..', 'data', 'raw')
+
+    file_path = os.path.join(settings.DATA_DIR, 'raw')
     save_path = os.path.join(file_path, 'arxiv_results.json')
 
     with open(save_path, "w", encoding="utf-8") as f:
@@ -55,6 +113,130 @@ def paper_search_agent(user_topic: str) -> List[Dict]:
     return unique_results
 
 
+def paper_search_agent_stream(user_topic: str) -> Iterator[Dict]:
+    """
+    流式论文搜索 Agent：生成查询后边抓取边产出去重后的论文，
+    供下游分类在抓取进行中即开始处理。
+
+    与 paper_search_agent 不同，不额外保存去重后的全量快照（原始抓取已追加保存）。
+
+    Args:
+        user_topic (str): 用户研究主题
+    Yields:
+        Dict: 去重后的论文元数据
+    """
+    llm = get_llm()
+    queries = run_generate_queries_chain(user_topic, llm)
+    print(f"🔍 生成 {len(queries)} 个查询: {queries}")
+
+    file_name = 'arxiv_results_raw.jsonl'
+    yield from dedup_papers(iter_arxiv(queries, file_name), streaming=True)
+
+
+# 词干提取时按顺序尝试去掉的英文后缀（近似 arXiv 检索所用的英文词干化，无需额外依赖）
+_STEM_SUFFIXES = (("ies", "y"), ("sses", "ss"), ("ing", ""), ("ed", ""), ("es", ""), ("s", ""))
+
+
+def _stem(word: str) -> str:
+    for suffix, replacement in _STEM_SUFFIXES:
+        # 保留至少 3 个字符的词干，避免 "gas"、"bus" 之类的短词被截断
+        if word.endswith(suffix) and len(word) - len(suffix) + len(replacement) >= 3 and not word.endswith("ss"):
+            return word[:len(word) - len(suffix)] + replacement
+    return word
+
+
+def text_terms(text: str) -> Set[str]:
+    """将文本切分为小写词并提取词干，用于按词匹配查询"""
+    return {_stem(word) for word in re.findall(r"[a-z0-9]+", text.lower())}
+
+
+def matches_query(paper_terms: Set[str], query: str) -> bool:
+    """
+    本地近似 arXiv 的检索语义：查询的每个词（词干）都作为完整的词出现在论文的标题或摘要中。
+    按词而非子串匹配，"card" 不会命中 "cardiac"，"network" 能命中 "networks"。
+    """
+    terms = text_terms(query)
+    return bool(terms) and terms <= paper_terms
+
+
+def assign_topics(papers: List[Dict], topic_queries: Dict[str, List[str]]) -> Dict[str, List[Dict]]:
+    """
+    把论文分配给主题。
+
+    - 以 arXiv 实际返回论文的查询（source_queries）为准：arXiv 的检索还匹配作者、评论、分类等字段，
+      本地按标题+摘要匹配会漏掉部分论文
+    - 同一窗口中多个主题的查询合并为 OR 表达式抓取，无法区分命中的是哪一个；
+      此时用本地词匹配在这些主题中缩小范围，都不匹配时分配给全部候选主题
+    - 没有来源记录的论文（旧版本保存的论文）按本地词匹配分配
+
+    Returns:
+        {主题: 论文列表}
+    """
+    query_topics = {}
+    for topic, queries in topic_queries.items():
+        for q in queries:
+            if q.strip():
+                query_topics.setdefault(normalize_query(q), []).append(topic)
+
+    topic_papers = {topic: [] for topic in topic_queries}
+    unassigned = 0
+    for paper in papers:
+        terms = text_terms(f"{paper.get('title', '')} {paper.get('abstract', '')}")
+        matched = [
+            topic for topic, queries in topic_queries.items()
+            if any(matches_query(terms, q) for q in queries if q.strip())
+        ]
+        sources = list(dict.fromkeys(
+            topic for q in paper.get("source_queries", []) for topic in query_topics.get(q, [])
+        ))
+        if len(sources) > 1:
+            sources = [topic for topic in sources if topic in matched] or sources
+        topics = list(dict.fromkeys(sources + matched))
+        if not topics:
+            unassigned += 1
+        for topic in topics:
+            topic_papers[topic].append(paper)
+    if unassigned:
+        print(f"ℹ️ {unassigned} 篇已保存论文不属于本次任何主题的查询（以往运行中其他查询抓取），未分配")
+    return topic_papers
+
+
+def paper_search_agent_batch(user_topics: List[str]) -> Tuple[List[Dict], Dict[str, List[Dict]]]:
+    """
+    多主题论文搜索 Agent：
+    1. 并发为所有主题生成 query 列表
+    2. 对所有主题 query 的并集只抓取一次（重叠的 query 只请求一次）
+    3. 按论文 ID 全局去重，再把论文分配给返回它的查询所属的主题（见 assign_topics）
+
+    Args:
+        user_topics (List[str]): 研究主题列表
+    Returns:
+        (去重后的全部论文, {主题: 该主题命中的论文})
+    """
+    llm = get_llm()
+    with ContextThreadPoolExecutor(max_workers=max(1, len(user_topics))) as executor:
+        topic_queries = dict(zip(
+            user_topics,
+            executor.map(lambda topic: run_generate_queries_chain(topic, llm), user_topics)
+        ))
+    for topic, queries in topic_queries.items():
+        print(f"🔍 [{topic}] 生成 {len(queries)} 个查询: {queries}")
+
+    all_queries = list(dict.fromkeys(
+        normalize_query(q) for queries in topic_queries.values() for q in queries if q.strip()
+    ))
+    print(f"🔗 {len(user_topics)} 个主题共 {len(all_queries)} 个不同查询，统一抓取")
+
+    file_name = 'arxiv_results_raw.jsonl'
+    unique_results = list(dedup_papers(search_arxiv(all_queries, file_name)))
+    print(f"\n📚 最终获取 {len(unique_results)} 篇论文（去重后）")
+
+    topic_papers = assign_topics(unique_results, topic_queries)
+    for topic in user_topics:
+        print(f"📎 [{topic}] 命中 {len(topic_papers[topic])} 篇论文")
+    return unique_results, topic_papers
+
+
 # ===========================
 # 示例调用
 # ===========================
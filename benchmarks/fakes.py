@@ -0,0 +1,257 @@
+# fraud_research_agent/benchmarks/fakes.py
+import re
+import ast
+import json
+import time
+import uuid
+import random
+import zlib
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+_WORDS = (
+    "fraud detection anomaly transaction graph network sequence behavior credit card payment account "
+    "risk model learning deep neural temporal attention transformer embedding federated privacy bank "
+    "insurance ecommerce phishing laundering bot fake review click identity synthetic label imbalance "
+    "explainable feature ensemble boosting tree contrastive self supervised dynamic heterogeneous user "
+    "merchant device session real time streaming large language benchmark dataset evaluation robust"
+).split()
+
+_DATA_SOURCES = ["e-commerce", "payment", "banking", "insurance", "social network", "telecom", "cryptocurrency"]
+_FRAUD_TYPES = ["credit card fraud", "money laundering", "fake reviews", "account takeover", "insurance fraud",
+                "phishing", "click fraud", "loan fraud"]
+_APPROACHES = ["GNN", "Transformer", "RNN/LSTM", "anomaly detection", "ensemble learning", "contrastive learning",
+               "federated learning", "LLM", "explainable AI", "feature engineering"]
+
+
+def _stable_hash(text: str) -> int:
+    return zlib.crc32(str(text).encode("utf-8"))
+
+
+def _pick(options: List[str], key: str, salt: str = "") -> str:
+    return options[_stable_hash(key + salt) % len(options)]
+
+
+def make_corpus(size: int, start_date: datetime = datetime(2022, 1, 1), seed: int = 0) -> List[Dict]:
+    """
+    生成确定性的合成论文语料（发表时间均匀分布在 start_date 至今），字段与 arxiv_tool._to_record 一致。
+    """
+    rng = random.Random(seed)
+    start = start_date.replace(tzinfo=timezone.utc)
+    span_seconds = max(1, int((datetime.now(timezone.utc) - start).total_seconds()) - 86400)
+    corpus = []
+    for i in range(size):
+        published = start + timedelta(seconds=rng.randrange(span_seconds))
+        title_words = rng.sample(_WORDS, 6)
+        corpus.append({
+            "id": f"{published.strftime('%y%m')}.{i:05d}v1",
+            "title": " ".join(title_words).capitalize(),
+            "authors": [f"Author {rng.randrange(10000)}" for _ in range(rng.randint(1, 5))],
+            "abstract": " ".join(rng.choices(_WORDS, k=rng.randint(80, 160))) + ".",
+            "categories": ["cs.LG"],
+            "published": published,
+            "updated": published,
+            "url": f"http://arxiv.org/pdf/{i}",
+        })
+    corpus.sort(key=lambda paper: paper["published"])
+    return corpus
+
+
+class _Author:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class FakeArxivResult:
+    """模拟 arxiv.Result 中 arxiv_tool 用到的属性"""
+
+    def __init__(self, paper: Dict):
+        self._id = paper["id"]
+        self.title = paper["title"]
+        self.authors = [_Author(name) for name in paper["authors"]]
+        self.summary = paper["abstract"]
+        self.categories = paper["categories"]
+        self.published = paper["published"]
+        self.updated = paper["updated"]
+        self.pdf_url = paper["url"]
+
+    def get_short_id(self) -> str:
+        return self._id
+
+
+class FakeArxivClient:
+    """
+    替代 arxiv.Client 的本地回放客户端：按查询中的 submittedDate 区间返回语料中的论文，
+    每次分页请求模拟 latency 秒的网络延迟。查询关键词不参与过滤（语料即抓取结果）。
+    """
+
+    corpus: List[Dict] = []
+    latency: float = 0.0
+    _dates: List[datetime] = []
+
+    def __init__(self, page_size: int = 100, delay_seconds: float = 3.0, num_retries: int = 3):
+        self.page_size = page_size
+
+    @classmethod
+    def configure(cls, corpus: List[Dict], latency: float = 0.0) -> None:
+        cls.corpus = corpus
+        cls.latency = latency
+        cls._dates = [paper["published"] for paper in corpus]
+
+    def results(self, search, offset: int = 0):
+        match = re.search(r"submittedDate:\[(\d{12}) TO (\d{12})\]", search.query)
+        start = datetime.strptime(match.group(1), "%Y%m%d%H%M").replace(tzinfo=timezone.utc)
+        end = datetime.strptime(match.group(2), "%Y%m%d%H%M").replace(tzinfo=timezone.utc) + timedelta(seconds=59)
+        lo, hi = bisect_left(self._dates, start), bisect_right(self._dates, end)
+        hi = min(hi, lo + (search.max_results or hi - lo))
+
+        index = lo + offset
+        while index < hi:
+            if self.latency:
+                time.sleep(self.latency)
+            for paper in self.corpus[index:min(index + self.page_size, hi)]:
+                yield FakeArxivResult(paper)
+            index += self.page_size
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    确定性的假 ChatModel：按提示词类型返回格式合法的输出，并模拟调用延迟与 token 用量。
+
+    - 查询生成、单篇/批量相关性判断、单次调用提取、结构化提取、类别归纳/映射均返回可解析的结果
+    - 论文是否相关由标题哈希决定，相关比例为 relevant_ratio
+    - 绑定工具后（报告 Agent）第一轮调用统计工具，收到工具结果后输出最终报告
+    """
+
+    latency: float = 0.05
+    jitter: float = 0.5
+    relevant_ratio: float = 0.3
+    seed: int = 0
+    _rng: Any = None
+    _rng_lock: Any = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark-chat"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    # ---------- 提示词分派 ----------
+    @staticmethod
+    def _papers(prompt: str) -> List[Dict]:
+        decoder = json.JSONDecoder()
+        papers = []
+        for match in re.finditer(r'\{"title":', prompt):
+            try:
+                papers.append(decoder.raw_decode(prompt, match.start())[0])
+            except ValueError:
+                continue
+        return papers
+
+    def _is_relevant(self, paper: Dict) -> int:
+        return int(_stable_hash(paper.get("title", "")) % 1000 < self.relevant_ratio * 1000)
+
+    @staticmethod
+    def _extraction(paper: Dict) -> Dict:
+        title = paper.get("title", "")
+        return {
+            "data_source_type": [_pick(_DATA_SOURCES, title)],
+            "data_source_name": [],
+            "fraud_type": _pick(_FRAUD_TYPES, title, "fraud"),
+            "technical_approach_category": sorted({_pick(_APPROACHES, title, "a"), _pick(_APPROACHES, title, "b")}),
+            "technical_approach_method": [],
+            "technical_approach_description": title,
+            "innovation_points": "",
+            "github_repo": "https://github.com/example/repo" if _stable_hash(title) % 10 == 0 else "",
+        }
+
+    @staticmethod
+    def _literal_list(prompt: str, marker: str) -> List:
+        text = prompt.split(marker, 1)[1]
+        start = text.index("[")
+        depth = 0
+        for end, char in enumerate(text[start:], start):
+            depth += {"[": 1, "]": -1}.get(char, 0)
+            if depth == 0:
+                return ast.literal_eval(text[start:end + 1])
+        return []
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        prompt = str(messages[-1].content)
+
+        if any(isinstance(message, ToolMessage) for message in messages):
+            return AIMessage(content="# 研究报告\n\n" + "\n".join(
+                str(message.content)[:200] for message in messages if isinstance(message, ToolMessage)
+            ))
+        if "论文元数据" in prompt:
+            fields = ["published", "data_source_type_clean", "fraud_type_clean", "technical_approach_category_clean"]
+            tool_calls = [
+                {"name": "count_distribution_tool", "args": {"field_type": field}, "id": uuid.uuid4().hex}
+                for field in fields
+            ]
+            tool_calls.append({"name": "crosstab_tool", "args": {"field_type": "technical_approach_category_clean"},
+                               "id": uuid.uuid4().hex})
+            tool_calls.append({"name": "growth_rate_tool", "args": {}, "id": uuid.uuid4().hex})
+            tool_calls.append({"name": "filter_nonempty_tool", "args": {"field": "github_repo"}, "id": uuid.uuid4().hex})
+            return AIMessage(content="", tool_calls=tool_calls)
+        if '"queries"' in prompt:
+            topic = re.search(r'research topic: "([^"]*)"', prompt)
+            topic = topic.group(1) if topic else "fraud detection"
+            return AIMessage(content=json.dumps({"queries": [topic, f"{topic} graph", f"{topic} sequence"]}))
+        if "JSON array of exactly" in prompt:
+            return AIMessage(content=json.dumps([self._is_relevant(p) for p in self._papers(prompt)]))
+        if "只输出 0 或 1" in prompt:
+            papers = self._papers(prompt)
+            return AIMessage(content=str(self._is_relevant(papers[0]) if papers else 0))
+        if "information extraction expert" in prompt:
+            papers = self._papers(prompt)
+            paper = papers[-1] if papers else {}
+            result = self._extraction(paper)
+            if '"relevant"' in prompt:
+                result = {"relevant": self._is_relevant(paper), **result}
+            return AIMessage(content="```json\n" + json.dumps(result, ensure_ascii=False) + "\n```")
+        if "已有" in prompt and "类别体系" in prompt:
+            taxonomy = self._literal_list(prompt, "类别体系如下：")
+            values = self._literal_list(prompt, "新的字段取值列表：")
+            return AIMessage(content=json.dumps(
+                {str(v): _pick(taxonomy, str(v)) if taxonomy else str(v) for v in values}, ensure_ascii=False
+            ))
+        if "归纳为不超过" in prompt:
+            limit = int(re.search(r"不超过 (\d+) 个", prompt).group(1))
+            values = self._literal_list(prompt, "字段取值列表：")
+            return AIMessage(content=json.dumps(
+                {str(v): f"类别{_stable_hash(str(v)) % max(1, limit)}" for v in values}, ensure_ascii=False
+            ))
+        return AIMessage(content="")
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            with self._rng_lock:
+                factor = 1 + self.jitter * (self._rng.random() * 2 - 1)
+            time.sleep(max(0.0, self.latency * factor))
+
+        message = self._respond(messages)
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        output_tokens = max(1, len(str(message.content)) // 4)
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={"token_usage": {"prompt_tokens": input_tokens, "completion_tokens": output_tokens}},
+        )
@@ -0,0 +1,235 @@
+# fraud_research_agent/benchmarks/mock_batch_server.py
+"""
+本地模拟的 OpenAI 兼容 Batch API（/v1/files 与 /v1/batches），用于离线测试批量提取模式。
+
+请求内容由确定性的 FakeChatModel 生成。示例：
+    python -m fraud_research_agent.benchmarks.mock_batch_server --port 8765
+    BATCH_API_BASE_URL=http://127.0.0.1:8765/v1 CLASSIFY_BATCH_MODE=1 python main.py --topic ...
+"""
+import re
+import json
+import time
+import uuid
+import argparse
+import threading
+import zlib
+from contextlib import contextmanager
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+from langchain_core.messages import HumanMessage
+from fraud_research_agent.benchmarks.fakes import FakeChatModel
+
+
+class MockBatchService:
+    """
+    内存中的批任务状态：上传的文件、批任务及其结果。
+
+    - 批任务创建后 processing_seconds 秒内为 in_progress，之后首次查询时执行全部请求并置为 completed
+    - failure_rate 比例的请求（按 custom_id 哈希确定）写入错误文件，用于测试失败回退
+    - 与真实 API 一样，取消后先进入 cancelling（尚无输出文件），下一次查询时置为 cancelled，
+      并为前 completed_on_cancel 比例的请求生成结果，用于测试超时后保留部分结果
+    """
+
+    def __init__(self, respond: Optional[Callable[[Dict], str]] = None,
+                 processing_seconds: float = 0.0, failure_rate: float = 0.0, completed_on_cancel: float = 0.0):
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict] = {}
+        self.processing_seconds = processing_seconds
+        self.failure_rate = failure_rate
+        self.completed_on_cancel = completed_on_cancel
+        self._model = FakeChatModel(latency=0)
+        self._respond = respond or self._fake_respond
+        self._lock = threading.RLock()
+
+    def _fake_respond(self, body: Dict) -> str:
+        prompt = body["messages"][-1]["content"]
+        return str(self._model._respond([HumanMessage(content=prompt)]).content)
+
+    def add_file(self, content: bytes, filename: str, purpose: str) -> Dict:
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        with self._lock:
+            self.files[file_id] = content
+        return {
+            "id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+            "filename": filename, "purpose": purpose, "status": "processed",
+        }
+
+    def create_batch(self, input_file_id: str, endpoint: str, completion_window: str, metadata=None) -> Dict:
+        lines = [line for line in self.files[input_file_id].decode("utf-8").splitlines() if line.strip()]
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex[:24]}", "object": "batch", "endpoint": endpoint,
+            "input_file_id": input_file_id, "completion_window": completion_window, "status": "in_progress",
+            "created_at": int(time.time()), "output_file_id": None, "error_file_id": None, "metadata": metadata,
+            "request_counts": {"total": len(lines), "completed": 0, "failed": 0},
+        }
+        with self._lock:
+            self.batches[batch["id"]] = batch
+        return batch
+
+    def _complete(self, batch: Dict, status: str = "completed", ratio: float = 1.0) -> None:
+        """执行批任务中前 ratio 比例的请求，写入输出/错误文件并置为 status"""
+        lines = [line for line in self.files[batch["input_file_id"]].decode("utf-8").splitlines() if line.strip()]
+        outputs, errors = [], []
+        for line in lines[:int(len(lines) * ratio)]:
+            request = json.loads(line)
+            custom_id = request["custom_id"]
+            if zlib.crc32(custom_id.encode("utf-8")) % 1000 < self.failure_rate * 1000:
+                errors.append({"id": f"batch_req_{uuid.uuid4().hex[:24]}", "custom_id": custom_id, "response": None,
+                               "error": {"code": "server_error", "message": "mock failure"}})
+                continue
+            body = request["body"]
+            content = self._respond(body)
+            prompt_tokens = len(body["messages"][-1]["content"]) // 4
+            completion_tokens = max(1, len(content) // 4)
+            outputs.append({
+                "id": f"batch_req_{uuid.uuid4().hex[:24]}",
+                "custom_id": custom_id,
+                "response": {
+                    "status_code": 200,
+                    "request_id": uuid.uuid4().hex,
+                    "body": {
+                        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}", "object": "chat.completion",
+                        "created": int(time.time()), "model": body.get("model", ""),
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": content}}],
+                        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                                  "total_tokens": prompt_tokens + completion_tokens},
+                    },
+                },
+                "error": None,
+            })
+
+        def _store(rows) -> Optional[str]:
+            if not rows:
+                return None
+            content = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+            return self.add_file(content, "batch_output.jsonl", "batch_output")["id"]
+
+        batch.update({
+            "status": status,
+            f"{status}_at": int(time.time()),
+            "output_file_id": _store(outputs),
+            "error_file_id": _store(errors),
+            "request_counts": {"total": len(lines), "completed": len(outputs), "failed": len(errors)},
+        })
+
+    def get_batch(self, batch_id: str) -> Optional[Dict]:
+        # 状态检查与完成处理在同一把锁内进行，并发轮询时每个批任务只执行一次
+        with self._lock:
+            batch = self.batches.get(batch_id)
+            if batch is None:
+                return None
+            if batch["status"] == "in_progress" and time.time() - batch["created_at"] >= self.processing_seconds:
+                self._complete(batch)
+            elif batch["status"] == "cancelling":
+                self._complete(batch, "cancelled", self.completed_on_cancel)
+            return dict(batch)
+
+    def cancel_batch(self, batch_id: str) -> Optional[Dict]:
+        """取消尚未完成的批任务：先置为 cancelling，下一次查询时才进入 cancelled 并生成部分结果"""
+        with self._lock:
+            batch = self.batches.get(batch_id)
+            if batch is None:
+                return None
+            if batch["status"] == "in_progress":
+                batch.update({"status": "cancelling", "cancelling_at": int(time.time())})
+            return dict(batch)
+
+
+def _make_handler(service: MockBatchService):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, payload=None, raw: Optional[bytes] = None) -> None:
+            body = raw if raw is not None else json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/octet-stream" if raw is not None else "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _not_found(self) -> None:
+            self._send(404, {"error": {"message": f"not found: {self.path}", "type": "invalid_request_error"}})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            data = self.rfile.read(length)
+            if self.path.endswith("/files"):
+                # multipart/form-data：file 与 purpose 两个字段
+                message = BytesParser(policy=default_policy).parsebytes(
+                    f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + data
+                )
+                fields = {part.get_param("name", header="content-disposition"): part for part in message.iter_parts()}
+                file_part = fields["file"]
+                self._send(200, service.add_file(
+                    file_part.get_payload(decode=True), file_part.get_filename() or "input.jsonl",
+                    fields["purpose"].get_content().strip() if "purpose" in fields else "batch"
+                ))
+            elif re.search(r"/batches/[^/]+/cancel$", self.path):
+                batch = service.cancel_batch(self.path.rsplit("/", 2)[-2])
+                if batch is not None:
+                    self._send(200, batch)
+                else:
+                    self._not_found()
+            elif self.path.endswith("/batches"):
+                request = json.loads(data or b"{}")
+                self._send(200, service.create_batch(
+                    request["input_file_id"], request["endpoint"], request["completion_window"], request.get("metadata")
+                ))
+            else:
+                self._not_found()
+
+        def do_GET(self):
+            match = re.search(r"/files/([^/]+)/content$", self.path)
+            if match and match.group(1) in service.files:
+                self._send(200, raw=service.files[match.group(1)])
+                return
+            match = re.search(r"/batches/([^/?]+)$", self.path)
+            batch = service.get_batch(match.group(1)) if match else None
+            if batch is not None:
+                self._send(200, batch)
+            else:
+                self._not_found()
+
+    return Handler
+
+
+@contextmanager
+def mock_batch_server(host: str = "127.0.0.1", port: int = 0, **service_kwargs):
+    """
+    在后台线程启动模拟服务，产出 (base_url, service)；port=0 时自动选择空闲端口。
+    """
+    service = MockBatchService(**service_kwargs)
+    server = ThreadingHTTPServer((host, port), _make_handler(service))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}/v1", service
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地模拟 OpenAI 兼容 Batch API")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--processing-seconds", type=float, default=2.0, help="批任务从创建到完成的模拟耗时")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="模拟失败的请求比例")
+    args = parser.parse_args()
+
+    with mock_batch_server(args.host, args.port, processing_seconds=args.processing_seconds,
+                           failure_rate=args.failure_rate) as (base_url, _):
+        print(f"🧪 模拟 Batch API 已启动: {base_url}（Ctrl+C 退出）")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# fraud_research_agent/benchmarks/run_benchmark.py
+"""
+离线基准测试：用确定性的假 LLM 与假 arXiv 客户端端到端运行 orchestrator，无需网络。
+
+示例：
+    python -m fraud_research_agent.benchmarks.run_benchmark --sizes 100 1000 10000 --llm-latency 0.02
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import tracemalloc
+from contextlib import contextmanager, nullcontext, redirect_stdout
+from typing import Dict, List, Optional
+import arxiv
+from langchain_core.language_models.chat_models import BaseChatModel
+from fraud_research_agent.benchmarks.fakes import FakeArxivClient, FakeChatModel, make_corpus
+from fraud_research_agent.config import settings
+from fraud_research_agent.utils import llm_utils
+from fraud_research_agent.utils.run_metrics import MetricsCallbackHandler, get_run_metrics
+
+_ORIGINAL_GET_LLM = llm_utils.get_llm
+
+
+@contextmanager
+def patched(target, name: str, value):
+    """临时替换对象属性"""
+    original = getattr(target, name)
+    setattr(target, name, value)
+    try:
+        yield
+    finally:
+        setattr(target, name, original)
+
+
+@contextmanager
+def offline_environment(llm: FakeChatModel, corpus: List[Dict], data_dir: str, arxiv_latency: float):
+    """
+    安装假 LLM 与假 arXiv 客户端，并把数据目录、缓存与指标文件指向 data_dir。
+
+    get_llm 在各模块中按名称引用，因此除 llm_utils.get_llm 外，也替换已导入模块中的引用
+    （以及模块级已初始化的 llm 实例）；在此期间新导入的模块直接绑定到假模型。
+    """
+    fake_get_llm = lambda *args, **kwargs: llm
+    fake_get_llm.benchmark_fake = True
+    FakeArxivClient.configure(corpus, arxiv_latency)
+
+    replaced = []
+    for module in list(sys.modules.values()):
+        if not getattr(module, "__name__", "").startswith("fraud_research_agent"):
+            continue
+        current = getattr(module, "get_llm", None)
+        if current is _ORIGINAL_GET_LLM or getattr(current, "benchmark_fake", False):
+            replaced.append((module, "get_llm", current))
+            module.get_llm = fake_get_llm
+        if isinstance(getattr(module, "llm", None), BaseChatModel):
+            replaced.append((module, "llm", module.llm))
+            module.llm = llm
+
+    overrides = {
+        "DATA_DIR": data_dir,
+        "LLM_CACHE_PATH": os.path.join(data_dir, "cache", "llm_cache.sqlite"),
+        "LLM_CACHE_ENABLED": False,
+        "RUN_METRICS_PATH": os.path.join(data_dir, "report", "run_metrics.json"),
+        # 假客户端无需遵守 arXiv 的请求间隔
+        "ARXIV_REQUESTS_PER_SECOND": 1000.0,
+        "CLASSIFY_INCREMENTAL": False,
+        # 基准报告中输出各提示词的 token 数与压缩节省量
+        "PROMPT_TOKEN_REPORT": True,
+    }
+    originals = {key: getattr(settings, key) for key in overrides}
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+    try:
+        with patched(arxiv, "Client", FakeArxivClient):
+            yield
+    finally:
+        for key, value in originals.items():
+            setattr(settings, key, value)
+        for module, name, value in replaced:
+            setattr(module, name, value)
+
+
+def run_once(size: int, topic: str, llm_latency: float, arxiv_latency: float, relevant_ratio: float,
+             streaming: bool = False, trace_memory: bool = False, verbose: bool = False) -> Dict:
+    """在临时数据目录中对 size 篇合成论文端到端运行一次 orchestrator，返回运行指标"""
+    llm = FakeChatModel(latency=llm_latency, relevant_ratio=relevant_ratio, callbacks=[MetricsCallbackHandler()])
+    corpus = make_corpus(size)
+
+    with tempfile.TemporaryDirectory(prefix="fra_bench_") as data_dir, \
+            offline_environment(llm, corpus, data_dir, arxiv_latency), \
+            open(os.devnull, "w") as devnull:
+        # 在替换 get_llm 之后再导入流水线，模块级初始化的 LLM 也使用假模型
+        from fraud_research_agent.agent.orchestrator import orchestrator
+
+        if trace_memory:
+            tracemalloc.start()
+        started = time.time()
+        with nullcontext() if verbose else redirect_stdout(devnull):
+            orchestrator(topic, streaming=streaming)
+        elapsed = time.time() - started
+        summary = get_run_metrics().summary()
+        if trace_memory:
+            tracemalloc.stop()
+
+    for stage in summary["stages"].values():
+        stage["throughput_papers_per_second"] = (
+            round(stage["papers_in"] / stage["wall_time_seconds"], 2)
+            if stage["papers_in"] and stage["wall_time_seconds"] else None
+        )
+    summary.pop("spans", None)
+    return {
+        "size": size,
+        "wall_time_seconds": round(elapsed, 3),
+        "papers_per_second": round(size / elapsed, 2) if elapsed else None,
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "metrics": summary,
+    }
+
+
+def print_result(result: Dict) -> None:
+    metrics = result["metrics"]
+    print(f"\n=== {result['size']} 篇论文：总耗时 {result['wall_time_seconds']}s，"
+          f"{result['papers_per_second']} 篇/秒，进程 RSS 峰值 {result['max_rss_mb']} MB ===")
+    print(f"{'阶段':<16}{'耗时(s)':>10}{'输入':>10}{'输出':>10}{'篇/秒':>12}{'内存峰值(MB)':>14}")
+    for name, stage in metrics["stages"].items():
+        print(f"{name:<16}{stage['wall_time_seconds']:>10}{stage['papers_in']:>10}{stage['papers_out']:>10}"
+              f"{str(stage['throughput_papers_per_second']):>12}{str(stage.get('peak_memory_mb', '-')):>14}")
+    llm, arxiv_stats = metrics["llm"], metrics["arxiv"]
+    print(f"LLM 调用 {llm['calls']} 次，token 输入 {llm['input_tokens']} / 输出 {llm['output_tokens']}，"
+          f"耗时分位数 {metrics['latency_percentiles']['llm']}")
+    print(f"arXiv 请求 {arxiv_stats['calls']} 个窗口，耗时分位数 {metrics['latency_percentiles']['arxiv']}")
+    for name, prompt in metrics.get("prompts", {}).items():
+        print(f"提示词 {name}: {prompt['count']} 次，平均 {prompt['avg_tokens']} tokens，"
+              f"相对未压缩节省 {prompt['saved_ratio']}，摘要截断 {prompt['truncated']} 篇")
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict]:
+    parser = argparse.ArgumentParser(description="Fraud Research Agent 离线基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="合成语料规模（篇）")
+    parser.add_argument("--topic", type=str, default="fraud detection behavior sequence", help="研究主题")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="假 LLM 单次调用延迟（秒）")
+    parser.add_argument("--arxiv-latency", type=float, default=0.01, help="假 arXiv 单页请求延迟（秒）")
+    parser.add_argument("--relevant-ratio", type=float, default=0.3, help="相关论文比例")
+    parser.add_argument("--streaming", action="store_true", help="使用流式模式")
+    parser.add_argument("--trace-memory", action="store_true", help="用 tracemalloc 统计各阶段内存峰值（会变慢）")
+    parser.add_argument("--verbose", action="store_true", help="输出流水线日志")
+    parser.add_argument("--output", type=str, default="", help="结果 JSON 保存路径")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        result = run_once(
+            size, args.topic, args.llm_latency, args.arxiv_latency, args.relevant_ratio,
+            streaming=args.streaming, trace_memory=args.trace_memory, verbose=args.verbose
+        )
+        print_result(result)
+        results.append(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n📊 基准测试结果已保存至 {args.output}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -4,4 +4,125 @@ from dotenv import load_dotenv
 load_dotenv(override=True)
 
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY", "")
-MODEL_NAME = "deepseek-chat"
\ No newline at end of file
+MODEL_NAME = "deepseek-chat"
+
+# 数据目录（raw/processed/report/cache），默认为包内 data/；基准测试等场景可指向临时目录
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+
+# 论文分类阶段的并发线程数（1 表示逐篇串行）
+CLASSIFY_MAX_WORKERS = int(os.getenv("CLASSIFY_MAX_WORKERS", "8"))
+
+# 各模型提供商的请求速率上限（次/秒），同一提供商的所有 LLM 实例共享
+LLM_REQUESTS_PER_SECOND = {
+    "deepseek": float(os.getenv("DEEPSEEK_REQUESTS_PER_SECOND", "5")),
+}
+
+# LLM HTTP 连接池：所有 LLM 请求共享一个 keep-alive 客户端（进程内最大连接数、空闲连接数与超时秒数）
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "10"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "30"))
+LLM_HTTP_CONNECT_TIMEOUT = float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", "10"))
+LLM_HTTP_READ_TIMEOUT = float(os.getenv("LLM_HTTP_READ_TIMEOUT", "120"))
+# 启用 HTTP/2（需安装 h2，未安装时自动退回 HTTP/1.1）
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "1") not in ("0", "false", "False")
+
+# LLM 调度器：所有 LLM 调用经由统一的自适应并发、退避重试、token 预算与熔断控制（设置 LLM_GOVERNOR_ENABLED=0 可关闭）
+LLM_GOVERNOR_ENABLED = os.getenv("LLM_GOVERNOR_ENABLED", "1") not in ("0", "false", "False")
+# AIMD 并发上限的初始值与范围：成功时加性增长，限流/超时/高延迟时减半
+LLM_CONCURRENCY_INITIAL = int(os.getenv("LLM_CONCURRENCY_INITIAL", "8"))
+LLM_CONCURRENCY_MIN = int(os.getenv("LLM_CONCURRENCY_MIN", "1"))
+LLM_CONCURRENCY_MAX = int(os.getenv("LLM_CONCURRENCY_MAX", "32"))
+# 单次调用耗时超过该值（秒）视为过载信号
+LLM_LATENCY_TARGET_SECONDS = float(os.getenv("LLM_LATENCY_TARGET_SECONDS", "30"))
+# 可重试错误（429、超时、连接错误、5xx）的最大重试次数与指数退避的基数/上限（秒）
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "60"))
+# 每分钟 token 预算（0 表示不限制），以及预留时对单次输出 token 的估计
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+LLM_OUTPUT_TOKENS_ESTIMATE = int(os.getenv("LLM_OUTPUT_TOKENS_ESTIMATE", "512"))
+# 熔断：连续失败次数阈值与冷却时间（秒）
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+LLM_CIRCUIT_COOLDOWN_SECONDS = float(os.getenv("LLM_CIRCUIT_COOLDOWN_SECONDS", "30"))
+
+# LLM 响应持久化缓存（设置 LLM_CACHE_ENABLED=0 可旁路缓存）
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") not in ("0", "false", "False")
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(DATA_DIR, "cache", "llm_cache.sqlite"),
+)
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000"))
+# 缓存过期时间（秒），0 表示永不过期
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# 增量分类：复用上次运行中 id 与 updated 均未变化的论文结果
+CLASSIFY_INCREMENTAL = os.getenv("CLASSIFY_INCREMENTAL", "1") not in ("0", "false", "False")
+
+# 单次调用模式：相关性判断与结构化提取合并为一次 LLM 调用（开启批量相关性筛选时不生效，需同时设置 CLASSIFY_SCREEN_BATCH_SIZE=0）
+CLASSIFY_SINGLE_PASS = os.getenv("CLASSIFY_SINGLE_PASS", "0") not in ("0", "false", "False")
+
+# 批量相关性筛选：每次 LLM 调用判断的论文数（0 或 1 表示逐篇判断）
+CLASSIFY_SCREEN_BATCH_SIZE = int(os.getenv("CLASSIFY_SCREEN_BATCH_SIZE", "50"))
+
+# 批量 API 模式：信息提取请求写入 JSONL 批任务，经 OpenAI 兼容的 Batch API 离线执行（适合夜间全量回填）
+CLASSIFY_BATCH_MODE = os.getenv("CLASSIFY_BATCH_MODE", "0") not in ("0", "false", "False")
+# Batch API 地址与密钥（留空时密钥沿用 DEEPSEEK_API_KEY），以及批任务使用的模型
+BATCH_API_BASE_URL = os.getenv("BATCH_API_BASE_URL", "")
+BATCH_API_KEY = os.getenv("BATCH_API_KEY", "")
+BATCH_MODEL = os.getenv("BATCH_MODEL", MODEL_NAME)
+# 轮询间隔与超时（秒），以及单个批任务的最大请求数（超出时拆分为多个批任务）
+BATCH_POLL_INTERVAL_SECONDS = float(os.getenv("BATCH_POLL_INTERVAL_SECONDS", "30"))
+BATCH_POLL_TIMEOUT_SECONDS = float(os.getenv("BATCH_POLL_TIMEOUT_SECONDS", str(25 * 3600)))
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "50000"))
+# 超时批任务取消后，等待其从 cancelling 进入终止状态的最长时间（秒），之后才能下载已完成部分的结果
+BATCH_CANCEL_TIMEOUT_SECONDS = float(os.getenv("BATCH_CANCEL_TIMEOUT_SECONDS", "600"))
+
+# 提示词压缩：论文只保留各提示词需要的字段、压缩空白，摘要超出 token 预算时截断（设置 PROMPT_COMPACTION=0 可关闭）
+PROMPT_COMPACTION = os.getenv("PROMPT_COMPACTION", "1") not in ("0", "false", "False")
+# 各提示词中摘要的 token 预算（0 表示不截断）；相关性判断只需摘要开头，结构化提取保留更多内容
+PROMPT_ABSTRACT_TOKENS = {
+    "relevance": int(os.getenv("RELEVANCE_ABSTRACT_TOKENS", "200")),
+    "batch_relevance": int(os.getenv("BATCH_RELEVANCE_ABSTRACT_TOKENS", "160")),
+    "single_pass": int(os.getenv("EXTRACTION_ABSTRACT_TOKENS", "400")),
+    "extraction": int(os.getenv("EXTRACTION_ABSTRACT_TOKENS", "400")),
+}
+# 统计 token 数使用的 tiktoken 编码（不可用时按字符估算）
+PROMPT_TOKENIZER_ENCODING = os.getenv("PROMPT_TOKENIZER_ENCODING", "cl100k_base")
+# 按提示词记录 token 数及相对未压缩提示词的节省量，写入运行指标（每次调用需额外构建并统计未压缩提示词，默认关闭，基准测试中开启）
+PROMPT_TOKEN_REPORT = os.getenv("PROMPT_TOKEN_REPORT", "0") not in ("0", "false", "False")
+
+# arXiv 抓取：并行抓取的时间窗口数，以及所有窗口共享的请求速率（arXiv API 约定每 3 秒不超过 1 次）
+ARXIV_MAX_WORKERS = int(os.getenv("ARXIV_MAX_WORKERS", "4"))
+ARXIV_REQUESTS_PER_SECOND = float(os.getenv("ARXIV_REQUESTS_PER_SECOND", str(1 / 3)))
+
+# 字段归类：每次 LLM 调用处理的不同取值数，取值更多时分块归纳再合并类别
+CATEGORIZE_CHUNK_SIZE = int(os.getenv("CATEGORIZE_CHUNK_SIZE", "200"))
+
+# 本地向量化模型（sentence-transformers 模型名，留空则使用字符 n-gram 哈希向量）
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "")
+# 类别体系向量检索的相似度阈值，低于阈值的取值交给 LLM 映射
+TAXONOMY_SIMILARITY_THRESHOLD = float(os.getenv("TAXONOMY_SIMILARITY_THRESHOLD", "0.8"))
+
+# 本地语义预筛选：LLM 判断相关性前先对主题与标题/摘要打余弦分（默认关闭）
+RELEVANCE_PREFILTER = os.getenv("RELEVANCE_PREFILTER", "0") not in ("0", "false", "False")
+# 低于低阈值直接丢弃、高于高阈值直接判为相关；默认值适用于 TF-IDF，配置 EMBEDDING_MODEL 时需重新调整
+RELEVANCE_LOW_THRESHOLD = float(os.getenv("RELEVANCE_LOW_THRESHOLD", "0.05"))
+RELEVANCE_HIGH_THRESHOLD = float(os.getenv("RELEVANCE_HIGH_THRESHOLD", "0.5"))
+# 每批打分的论文数
+RELEVANCE_PREFILTER_CHUNK_SIZE = int(os.getenv("RELEVANCE_PREFILTER_CHUNK_SIZE", "64"))
+
+# 近重复检测：按 MinHash 估计的标题+摘要 Jaccard 相似度合并重复论文（ID 的版本后缀总会去掉再比较）
+DEDUP_NEAR_DUPLICATES = os.getenv("DEDUP_NEAR_DUPLICATES", "1") not in ("0", "false", "False")
+DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", "0.8"))
+
+# 运行指标：各阶段耗时、LLM/arXiv 调用统计写入的 JSON 文件
+RUN_METRICS_PATH = os.getenv(
+    "RUN_METRICS_PATH",
+    os.path.join(DATA_DIR, "report", "run_metrics.json"),
+)
+# 是否在运行汇总中记录 OpenTelemetry 风格的 span（安装了 opentelemetry 时同时上报），以及最多保留的 span 数
+RUN_METRICS_SPANS = os.getenv("RUN_METRICS_SPANS", "0") not in ("0", "false", "False")
+RUN_METRICS_MAX_SPANS = int(os.getenv("RUN_METRICS_MAX_SPANS", "10000"))
+
+# 多主题批量运行：并行生成报告的主题数
+BATCH_REPORT_MAX_WORKERS = int(os.getenv("BATCH_REPORT_MAX_WORKERS", "4"))
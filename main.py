@@ -1,21 +1,55 @@
 # main.py
 import argparse
-from fraud_research_agent.agent.orchestrator import orchestrator
+
+
+def load_topics(path):
+    """从文件读取主题列表：每行一个主题，忽略空行与 # 开头的注释"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
 
 
 def main():
     parser = argparse.ArgumentParser(description="Fraud Research Agent 主程序入口")
-    parser.add_argument(
+    topic_group = parser.add_mutually_exclusive_group(required=True)
+    topic_group.add_argument(
         "--topic",
         type=str,
-        required=True,
         help="用户研究主题，例如 'fraud detection behavior sequence'"
     )
+    topic_group.add_argument(
+        "--topics",
+        type=str,
+        nargs="+",
+        help="多个研究主题，批量运行（统一抓取与去重，并行生成报告）"
+    )
+    topic_group.add_argument(
+        "--topics-file",
+        type=str,
+        help="主题列表文件，每行一个主题，批量运行"
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="流式模式：边抓取 arXiv 边分类论文"
+    )
 
     args = parser.parse_args()
 
+    # 流水线依赖（LangChain、模型客户端等）较重，解析参数之后再导入，--help 等无需加载
+    from fraud_research_agent.agent.orchestrator import batch_orchestrator, orchestrator
+
+    # 批量模式：多主题共享抓取与去重
+    if args.topics or args.topics_file:
+        topics = args.topics or load_topics(args.topics_file)
+        results = batch_orchestrator(topics)
+
+        print("\n=== 批量执行结果 ===")
+        for topic, result in results.items():
+            print(f"[{topic}] 清洗后论文数量: {len(result['clean_papers'])}")
+        return
+
     # 执行 orchestrator
-    result = orchestrator(args.topic)
+    result = orchestrator(args.topic, streaming=args.streaming)
 
     # 输出结果概要
     print("\n=== 最终执行结果 ===")
@@ -39,3 +39,66 @@ classification_prompt = Prompt(
 )
 
 
+single_pass_classification_prompt = Prompt(
+    name="academic_paper_single_pass_classification",
+    description="Relevance check and structured information extraction for an academic paper in a single call",
+    args=[
+        PromptArgument(name="query", type="str", description="User research topic"),
+        PromptArgument(name="paper", type="str", description="Paper title and abstract"),
+    ],
+    template="""
+        You are an academic paper information extraction expert. 
+        First decide whether the paper is relevant to the user query "{query}", then analyze the paper title and abstract, and output the following structured information in a **pure JSON object**, without any extra explanations or formatting.
+
+        # Output JSON Structure
+        {{
+            "relevant": 0,                    # 1 if the paper is relevant to the user query, else 0
+            "data_source_type": [],           # Data source category (industry or platform type of the data used, e.g., e-commerce, payment, banking; infer if not explicitly mentioned)
+            "data_source_name": [],           # Specific data source name (e.g., Taobao, eBay, Binance)
+            "fraud_type": "",                 # Specific fraud or risk scenario addressed (e.g., "credit card fraud", "fake account registration"); if non-fraud, specify the problem scenario
+            "technical_approach_category": [],# Broad technical categories used in the paper (e.g., feature engineering, RNN/LSTM, Transformer, GNN, anomaly detection, GAN, multimodal fusion, explainable AI); include any other relevant approaches, not limited to examples
+            "technical_approach_method": [],  # Specific technical methods used (use standard academic terms, e.g., "Bi-LSTM", "Temporal Graph Network")
+            "technical_approach_description": "",  # Core method description (objective summary from abstract, max 100 words)
+            "innovation_points": "",          # Explicit innovation points stated in abstract (max 100 words)
+            "github_repo": ""                 # GitHub repository URL if explicitly mentioned, else leave empty
+        }}
+
+        # Extraction Guidelines
+        1. Output must be **strict JSON only**, no extra text.
+        2. If the paper is not relevant, output "relevant": 0 and leave all other fields empty.
+        3. Unmentioned fields should be filled with an empty string `""` or empty list `[]` as appropriate.
+        4. Fraud type must be specific to the scenario level.
+        5. Technical approach method and description should objectively summarize the abstract content.
+        6. Innovation points should be directly based on statements in the abstract.
+        7. GitHub repo should be included only if explicitly mentioned.
+        8. Broad technical categories should be summarized freely; reference common techniques if helpful, but do not restrict to any predefined list.
+        9. List fields (`[]`) can contain **multiple items**; include **all relevant elements mentioned in the text**.
+
+        Please analyze the following paper:
+
+        Paper: {paper}  
+    """
+)
+
+
+batch_relevance_prompt = Prompt(
+    name="academic_paper_batch_relevance",
+    description="Screen a batch of academic papers for relevance to a user query in a single call",
+    args=[
+        PromptArgument(name="query", type="str", description="User research topic"),
+        PromptArgument(name="count", type="int", description="Number of papers in the batch"),
+        PromptArgument(name="papers", type="str", description="Numbered list of paper titles and abstracts"),
+    ],
+    template="""
+        You are an academic literature screening expert.
+        Decide for each of the following {count} papers whether it is relevant to the user query "{query}".
+
+        # Output Requirements
+        1. Output a **JSON array of exactly {count} integers**, one per paper, in the same order as the input.
+        2. Use 1 for relevant and 0 for not relevant, e.g. [1, 0, 1].
+        3. Output the JSON array only, without any explanations or formatting.
+
+        Papers:
+        {papers}
+    """
+)
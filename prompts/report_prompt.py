@@ -56,6 +56,9 @@ report_prompt_template = ChatPromptTemplate.from_messages([
         你必须严格使用以下工具来获取数据，不能凭空编造：
         - `count_distribution_tool`: 用于统计某个字段的分布情况。只需要传入字段名，例如：count_distribution_tool("published")
         - `filter_nonempty_tool`: 用于过滤出指定字段非空的论文。只需要传入字段名，例如：filter_nonempty_tool("github_repo")
+        - `crosstab_tool`: 按年份交叉统计某个类别字段，例如：crosstab_tool("technical_approach_category_clean")，可用于分析各类别的逐年变化
+        - `top_k_tool`: 获取某个字段数量最多的前 k 个取值，例如：top_k_tool("fraud_type_clean", 5)
+        - `growth_rate_tool`: 获取逐年数量与同比增长率；不传参数时统计全部论文，也可传入字段名与取值，例如：growth_rate_tool("technical_approach_category_clean", "GNN")
 
         ⚠️ 注意：不要传递整个论文列表作为参数，只需要传递字段名！论文数据已经预先加载到工具上下文中。
     """)
@@ -0,0 +1,47 @@
+from datetime import datetime
+from types import SimpleNamespace
+from fraud_research_agent.tools import arxiv_tool
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+        return True
+
+
+def _result(index):
+    when = datetime(2024, 1, 1)
+    return SimpleNamespace(
+        get_short_id=lambda: f"2401.{index:05d}v1", title=f"paper {index}", authors=[], summary="",
+        categories=[], published=when, updated=when, pdf_url=""
+    )
+
+
+def test_every_fetch_attempt_takes_a_rate_limiter_token(monkeypatch):
+    clients = []
+
+    class FlakyClient:
+        def __init__(self, page_size, delay_seconds, num_retries):
+            self.num_retries = num_retries
+            self.calls = 0
+            clients.append(self)
+
+        def results(self, search, offset=0):
+            self.calls += 1
+            if self.calls == 1:
+                raise ConnectionError("reset")
+            return iter([_result(i) for i in range(3)])
+
+    monkeypatch.setattr(arxiv_tool.arxiv, "Client", FlakyClient)
+    limiter = CountingLimiter()
+    papers, complete = arxiv_tool.fetch_window(
+        "fraud", datetime(2024, 1, 1), datetime(2024, 1, 31), limiter, batch_size=50, delay_seconds=0
+    )
+
+    assert complete and len(papers) == 3
+    # 客户端内部不重试，重试由外层循环完成且每次都先取令牌
+    assert clients[0].num_retries == 0
+    assert limiter.acquired == clients[0].calls == 2
@@ -0,0 +1,84 @@
+import json
+from fraud_research_agent.agent import paper_classification_agent as pca
+from fraud_research_agent.benchmarks.mock_batch_server import mock_batch_server
+from fraud_research_agent.utils import batch_client
+from fraud_research_agent.utils.batch_client import OpenAIBatchClient
+
+
+def test_timed_out_batch_is_cancelled_and_falls_back_to_realtime(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch_client.settings, "BATCH_POLL_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(batch_client.settings, "BATCH_POLL_TIMEOUT_SECONDS", 0)
+    monkeypatch.setattr(pca, "run_category_extraction_chain", lambda query, llm, paper, *args: {"fraud_type": "x"})
+
+    papers = [{"id": f"p{i}", "title": f"paper {i}", "abstract": "", "updated": "u"} for i in range(3)]
+    with mock_batch_server(processing_seconds=3600) as (base_url, service):
+        client = OpenAIBatchClient(base_url=base_url, api_key="x")
+        results = list(pca.extract_papers_batch("fraud", None, papers, 2, str(tmp_path), client=client))
+        statuses = [batch["status"] for batch in service.batches.values()]
+
+    assert statuses == ["cancelled"]
+    assert [(paper["id"], result) for paper, result in results] == [(f"p{i}", {"fraud_type": "x"}) for i in range(3)]
+
+
+def test_cancelled_batch_keeps_results_completed_before_cancellation(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch_client.settings, "BATCH_POLL_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(batch_client.settings, "BATCH_POLL_TIMEOUT_SECONDS", 0)
+
+    requests = [batch_client.build_batch_request(str(i), f"prompt {i}") for i in range(4)]
+    with mock_batch_server(processing_seconds=3600, completed_on_cancel=0.5,
+                           respond=lambda body: "ok") as (base_url, service):
+        client = OpenAIBatchClient(base_url=base_url, api_key="x")
+        # 与真实 API 一样，取消请求返回的批任务仍处于 cancelling，尚无输出文件
+        batch_id = client.submit(_write_requests(tmp_path, requests))
+        cancelling = client.client.batches.cancel(batch_id)
+        assert (cancelling.status, cancelling.output_file_id) == ("cancelling", None)
+        assert client.cancel(batch_id).status == "cancelled"
+
+        results = client.run(requests, str(tmp_path))
+
+    assert {custom_id: content for custom_id, (content, _) in results.items()} == {"0": "ok", "1": "ok"}
+
+
+def test_batches_share_one_poll_deadline(monkeypatch, tmp_path):
+    monkeypatch.setattr(batch_client.settings, "BATCH_POLL_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(batch_client.settings, "BATCH_POLL_TIMEOUT_SECONDS", 100)
+
+    timeouts = []
+    with mock_batch_server() as (base_url, _):
+        client = OpenAIBatchClient(base_url=base_url, api_key="x")
+        wait = client.wait
+
+        def spy(batch_id, poll_interval=None, timeout=None):
+            timeouts.append(timeout)
+            return wait(batch_id, poll_interval, timeout)
+
+        monkeypatch.setattr(client, "wait", spy)
+        requests = [batch_client.build_batch_request(str(i), f"prompt {i}") for i in range(3)]
+        client.run(requests, str(tmp_path), max_requests=1)
+
+    assert len(timeouts) == 3
+    assert all(0 < timeout <= 100 for timeout in timeouts)
+    assert timeouts == sorted(timeouts, reverse=True)
+
+
+def _write_requests(tmp_path, requests):
+    path = tmp_path / "requests.jsonl"
+    path.write_text("".join(json.dumps(request) + "\n" for request in requests), encoding="utf-8")
+    return str(path)
+
+
+def test_batch_submission_failure_falls_back_to_concurrent_extraction(monkeypatch, tmp_path):
+    class FailingClient:
+        def run(self, requests, work_dir):
+            raise PermissionError("invalid api key")
+
+    monkeypatch.setattr(pca.settings, "CLASSIFY_SCREEN_BATCH_SIZE", 0)
+    monkeypatch.setattr(pca, "run_category_extraction_chain", lambda query, llm, paper, *args: {"fraud_type": "x"})
+
+    papers = [{"id": f"p{i}", "title": f"paper {i}", "abstract": "", "updated": "u"} for i in range(3)]
+    previous = {"p1": {"updated": "u", "result": {}}}
+    results = list(pca.extract_papers_batch("fraud", None, papers, 2, str(tmp_path), previous, client=FailingClient()))
+
+    assert [(paper["id"], result) for paper, result in results] == [
+        ("p0", {"fraud_type": "x"}), ("p1", {}), ("p2", {"fraud_type": "x"})
+    ]
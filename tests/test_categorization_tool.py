@@ -0,0 +1,18 @@
+from langchain_core.messages import AIMessage
+from fraud_research_agent.tools import categorization_tool
+from fraud_research_agent.utils.taxonomy_store import TaxonomyStore
+
+
+def test_unparseable_llm_output_is_not_persisted_to_taxonomy(monkeypatch, tmp_path):
+    monkeypatch.setattr(categorization_tool, "governed_invoke", lambda llm, prompt: AIMessage(content="not json"))
+    monkeypatch.setattr(categorization_tool.llm_utils, "get_llm", lambda *args, **kwargs: None)
+
+    store = TaxonomyStore("fraud_type", store_dir=str(tmp_path))
+    data = [{"fraud_type": "credit card fraud"}, {"fraud_type": "phishing"}]
+    mapping = categorization_tool.build_field_mapping(data, "fraud_type", store=store)
+
+    # 本次运行按原值归类，但不写入类别体系
+    assert mapping == {"credit card fraud": "credit card fraud", "phishing": "phishing"}
+    reloaded = TaxonomyStore("fraud_type", store_dir=str(tmp_path))
+    assert reloaded.mapping == {}
+    assert reloaded.categories == []
@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+from fraud_research_agent.agent import paper_classification_agent as pca
+
+
+def _papers(count, prefix="p"):
+    return [{"id": f"{prefix}{i}", "title": f"paper {i}", "abstract": "", "updated": "u"} for i in range(count)]
+
+
+def _run(papers, previous, max_workers, screen_batch_size, timeout=30):
+    """在后台线程中消费 extract_papers_concurrently，超时视为死锁"""
+    with ThreadPoolExecutor(max_workers=1) as runner:
+        future = runner.submit(lambda: list(pca.extract_papers_concurrently(
+            "fraud", None, papers, max_workers, previous, screen_batch_size=screen_batch_size
+        )))
+        return future.result(timeout=timeout)
+
+
+def test_partial_screening_batch_followed_by_reused_papers_does_not_deadlock(monkeypatch):
+    monkeypatch.setattr(pca, "run_batch_relevance_chain", lambda query, llm, papers: [1] * len(papers))
+    monkeypatch.setattr(pca, "run_category_extraction_chain", lambda query, llm, paper, *args: {"fraud_type": "x"})
+
+    new_paper = _papers(1, prefix="new")
+    reused = _papers(3000)
+    previous = {paper["id"]: {"updated": "u", "result": {}} for paper in reused}
+
+    for max_workers, screen_batch_size in [(8, 50), (2, 5)]:
+        results = _run(new_paper + reused, previous, max_workers, screen_batch_size)
+        assert [paper["id"] for paper, _ in results] == [paper["id"] for paper in new_paper + reused]
+        assert results[0][1] == {"fraud_type": "x"}
+        assert all(result == {} for _, result in results[1:])
+
+
+def test_running_another_query_keeps_incremental_state(monkeypatch, tmp_path):
+    monkeypatch.setattr(pca.settings, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(pca, "get_llm", lambda *args, **kwargs: None)
+    monkeypatch.setattr(pca, "build_field_mapping", lambda *args, **kwargs: {})
+    monkeypatch.setattr(pca, "run_category_extraction_chain", lambda query, llm, paper, *args: {"fraud_type": query})
+
+    papers = _papers(3)
+    for query in ["topic a", "topic b"]:
+        pca.paper_classification_agent(
+            query, papers, max_workers=2, incremental=True, screen_batch_size=0, output_dir=str(tmp_path),
+            prefilter=False, batch_mode=False
+        )
+
+    save_path, ledger_path = tmp_path / "arxiv_results.json", tmp_path / "arxiv_results_ledger.jsonl"
+    for query in ["topic a", "topic b"]:
+        previous = pca.load_previous_results(query, str(save_path), str(ledger_path))
+        assert sorted(previous) == ["p0", "p1", "p2"]
+
+
+def test_failed_extraction_is_left_out_of_ledger(monkeypatch, tmp_path):
+    monkeypatch.setattr(pca.settings, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(pca, "get_llm", lambda *args, **kwargs: None)
+    monkeypatch.setattr(pca, "build_field_mapping", lambda *args, **kwargs: {})
+
+    def extract(query, llm, paper, *args):
+        if paper["id"] == "p1":
+            raise ConnectionError("retries exhausted")
+        return {"fraud_type": "x"}
+
+    monkeypatch.setattr(pca, "run_category_extraction_chain", extract)
+    pca.paper_classification_agent(
+        "topic", _papers(3), max_workers=2, incremental=True, screen_batch_size=0, output_dir=str(tmp_path),
+        prefilter=False, batch_mode=False
+    )
+
+    previous = pca.load_previous_results(
+        "topic", str(tmp_path / "arxiv_results.json"), str(tmp_path / "arxiv_results_ledger.jsonl")
+    )
+    assert sorted(previous) == ["p0", "p2"]
+
+
+def test_prefilter_drops_are_marked_and_rescreened(monkeypatch, tmp_path):
+    monkeypatch.setattr(pca.settings, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(pca, "get_llm", lambda *args, **kwargs: None)
+    monkeypatch.setattr(pca, "build_field_mapping", lambda *args, **kwargs: {})
+    monkeypatch.setattr(pca, "run_category_extraction_chain", lambda query, llm, paper, *args: {"fraud_type": "x"})
+    monkeypatch.setattr(pca, "RelevancePreFilter", lambda: FixedPreFilter({"p1"}))
+
+    pca.paper_classification_agent(
+        "topic", _papers(3), max_workers=2, incremental=True, screen_batch_size=0, output_dir=str(tmp_path),
+        prefilter=True, batch_mode=False
+    )
+
+    ledger_path = tmp_path / "arxiv_results_ledger.jsonl"
+    ledger = {entry["id"]: entry for entry in pca.read_jsonl(str(ledger_path))}
+    assert ledger["p1"]["screened_by"] == "prefilter" and not ledger["p1"]["relevant"]
+    assert "screened_by" not in ledger["p0"]
+    previous = pca.load_previous_results("topic", str(tmp_path / "arxiv_results.json"), str(ledger_path))
+    assert sorted(previous) == ["p0", "p2"]
+
+
+class FixedPreFilter:
+    """按给定 id 丢弃论文的预筛选替身"""
+
+    def __init__(self, drop_ids):
+        self.dropped = set()
+        self._drop_ids = drop_ids
+
+    def screen(self, query, papers):
+        for paper in papers:
+            if paper["id"] in self._drop_ids:
+                self.dropped.add(paper["id"])
+                yield paper, pca.DROP
+            else:
+                yield paper, pca.AMBIGUOUS
+
+    def summary(self):
+        return ""
@@ -0,0 +1,56 @@
+from fraud_research_agent.agent.paper_search_agent import assign_topics, dedup_papers, matches_query, text_terms
+
+
+def test_dedup_keeps_latest_version_at_first_seen_position():
+    papers = [
+        {"id": "2301.00001v1", "updated": "2023-01-01"},
+        {"id": "2301.00002v1", "updated": "2023-01-02"},
+        {"id": "2301.00001v3", "updated": "2023-03-01"},
+        {"id": "2301.00001v2", "updated": "2023-02-01"},
+        {"id": "2301.00002v1", "updated": "2023-05-01"},
+    ]
+    unique = list(dedup_papers(papers, near_duplicates=False))
+    assert [(paper["id"], paper["updated"]) for paper in unique] == [
+        ("2301.00001v3", "2023-03-01"), ("2301.00002v1", "2023-05-01")
+    ]
+
+    streamed = list(dedup_papers(iter(papers), near_duplicates=False, streaming=True))
+    assert [paper["id"] for paper in streamed] == ["2301.00001v1", "2301.00002v1"]
+
+
+def test_matches_query_uses_whole_stemmed_words():
+    terms = text_terms("Detecting credit card fraud with graph neural networks")
+    assert matches_query(terms, "graph neural network")
+    assert matches_query(terms, "Credit  Card Frauds")
+    assert not matches_query(terms, "card fraud sequence")
+    assert not matches_query(text_terms("Cardiac anomaly detection"), "card")
+
+
+def test_assign_topics_trusts_the_queries_that_returned_each_paper():
+    topic_queries = {"graph": ["Graph Fraud"], "phishing": ["phishing detection"]}
+    papers = [
+        # 只在作者/分类等字段命中，本地词匹配不到，但 arXiv 为 graph 主题的查询返回了它
+        {"id": "a", "title": "Anomaly scoring", "abstract": "", "source_queries": ["graph fraud"]},
+        # 同一窗口合并了两个主题的查询：用本地匹配缩小范围
+        {"id": "b", "title": "Phishing detection at scale", "abstract": "",
+         "source_queries": ["graph fraud", "phishing detection"]},
+        # 两个主题都不匹配时分配给全部候选主题
+        {"id": "c", "title": "Something else", "abstract": "",
+         "source_queries": ["graph fraud", "phishing detection"]},
+        # 没有来源记录的旧论文按本地匹配分配，不匹配的不分配
+        {"id": "d", "title": "Graph based fraud", "abstract": ""},
+        {"id": "e", "title": "Unrelated", "abstract": ""},
+    ]
+    topic_papers = assign_topics(papers, topic_queries)
+    assert [paper["id"] for paper in topic_papers["graph"]] == ["a", "c", "d"]
+    assert [paper["id"] for paper in topic_papers["phishing"]] == ["b", "c"]
+
+
+def test_dedup_merges_source_queries_of_duplicate_records():
+    papers = [
+        {"id": "2301.00001v1", "updated": "1", "source_queries": ["graph fraud"]},
+        {"id": "2301.00001v2", "updated": "2", "source_queries": ["phishing detection"]},
+    ]
+    (paper,) = dedup_papers(papers, near_duplicates=False)
+    assert paper["id"] == "2301.00001v2"
+    assert paper["source_queries"] == ["graph fraud", "phishing detection"]
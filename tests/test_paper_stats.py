@@ -0,0 +1,28 @@
+import pytest
+from fraud_research_agent.utils.columnar_store import ColumnarPaperStore
+from fraud_research_agent.utils.paper_stats import PaperStatistics
+
+
+def _stats():
+    papers = [
+        {"published": "2019-05-01", "fraud_type_clean": "phishing"},
+        {"published": "2019-06-01", "fraud_type_clean": "phishing"},
+        {"published": "2021-01-01", "fraud_type_clean": "credit card fraud"},
+        {"published": "2022-01-01", "fraud_type_clean": "phishing"},
+    ]
+    return PaperStatistics(ColumnarPaperStore(papers))
+
+
+def test_growth_fills_missing_years_with_zero():
+    assert _stats().growth("fraud_type_clean", "phishing") == {
+        "2019": {"count": 2, "growth_rate": None},
+        "2020": {"count": 0, "growth_rate": -1.0},
+        "2021": {"count": 0, "growth_rate": None},
+        "2022": {"count": 1, "growth_rate": None},
+    }
+    assert _stats().growth()["2020"] == {"count": 0, "growth_rate": -1.0}
+
+
+def test_growth_requires_value_when_field_is_given():
+    with pytest.raises(ValueError):
+        _stats().growth("fraud_type_clean")
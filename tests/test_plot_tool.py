@@ -0,0 +1,14 @@
+import pytest
+from fraud_research_agent.tools.plot_tool import plot_histogram_tool
+from fraud_research_agent.utils.global_state import report_session
+
+pytest.importorskip("matplotlib")
+
+
+def test_plots_are_saved_to_the_session_report_dir(tmp_path):
+    for topic in ["a", "b"]:
+        with report_session([], report_dir=str(tmp_path / topic)):
+            plot_histogram_tool.invoke({"stats": {"2023": 1}, "title": "year_distribution", "save_dir": "data/report"})
+
+    assert (tmp_path / "a" / "year_distribution.png").exists()
+    assert (tmp_path / "b" / "year_distribution.png").exists()
@@ -0,0 +1,14 @@
+from fraud_research_agent.utils import prompt_compaction
+
+
+def test_fallback_estimate_counts_cjk_characters_as_tokens(monkeypatch):
+    monkeypatch.setattr(prompt_compaction, "_get_encoding", lambda: None)
+
+    assert prompt_compaction.count_tokens("abcdefgh") == 2
+    assert prompt_compaction.count_tokens("信用卡欺诈检测") == 7
+    assert prompt_compaction.count_tokens("GNN 信用卡欺诈") == 6
+
+    text = "这是一段很长的中文摘要" * 20
+    head, truncated = prompt_compaction.truncate_to_tokens(text, 50)
+    assert truncated
+    assert prompt_compaction.count_tokens(head) <= 51  # 含截断标记
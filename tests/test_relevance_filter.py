@@ -0,0 +1,30 @@
+from fraud_research_agent.utils.relevance_filter import DROP, RelevancePreFilter, TfidfScorer
+
+
+def _papers():
+    texts = ["credit card fraud detection", "graph neural network fraud", "protein folding",
+             "phishing email detection", "image segmentation"] * 4
+    return [{"id": f"p{i}", "title": text, "abstract": ""} for i, text in enumerate(texts)]
+
+
+def test_tfidf_score_does_not_depend_on_chunk():
+    texts = [f"{paper['title']} {paper['abstract']}" for paper in _papers()]
+    scorer = TfidfScorer()
+    scorer.fit(texts)
+
+    together = scorer.score("fraud detection", texts)
+    alone = [scorer.score("fraud detection", [text])[0] for text in texts]
+    assert together.tolist() == alone
+    assert scorer.n_docs == len(texts)
+
+
+def test_screening_a_list_fits_idf_on_the_whole_list():
+    papers = _papers()
+    verdicts = {}
+    for chunk_size in [2, len(papers)]:
+        prefilter = RelevancePreFilter(low=0.05, high=0.9, chunk_size=chunk_size)
+        prefilter.scorer = TfidfScorer()
+        verdicts[chunk_size] = [verdict for _, verdict in prefilter.screen("fraud detection", papers)]
+        assert prefilter.dropped == {paper["id"] for paper, verdict in zip(papers, verdicts[chunk_size])
+                                     if verdict == DROP}
+    assert verdicts[2] == verdicts[len(papers)]
@@ -0,0 +1,53 @@
+import threading
+from contextlib import contextmanager
+import pytest
+from fraud_research_agent.utils import run_metrics
+from fraud_research_agent.utils.context_utils import ContextThreadPoolExecutor
+
+
+def test_concurrent_runs_keep_their_own_metrics():
+    barrier = threading.Barrier(2)
+    results = {}
+
+    def run(name, calls):
+        metrics = run_metrics.start_run(name)
+        barrier.wait()
+        with ContextThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda _: run_metrics.get_run_metrics().record_llm_retry(), range(calls)))
+        results[name] = (metrics, run_metrics.get_run_metrics())
+
+    threads = [threading.Thread(target=run, args=(name, calls)) for name, calls in [("a", 3), ("b", 5)]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for name, calls in [("a", 3), ("b", 5)]:
+        started, current = results[name]
+        assert current is started
+        assert started.llm["retries"] == calls
+
+
+def test_span_passes_exception_to_otel():
+    exits = []
+
+    class Tracer:
+        @contextmanager
+        def _span(self):
+            try:
+                yield
+            except BaseException as e:
+                exits.append(e)
+                raise
+
+        def start_as_current_span(self, name, attributes=None):
+            return self._span()
+
+    metrics = run_metrics.RunMetrics(record_spans=True)
+    metrics._tracer = Tracer()
+    with pytest.raises(ValueError):
+        with metrics.span("failing"):
+            raise ValueError("boom")
+
+    assert [type(e) for e in exits] == [ValueError]
+    assert metrics.spans[-1]["status"] == "error"
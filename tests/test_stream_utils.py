@@ -0,0 +1,20 @@
+import threading
+from fraud_research_agent.utils.stream_utils import bounded_prefetch
+
+
+def test_producer_exits_and_closes_source_when_consumer_stops():
+    closed = threading.Event()
+
+    def source():
+        try:
+            for i in range(100):
+                yield i
+        finally:
+            closed.set()
+
+    stream = bounded_prefetch(source(), maxsize=1)
+    assert next(stream) == 0
+    stream.close()
+
+    # 队列已满、生产者正等待放入时，消费端停止后生产者仍能退出并关闭源生成器
+    assert closed.wait(timeout=5)
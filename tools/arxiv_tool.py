@@ -1,112 +1,244 @@
 import os
 import arxiv
-import json
 import time
+from concurrent.futures import FIRST_COMPLETED, wait
 from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterator, List, Tuple
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from fraud_research_agent.config import settings
+from fraud_research_agent.utils.context_utils import ContextThreadPoolExecutor
+from fraud_research_agent.utils.paper_store import RawPaperStore
+from fraud_research_agent.utils.run_metrics import get_run_metrics
+
+
+def _to_record(result) -> Dict:
+    """将 arxiv.Result 转为论文元数据字典"""
+    return {
+        "id": result.get_short_id(),
+        "title": result.title,
+        "authors": [a.name for a in result.authors],
+        "abstract": result.summary,
+        "categories": result.categories,
+        "published": result.published.isoformat(),
+        "updated": result.updated.isoformat(),
+        "url": result.pdf_url
+    }
+
+
+def fetch_window(
+    query_keywords: str,
+    window_start: datetime,
+    window_end: datetime,
+    rate_limiter: InMemoryRateLimiter,
+    batch_size: int = 50,
+    max_retries: int = 3,
+    delay_seconds: float = 3
+) -> Tuple[List[Dict], bool]:
+    """
+    抓取单个时间窗口内的全部论文。
+
+    每个窗口使用独立的 arxiv.Client，请求间隔由共享的 rate_limiter 统一控制，
+    因此失败重试的等待只阻塞当前窗口，不影响其他窗口。arxiv.Client 自身不重试
+    （其内部重试没有间隔，也不经过 rate_limiter），每页最多重试 max_retries 次，每次请求前都先取令牌。
+
+    Returns:
+        (窗口内论文列表, 是否完整抓取)；有分页多次重试仍失败时为不完整
+    """
+    started = time.time()
+    client = arxiv.Client(page_size=batch_size, delay_seconds=0, num_retries=0)
+    time_filter = f" AND submittedDate:[{window_start.strftime('%Y%m%d0000')} TO {window_end.strftime('%Y%m%d2359')}]"
+    # search_query = query + time_filter + category_filter
+    search_query = query_keywords + time_filter
+
+    search = arxiv.Search(
+        query=search_query,
+        max_results=batch_size * 100,  # 设置足够大，分批抓取
+        sort_by=arxiv.SortCriterion.SubmittedDate
+    )
+
+    window_results = []
+    complete = True
+    offset = 0
+    total_retries = 0
+    while True:
+        batch = []
+        retries = 0
+        while retries <= max_retries:
+            try:
+                rate_limiter.acquire()
+                results_iter = client.results(search, offset=offset)
+                batch = []
+                for i, result in enumerate(results_iter):
+                    batch.append(_to_record(result))
+                    if len(batch) >= batch_size:
+                        break
 
-def search_arxiv(
+                if not batch:
+                    # 空页结束当前时间窗口
+                    break
+
+                window_results.extend(batch)
+                print(f"✅ [{window_start.date()} -> {window_end.date()}] 已抓取 {len(batch)} 篇 (offset={offset})")
+                offset += len(batch)
+                break  # 成功跳出重试
+
+            except Exception as e:
+                retries += 1
+                if retries > max_retries:
+                    print(f"⚠️ 抓取失败: {e}")
+                    continue
+                total_retries += 1
+                wait_time = delay_seconds * 2 ** retries
+                print(f"⚠️ 抓取失败: {e}, 重试 {retries}/{max_retries}, 等待 {wait_time} 秒...")
+                time.sleep(wait_time)
+        else:
+            print(f"❌ 多次重试仍失败，跳过 offset={offset}")
+            offset += batch_size
+            complete = False
+
+        # 当抓取结果少于 batch_size，说明该窗口抓完
+        if len(batch) < batch_size:
+            break
+
+    finished = time.time()
+    metrics = get_run_metrics()
+    metrics.record_arxiv_call(finished - started, len(window_results), total_retries, complete)
+    metrics.record_span("arxiv.fetch_window", started, finished, {
+        "window_start": window_start.isoformat(), "window_end": window_end.isoformat(),
+        "papers": len(window_results), "retries": total_retries, "complete": complete
+    })
+    return window_results, complete
+
+
+def normalize_query(query: str) -> str:
+    """规范化查询词（小写、合并空白），作为抓取覆盖范围的记录键"""
+    return " ".join(query.lower().split())
+
+
+def build_query_keywords(queries: List[str]) -> str:
+    """将多个查询词拼接为 arXiv 的 OR 表达式"""
+    return '(('+') OR ('.join([' AND '.join(i.split(' ')) for i in queries])+'))'
+
+
+def missing_ranges(
+    covered: List[Tuple[datetime, datetime]],
+    start: datetime,
+    end: datetime
+) -> List[Tuple[datetime, datetime]]:
+    """计算 [start, end] 中未被已覆盖区间（已排序、已合并）覆盖的时间段"""
+    missing = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            missing.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+def iter_arxiv(
     query,
     file_name,
     batch_size=50,
     start_date=datetime(2022, 1, 1),
     max_retries=3,
     delay_seconds=3,
-    window_days=30
-):
-    """
-    自动按时间窗口抓取 Arxiv 论文，直到最新
+    window_days=30,
+    max_workers=None,
+    requests_per_second=None
+) -> Iterator[Dict]:
     """
+    自动按时间窗口抓取 Arxiv 论文，直到最新，以生成器形式逐篇产出
 
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(current_dir, '..', 'data', 'raw')
-    save_path = os.path.join(file_path, file_name)
+    先产出已保存的论文，再在每个时间窗口完成时产出新抓取的论文，下游无需等待全部窗口抓完。
 
+    每个规范化查询词在旁路 manifest 中记录已完整抓取的时间区间，只抓取缺失部分，
+    新增查询词会补抓其完整历史。各时间窗口分发给小型线程池并行抓取，所有请求共享
+    一个令牌桶限速器（默认遵守 arXiv API 每 3 秒一次请求的约定）；结果追加写入
+    JSONL（file_name）。在途窗口数不超过 2 * max_workers，下游消费慢时抓取随之放缓。
+    新抓取的论文带有 source_queries 字段：返回该论文的时间窗口所抓取的规范化查询词。
+    """
 
-    client = arxiv.Client(page_size=batch_size, delay_seconds=delay_seconds, num_retries=max_retries)
+    file_path = os.path.join(settings.DATA_DIR, 'raw')
+    save_path = os.path.join(file_path, file_name)
 
-    # 读取已有结果，支持断点续抓
-    try:
-        with open(save_path, "r", encoding="utf-8") as f:
-            all_results = json.load(f)
-            if all_results:
-                # 已抓取的最新时间
-                latest_date = max(datetime.fromisoformat(p['published']) for p in all_results)
-                start_date = latest_date + timedelta(seconds=1)
-    except FileNotFoundError:
-        all_results = []
+    if max_workers is None:
+        max_workers = settings.ARXIV_MAX_WORKERS
+    max_workers = max(1, max_workers)
+    if requests_per_second is None:
+        requests_per_second = settings.ARXIV_REQUESTS_PER_SECOND
+    rate_limiter = InMemoryRateLimiter(
+        requests_per_second=requests_per_second,
+        check_every_n_seconds=0.1,
+        max_bucket_size=1,
+    )
 
-    query_keywords = '(('+') OR ('.join([' AND '.join(i.split(' ')) for i in query])+'))'
-    print("query_keywords: ", query_keywords)
     # category_filter = ' AND cat:cs'
-    
+
+    # 按规范化查询词分别读取已抓取的时间区间，只抓取各自缺失的部分（无需加载已有论文）
+    store = RawPaperStore(save_path)
+    queries = list(dict.fromkeys(normalize_query(q) for q in query if q.strip()))
     today = datetime.utcnow()
-    current_start = start_date
 
-    while current_start < today:
-        current_end = min(current_start + timedelta(days=window_days), today)
-        time_filter = f" AND submittedDate:[{current_start.strftime('%Y%m%d0000')} TO {current_end.strftime('%Y%m%d2359')}]"
-        # search_query = query + time_filter + category_filter
-        search_query = query_keywords + time_filter
+    # 缺失时间段切分为窗口；同一窗口缺失的查询词合并为一个 OR 表达式一起抓取
+    window_queries = {}
+    for q in queries:
+        for range_start, range_end in missing_ranges(store.get_coverage(q), start_date, today):
+            current_start = range_start
+            while current_start < range_end:
+                current_end = min(current_start + timedelta(days=window_days), range_end)
+                window_queries.setdefault((current_start, current_end), []).append(q)
+                current_start = current_end
+    windows = sorted(window_queries)
+
+    # 先产出已保存的论文（在追加新窗口之前读取）
+    yield from store.iter_records()
+
+    print(f"\n⏳ {len(queries)} 个查询词共缺失 {len(windows)} 个时间窗口，使用 {max_workers} 个线程并行抓取")
+    remaining = iter(windows)
+    futures = {}
+    with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            for window in islice(remaining, max_workers * 2 - len(futures)):
+                future = executor.submit(
+                    fetch_window, build_query_keywords(window_queries[window]), window[0], window[1],
+                    rate_limiter, batch_size, max_retries, delay_seconds
+                )
+                futures[future] = window
+            if not futures:
+                break
 
-        print(f"\n⏳ 抓取时间窗口: {current_start.date()} -> {current_end.date()}")
+            # 窗口完成即追加保存；只有完整抓取的窗口才记入各查询词的覆盖区间
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                window_start, window_end = futures.pop(future)
+                window_results, complete = future.result()
+                # 记录返回该论文的查询词（窗口内各查询词合并为 OR 表达式，论文至少命中其中之一），供按主题分配
+                for record in window_results:
+                    record["source_queries"] = window_queries[(window_start, window_end)]
+                print(f"📦 时间窗口 {window_start.date()} -> {window_end.date()} 完成，共 {len(window_results)} 篇")
+                store.append(window_results)
+                if complete:
+                    store.add_coverage(window_queries[(window_start, window_end)], window_start, window_end)
+                yield from window_results
 
-        search = arxiv.Search(
-            query=search_query,
-            max_results=batch_size * 100,  # 设置足够大，分批抓取
-            sort_by=arxiv.SortCriterion.SubmittedDate
-        )
+    print(f"\n🎉 抓取完成，已保存到 {save_path}")
 
-        offset = 0
-        while True:
-            retries = 0
-            while retries < max_retries:
-                try:
-                    results_iter = client.results(search, offset=offset)
-                    batch = []
-                    for i, result in enumerate(results_iter):
-                        batch.append({
-                            "id": result.get_short_id(),
-                            "title": result.title,
-                            "authors": [a.name for a in result.authors],
-                            "abstract": result.summary,
-                            "categories": result.categories,
-                            "published": result.published.isoformat(),
-                            "updated": result.updated.isoformat(),
-                            "url": result.pdf_url
-                        })
-                        if len(batch) >= batch_size:
-                            break
-
-                    if not batch:
-                        # 空页结束当前时间窗口
-                        break
 
-                    # 保存增量结果
-                    all_results.extend(batch)
-                    with open(save_path, "w", encoding="utf-8") as f:
-                        json.dump(all_results, f, ensure_ascii=False, indent=2)
-                    
-                    print(f"✅ 已抓取 {len(batch)} 篇 (offset={offset})")
-                    offset += len(batch)
-                    time.sleep(delay_seconds)
-                    break  # 成功跳出重试
-
-                except Exception as e:
-                    retries += 1
-                    wait_time = delay_seconds * 2 ** retries
-                    print(f"⚠️ 抓取失败: {e}, 重试 {retries}/{max_retries}, 等待 {wait_time} 秒...")
-                    time.sleep(wait_time)
-            else:
-                print(f"❌ 多次重试仍失败，跳过 offset={offset}")
-                offset += batch_size
-
-            # 当抓取结果少于 batch_size，说明该窗口抓完
-            if len(batch) < batch_size:
-                break
-
-        current_start = current_end
+def search_arxiv(query, file_name, **kwargs) -> List[Dict]:
+    """
+    自动按时间窗口抓取 Arxiv 论文，直到最新，返回已保存的全部论文
 
-    print(f"\n🎉 抓取完成，总共 {len(all_results)} 篇论文，已保存到 {save_path}")
+    参数同 iter_arxiv。
+    """
+    all_results = list(iter_arxiv(query, file_name, **kwargs))
+    print(f"🎉 总共 {len(all_results)} 篇论文")
     return all_results
 
 
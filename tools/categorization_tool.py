@@ -1,47 +1,45 @@
 # tools/categorization_tool.py
 import json
 import traceback
-from typing import List, Dict, Literal
+from typing import List, Dict, Literal, Optional, Set, Tuple
 from langchain.tools import tool
+from fraud_research_agent.config import settings
 from fraud_research_agent.utils import llm_utils
+from fraud_research_agent.utils.context_utils import ContextThreadPoolExecutor
+from fraud_research_agent.utils.llm_governor import governed_invoke
+from fraud_research_agent.utils.taxonomy_store import TaxonomyStore
 
 
-llm = llm_utils.get_llm()
 
+def _parse_mapping_response(response) -> Optional[Dict[str, str]]:
+    """解析 LLM 返回的 JSON 映射表，失败返回 None"""
+    try:
+        response_str = response.content if hasattr(response, "content") else str(response)
+        # 去掉前后空格
+        response_str = response_str.strip()
+    
+        # 如果返回 JSON 被 ```json 包裹，去掉 ```json ``` 前后标记
+        if response_str.startswith("```json"):
+            response_str = "\n".join(response_str.split("\n")[1:-1])
 
-def categorize_and_map_field(
-    data: List[Dict],
-    field: str,
-    new_field: str,
-    max_categories: int = 20
-) -> Dict[str, any]:
-    """
-    LLM 将字段分成不超过 max_categories 类别，并生成新字段
-    输入:
-        - data: JSON list
-        - field: 原始字段
-        - new_field: 新字段名
-        - max_categories: 最大类别数
-    输出:
-        {
-            "mapping": {原始值: 类别名},
-            "data": 新字段已生成的数据列表
-        }
+        mapping = json.loads(response_str)
+        if not isinstance(mapping, dict):
+            raise ValueError(f"映射结果不是 JSON 对象: {mapping}")
+        return mapping
+    except Exception as e:
+        print("[ERROR] JSON 解析失败:", e)
+        print("[RAW RESPONSE]", response)  # 打印 LLM 原始输出
+        traceback.print_exc()  # 打印完整堆栈，便于定位
+        return None
+
+
+def _cluster_chunk(field: str, values: List[str], max_categories: int) -> Tuple[Dict[str, str], List[str]]:
     """
-    # 1. 收集原始值（list 类型展开）
-    raw_values = []
-    for record in data:
-        value = record.get(field)
-        if value is None:
-            continue
-        if isinstance(value, list):
-            raw_values.extend(value)
-        else:
-            raw_values.append(value)
-    raw_values = list(set(raw_values))
-    print(raw_values)
+    LLM 将一组取值归纳为不超过 max_categories 个类别。
 
-    # 2. LLM 生成类别映射
+    Returns:
+        (映射, 解析失败的取值)；解析失败时每个值单独成一类，仅供本次运行使用
+    """
     prompt = f"""
         你是一名学术研究分析助手。
         请将以下 {field} 字段的取值，归纳为不超过 {max_categories} 个简洁类别：
@@ -55,29 +53,150 @@ def categorize_and_map_field(
         3. 不要输出解释说明或额外文字。
 
         字段取值列表：
-        {raw_values}
+        {values}
     """
-    response = llm.invoke(prompt)
-    try:
-        response_str = response.content if hasattr(response, "content") else str(response)
-        # 去掉前后空格
-        response_str = response_str.strip()
-    
-        # 如果返回 JSON 被 ```json 包裹，去掉 ```json ``` 前后标记
-        if response_str.startswith("```json"):
-            response_str = "\n".join(response_str.split("\n")[1:-1])
+    mapping = _parse_mapping_response(governed_invoke(llm_utils.get_llm(), prompt))
+    # fallback: 每个值单独成一类
+    return (mapping, []) if mapping is not None else ({v: v for v in values}, list(values))
 
-        mapping = json.loads(response_str)
-    except Exception as e:
-        print("[ERROR] JSON 解析失败:", e)
-        print("[RAW RESPONSE]", response)  # 打印 LLM 原始输出
-        traceback.print_exc()  # 打印完整堆栈，便于定位
-        # fallback: 每个值单独成一类
-        mapping = {v: v for v in raw_values}
 
-    # 3. 生成新字段
-    new_data = []
-    # 直接在原始 data 上添加新字段
+def _map_chunk_to_taxonomy(field: str, values: List[str], taxonomy: List[str]) -> Tuple[Dict[str, str], List[str]]:
+    """
+    LLM 将一组新取值映射到已有类别体系中。
+
+    Returns:
+        (映射, 解析失败的取值)；解析失败时每个值映射为自身，仅供本次运行使用
+    """
+    prompt = f"""
+        你是一名学术研究分析助手。
+        已有 {field} 字段的类别体系如下：
+        {taxonomy}
+
+        请将以下新的字段取值逐一映射到上述类别之一：
+        - 优先使用已有类别，类别名称必须与上面完全一致。
+        - 只有确实无法归入任何已有类别时，才新建一个简短清晰的类别。
+
+        输出要求：
+        1. 结果必须是严格合法的 JSON 对象。
+        2. 格式为：{{ "原始值": "类别" }} 的映射表。
+        3. 不要输出解释说明或额外文字。
+
+        新的字段取值列表：
+        {values}
+    """
+    mapping = _parse_mapping_response(governed_invoke(llm_utils.get_llm(), prompt))
+    return (mapping, []) if mapping is not None else ({v: v for v in values}, list(values))
+
+
+def build_category_mapping(
+    field: str,
+    raw_values: List[str],
+    max_categories: int = 20,
+    chunk_size: Optional[int] = None,
+    taxonomy: Optional[List[str]] = None,
+    failed: Optional[Set[str]] = None
+) -> Dict[str, str]:
+    """
+    分块（map-reduce）构建 {原始值: 类别} 映射，单次提示词规模与总取值数无关。
+
+    - 有已有类别体系 taxonomy 时：分块将取值映射到已有类别
+    - 否则 map：每块独立归纳为不超过 max_categories 个类别；
+      reduce：各块类别标签超过 max_categories 时，对标签本身递归归纳并规范化，再与块内映射复合
+
+    Args:
+        field: 字段名
+        raw_values: 去重后的原始取值
+        max_categories: 最大类别数
+        chunk_size: 每次 LLM 调用处理的取值数
+        taxonomy: 已有类别列表
+        failed: 传入集合时，收集 LLM 输出无法解析、按自身临时归类的原始值（不应写入类别体系）
+    Returns:
+        {原始值: 类别}
+    """
+    if chunk_size is None:
+        chunk_size = settings.CATEGORIZE_CHUNK_SIZE
+    chunk_size = max(1, chunk_size)
+    chunks = [raw_values[i:i + chunk_size] for i in range(0, len(raw_values), chunk_size)]
+    if not chunks:
+        return {}
+
+    with ContextThreadPoolExecutor(max_workers=max(1, settings.CLASSIFY_MAX_WORKERS)) as executor:
+        if taxonomy:
+            chunk_mappings = executor.map(lambda chunk: _map_chunk_to_taxonomy(field, chunk, taxonomy), chunks)
+        else:
+            chunk_mappings = executor.map(lambda chunk: _cluster_chunk(field, chunk, max_categories), chunks)
+        mapping = {}
+        chunk_failed = set()
+        for chunk_mapping, chunk_failed_values in chunk_mappings:
+            mapping.update(chunk_mapping)
+            chunk_failed.update(chunk_failed_values)
+
+    if taxonomy or len(chunks) == 1:
+        if failed is not None:
+            failed.update(chunk_failed)
+        return mapping
+
+    # reduce：合并各块产生的类别标签
+    labels = sorted(set(str(label) for label in mapping.values()))
+    if len(labels) <= max_categories or len(labels) >= len(raw_values):
+        # 已满足类别数，或类别数不再收敛（LLM 未能归并）时停止
+        if failed is not None:
+            failed.update(chunk_failed)
+        return mapping
+    print(f"{field}: {len(chunks)} 块共产生 {len(labels)} 个类别，合并为不超过 {max_categories} 个")
+    label_failed = set()
+    label_mapping = build_category_mapping(field, labels, max_categories, chunk_size, failed=label_failed)
+    if failed is not None:
+        # 块内解析失败的取值若在合并阶段被成功归类，则不再视为失败
+        failed.update(value for value in chunk_failed if str(mapping[value]) in label_failed)
+    return {value: label_mapping.get(str(label), label) for value, label in mapping.items()}
+
+
+def build_field_mapping(
+    data: List[Dict],
+    field: str,
+    max_categories: int = 20,
+    chunk_size: Optional[int] = None,
+    taxonomy: Optional[List[str]] = None,
+    store: Optional[TaxonomyStore] = None
+) -> Dict:
+    """
+    为字段构建 {原始值: 类别} 映射，不修改 data（可与其他字段并发执行）。
+
+    参数同 categorize_and_map_field。
+    """
+    # 1. 收集原始值（list 类型展开）
+    raw_values = []
+    for record in data:
+        value = record.get(field)
+        if value is None:
+            continue
+        if isinstance(value, list):
+            raw_values.extend(value)
+        else:
+            raw_values.append(value)
+    raw_values = sorted(set(raw_values), key=str)
+    print(f"{field}: {len(raw_values)} 个不同取值")
+
+    # 2. 先用持久化类别体系解析，仅剩余取值交给 LLM 生成类别映射（分块 map-reduce）
+    mapping = {}
+    if store is not None:
+        mapping, raw_values = store.resolve(raw_values)
+        print(f"{field}: 类别体系解析 {len(mapping)} 个，待 LLM 映射 {len(raw_values)} 个")
+        taxonomy = taxonomy or store.categories or None
+
+    failed = set()
+    mapping.update(build_category_mapping(field, raw_values, max_categories, chunk_size, taxonomy, failed))
+    if failed:
+        print(f"⚠️ {field}: {len(failed)} 个取值的 LLM 输出解析失败，本次按原值归类，不写入类别体系")
+    if store is not None:
+        # 向量检索与 LLM 的结果一并写回，下次运行可直接精确匹配；解析失败的临时归类不持久化，下次重新交给 LLM
+        store.update({value: category for value, category in mapping.items() if value not in failed})
+    return mapping
+
+
+def apply_field_mapping(data: List[Dict], field: str, new_field: str, mapping: Dict) -> List[Dict]:
+    """按映射在原始 data 上生成新字段"""
     for record in data:
         value = record.get(field)
         if value is None:
@@ -86,9 +205,35 @@ def categorize_and_map_field(
             record[new_field] = [mapping.get(v, v) for v in value]
         else:
             record[new_field] = mapping.get(value, value)
+    return data
 
 
+def categorize_and_map_field(
+    data: List[Dict],
+    field: str,
+    new_field: str,
+    max_categories: int = 20,
+    chunk_size: Optional[int] = None,
+    taxonomy: Optional[List[str]] = None,
+    store: Optional[TaxonomyStore] = None
+) -> Dict[str, any]:
+    """
+    LLM 将字段分成不超过 max_categories 类别，并生成新字段
+    输入:
+        - data: JSON list
+        - field: 原始字段
+        - new_field: 新字段名
+        - max_categories: 最大类别数
+        - chunk_size: 每次 LLM 调用处理的取值数（取值很多时分块归纳再合并）
+        - taxonomy: 已有类别列表，提供时将取值增量映射到已有类别
+        - store: 该字段的持久化类别体系；已见取值精确匹配、相似取值向量检索，仅剩余取值调用 LLM
+    输出:
+        {
+            "mapping": {原始值: 类别名},
+            "data": 新字段已生成的数据列表
+        }
+    """
+    mapping = build_field_mapping(data, field, max_categories, chunk_size, taxonomy, store)
+    # 直接在原始 data 上添加新字段
+    data = apply_field_mapping(data, field, new_field, mapping)
     return {"mapping": mapping, "data": data}
-
-
-
@@ -111,81 +111,21 @@
 # #     print(count_distribution_tool("published_date", papers))  # -> {2023: 2, 2024: 1}
 
 
-from typing import List, Dict, Optional
-from datetime import datetime
-from collections import Counter
+from typing import Dict, Optional
 from langchain.tools import tool
 from pydantic import BaseModel, Field
-from fraud_research_agent.utils.global_state import get_global_papers
+from fraud_research_agent.utils.global_state import get_paper_stats
 
-# 全局变量，用于存储论文数据
-# global_papers = []
-global_papers = get_global_papers()
 
 class DistributionCounter:
-    def __init__(self):
-        # 不再需要传入数据，使用全局变量
-        pass
+    def __init__(self, stats=None):
+        # 不传入时在每次统计时读取当前论文集合的统计缓存
+        self.stats = stats
 
     def count_distribution(self, field: str, strategy: Optional[str] = None) -> Dict[str, int]:
-        """核心统计逻辑"""
-        values = []
-        # 使用全局变量 global_papers
-        raw_values = [record.get(field) for record in global_papers if record.get(field) is not None]
-
-        # Auto 模式
-        if strategy is None or strategy == "auto":
-            if all(self._is_date(v) for v in raw_values):
-                strategy = "year"
-            elif any(isinstance(v, list) for v in raw_values):
-                strategy = "list"
-            elif all(isinstance(v, str) for v in raw_values):
-                strategy = "string"
-            else:
-                raise ValueError(f"无法自动推断 {field} 的统计方式")
-
-        # 根据 strategy 处理
-        if strategy == "year":
-            for v in raw_values:
-                dt = self._to_datetime(v)
-                if dt:
-                    values.append(str(dt.year))
-
-        elif strategy == "string":
-            values = [v for v in raw_values if isinstance(v, str)]
-
-        elif strategy == "list":
-            for v in raw_values:
-                if isinstance(v, list):
-                    values.extend(v)
-                else:
-                    values.append(v)
-
-        else:
-            raise ValueError(f"未知 strategy: {strategy}")
-
-        return dict(Counter(values))
-
-    def _is_date(self, v) -> bool:
-        if isinstance(v, datetime):
-            return True
-        if isinstance(v, str):
-            try:
-                datetime.fromisoformat(v)
-                return True
-            except ValueError:
-                return False
-        return False
-
-    def _to_datetime(self, v) -> Optional[datetime]:
-        if isinstance(v, datetime):
-            return v
-        if isinstance(v, str):
-            try:
-                return datetime.fromisoformat(v)
-            except ValueError:
-                return None
-        return None
+        """核心统计逻辑：分布在论文加载时已预计算，这里直接读取缓存"""
+        stats = self.stats if self.stats is not None else get_paper_stats()
+        return stats.distribution(field, strategy)
 
 
 # === LangChain Tool 输入 schema ===
@@ -194,6 +134,21 @@ class CountDistributionInput(BaseModel):
     strategy: Optional[str] = Field("auto", description="统计策略 (auto/year/string/list)")
 
 
+class CrosstabInput(BaseModel):
+    field_type: str = Field(..., description="需要统计的字段名 (如 fraud_type_clean, technical_approach_category_clean, data_source_type_clean)")
+    by: str = Field("published", description="分组字段，日期字段按年份分组")
+
+
+class TopKInput(BaseModel):
+    field_type: str = Field(..., description="需要统计的字段名")
+    k: int = Field(10, description="返回数量最多的前 k 个取值")
+
+
+class GrowthInput(BaseModel):
+    field_type: Optional[str] = Field(None, description="类别字段名；不填时统计全部论文的年度数量")
+    value: Optional[str] = Field(None, description="类别字段中的某个取值，如 GNN")
+
+
 # === LangChain Tool 封装 ===
 @tool(args_schema=CountDistributionInput)
 def count_distribution_tool(field_type: str, strategy: Optional[str] = "auto") -> Dict[str, int]:
@@ -202,3 +157,31 @@ def count_distribution_tool(field_type: str, strategy: Optional[str] = "auto") -
     """
     counter = DistributionCounter()
     return counter.count_distribution(field_type, strategy)
+
+
+@tool(args_schema=CrosstabInput)
+def crosstab_tool(field_type: str, by: str = "published") -> Dict[str, Dict[str, int]]:
+    """
+    交叉统计：按分组字段（默认按 published 年份）统计某个类别字段的分布，返回 {年份: {类别: 数量}}。
+    """
+    return get_paper_stats().crosstab(field_type, by)
+
+
+@tool(args_schema=TopKInput)
+def top_k_tool(field_type: str, k: int = 10) -> Dict[str, int]:
+    """
+    返回某个字段数量最多的前 k 个取值，按数量降序。
+    """
+    return get_paper_stats().top_k(field_type, k)
+
+
+@tool(args_schema=GrowthInput)
+def growth_rate_tool(field_type: Optional[str] = None, value: Optional[str] = None) -> Dict:
+    """
+    逐年论文数量与同比增长率。可只统计某个类别字段取值为 value 的论文（指定 field_type 时必须同时指定 value）。
+    """
+    try:
+        return get_paper_stats().growth(field_type, value)
+    except ValueError as e:
+        # 参数错误以结果返回给 Agent，由其修正参数后重试，而不是中断报告生成
+        return {"error": str(e)}
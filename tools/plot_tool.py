@@ -1,8 +1,13 @@
 import os
+import threading
 from typing import Dict
-import matplotlib.pyplot as plt
 from io import BytesIO
 from langchain.tools import tool
+from fraud_research_agent.config import settings
+from fraud_research_agent.utils.global_state import get_session
+
+# pyplot 的全局状态不是线程安全的，并行生成多份报告时串行绘图
+_plot_lock = threading.Lock()
 
 @tool
 def plot_histogram_tool(
@@ -15,34 +20,41 @@ def plot_histogram_tool(
     1. 保存 PNG 文件到指定文件夹
     2. 返回 BytesIO（可直接插入 PDF）
     """
+    # 当前报告会话指定了输出目录时（多主题并行生成报告）始终保存到该目录，避免不同主题的同名图表互相覆盖
+    session_dir = get_session().report_dir
+    if session_dir:
+        save_dir = session_dir
+    elif not save_dir:
+        save_dir = os.path.join(settings.DATA_DIR, 'report')
+
     # 创建文件夹
     os.makedirs(save_dir, exist_ok=True)
 
     # 文件名：优先用 title，否则用 "stats"
     file_name = f"{title if title else 'year_distribution'}.png"
-    
-    if not os.path.exists(save_dir):
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        save_dir = os.path.join(current_dir, '..', 'data', 'report')
 
     file_path = os.path.join(save_dir, file_name)
 
-    # 画图
-    fig, ax = plt.subplots(figsize=(6, 4))
-    ax.bar(stats.keys(), stats.values())
-    ax.set_title(title)
-    ax.set_ylabel("Count")
-    ax.set_xlabel("Category")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-
-    # 保存到文件夹
-    plt.savefig(file_path, format="png")
-
-    # 保存到 BytesIO（供 PDF 用）
-    buffer = BytesIO()
-    plt.savefig(buffer, format="png")
-    plt.close(fig)
-    buffer.seek(0)
+    # matplotlib 导入较慢，首次绘图时再加载
+    import matplotlib.pyplot as plt
+
+    with _plot_lock:
+        # 画图
+        fig, ax = plt.subplots(figsize=(6, 4))
+        ax.bar(stats.keys(), stats.values())
+        ax.set_title(title)
+        ax.set_ylabel("Count")
+        ax.set_xlabel("Category")
+        plt.xticks(rotation=45)
+        plt.tight_layout()
+
+        # 保存到文件夹
+        plt.savefig(file_path, format="png")
+
+        # 保存到 BytesIO（供 PDF 用）
+        buffer = BytesIO()
+        plt.savefig(buffer, format="png")
+        plt.close(fig)
+        buffer.seek(0)
 
     return buffer
@@ -1,14 +1,7 @@
 from typing import List, Dict, Optional, Union
-import pandas as pd
 from pydantic import BaseModel, Field
 from langchain.tools import tool
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from fraud_research_agent.utils.global_state import get_global_papers
-
-global_papers = get_global_papers()
+from fraud_research_agent.utils.global_state import get_paper_store
 
 class PDFReportInput(BaseModel):
     output_path: str = Field(..., description="Path to save the generated PDF file")
@@ -34,6 +27,12 @@ def generate_pdf_report_tool(
     Generate a PDF report with text, tables, and figures.
     Report text should contain placeholders like [FIGURE_1] and [TABLE_1].
     """
+    # pandas 与 reportlab 导入较慢，仅在生成 PDF 时加载
+    import pandas as pd
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
 
     doc = SimpleDocTemplate(output_path, pagesize=A4)
     styles = getSampleStyleSheet()
@@ -130,6 +129,5 @@ def filter_nonempty_tool(field: str) -> List[Dict]:
     Returns:
         A filtered list of paper dictionaries.
     """
-    filtered_papers = [paper for paper in global_papers if paper.get(field)]
-    return filtered_papers
+    return get_paper_store().filter_nonempty(field)
     
\ No newline at end of file
@@ -0,0 +1,173 @@
+# fraud_research_agent/utils/batch_client.py
+import os
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from fraud_research_agent.config import settings
+
+# 批任务的终止状态
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def build_batch_request(custom_id: str, prompt: str, model: Optional[str] = None,
+                        endpoint: str = "/v1/chat/completions") -> Dict:
+    """构建批任务输入文件中的一行请求（OpenAI Batch API 格式）"""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": endpoint,
+        "body": {
+            "model": model or settings.BATCH_MODEL,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0,
+        },
+    }
+
+
+class OpenAIBatchClient:
+    """
+    OpenAI 兼容的 Batch API 客户端：上传 JSONL 请求文件、创建批任务、轮询状态并下载结果。
+
+    base_url 可指向任意实现了 /files 与 /batches 接口的服务（包括 benchmarks/mock_batch_server.py）。
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        endpoint: str = "/v1/chat/completions",
+        completion_window: str = "24h",
+    ):
+        # openai SDK 随 langchain-deepseek 安装，仅批量模式需要，使用时再导入
+        from openai import OpenAI
+
+        self.client = OpenAI(
+            base_url=base_url or settings.BATCH_API_BASE_URL or None,
+            api_key=api_key or settings.BATCH_API_KEY or settings.DEEPSEEK_API_KEY,
+        )
+        self.endpoint = endpoint
+        self.completion_window = completion_window
+
+    def submit(self, requests_path: str, metadata: Optional[Dict[str, str]] = None) -> str:
+        """上传请求文件并创建批任务，返回批任务 ID"""
+        with open(requests_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=self.endpoint,
+            completion_window=self.completion_window,
+            metadata=metadata,
+        )
+        return batch.id
+
+    def wait(self, batch_id: str, poll_interval: Optional[float] = None, timeout: Optional[float] = None):
+        """
+        轮询批任务直到进入终止状态。
+
+        Raises:
+            TimeoutError: 超过 timeout 秒仍未结束
+        """
+        poll_interval = settings.BATCH_POLL_INTERVAL_SECONDS if poll_interval is None else poll_interval
+        timeout = settings.BATCH_POLL_TIMEOUT_SECONDS if timeout is None else timeout
+        deadline = time.time() + timeout
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in _TERMINAL_STATUSES:
+                return batch
+            if time.time() >= deadline:
+                raise TimeoutError(f"批任务 {batch_id} 在 {timeout:.0f} 秒内未完成，当前状态: {batch.status}")
+            counts = batch.request_counts
+            if counts is not None:
+                print(f"⏳ 批任务 {batch_id}: {batch.status}，已完成 {counts.completed}/{counts.total}")
+            time.sleep(min(poll_interval, max(0.0, deadline - time.time())))
+
+    def cancel(self, batch_id: str, poll_interval: Optional[float] = None, timeout: Optional[float] = None):
+        """
+        取消批任务并等待其进入终止状态。
+
+        取消是异步的：batches.cancel 返回的批任务仍处于 cancelling、尚无输出文件，
+        进入 cancelled 后才能下载已完成部分的结果。
+
+        Returns:
+            终止状态的批任务；超过 timeout 秒仍未终止时返回最后一次查询到的批任务
+        """
+        try:
+            self.client.batches.cancel(batch_id)
+        except Exception as e:
+            print(f"⚠️ 取消批任务 {batch_id} 失败: {e!r}")
+        timeout = settings.BATCH_CANCEL_TIMEOUT_SECONDS if timeout is None else timeout
+        try:
+            return self.wait(batch_id, poll_interval, timeout)
+        except TimeoutError as e:
+            print(f"⚠️ {e}")
+            return self.client.batches.retrieve(batch_id)
+
+    def _download_lines(self, file_id: Optional[str]) -> List[Dict]:
+        if not file_id:
+            return []
+        content = self.client.files.content(file_id).text
+        return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    def results(self, batch) -> Dict[str, Tuple[Optional[str], Dict]]:
+        """
+        下载批任务的输出与错误文件。
+
+        Returns:
+            {custom_id: (模型输出文本，失败时为 None, usage)}
+        """
+        results = {}
+        for line in self._download_lines(getattr(batch, "output_file_id", None)):
+            response = line.get("response") or {}
+            body = response.get("body") or {}
+            content = None
+            if response.get("status_code") == 200 and body.get("choices"):
+                content = body["choices"][0]["message"]["content"]
+            results[line["custom_id"]] = (content, body.get("usage") or {})
+        for line in self._download_lines(getattr(batch, "error_file_id", None)):
+            results.setdefault(line["custom_id"], (None, {}))
+        return results
+
+    def run(self, requests: Iterable[Dict], work_dir: str, max_requests: Optional[int] = None) -> Dict[str, Tuple[Optional[str], Dict]]:
+        """
+        将请求按 max_requests 分片写入 work_dir 下的 JSONL 文件，全部提交后统一轮询并汇总结果。
+
+        所有批任务共用一个截止时间（settings.BATCH_POLL_TIMEOUT_SECONDS），
+        届时仍未结束的批任务会被取消，只返回其中已完成的部分。
+
+        Returns:
+            {custom_id: (模型输出文本或 None, usage)}；未完成的请求不出现在结果中，由调用方回退为实时调用
+        """
+        max_requests = max_requests or settings.BATCH_MAX_REQUESTS
+        os.makedirs(work_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+
+        paths, counts, f = [], [], None
+        for request in requests:
+            if f is None or counts[-1] >= max_requests:
+                if f is not None:
+                    f.close()
+                paths.append(os.path.join(work_dir, f"batch_{stamp}_{len(paths)}_requests.jsonl"))
+                counts.append(0)
+                f = open(paths[-1], "w", encoding="utf-8")
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+            counts[-1] += 1
+        if f is not None:
+            f.close()
+
+        batch_ids = []
+        for path, count in zip(paths, counts):
+            batch_ids.append(self.submit(path))
+            print(f"📦 已提交批任务 {batch_ids[-1]}（{count} 条请求）")
+
+        results = {}
+        deadline = time.time() + settings.BATCH_POLL_TIMEOUT_SECONDS
+        for batch_id in batch_ids:
+            try:
+                batch = self.wait(batch_id, timeout=max(0.0, deadline - time.time()))
+            except TimeoutError as e:
+                print(f"⚠️ {e}，取消后仅使用已完成部分的结果")
+                batch = self.cancel(batch_id)
+            if batch.status != "completed":
+                print(f"⚠️ 批任务 {batch_id} 状态为 {batch.status}")
+            results.update(self.results(batch))
+        return results
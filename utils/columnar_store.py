@@ -0,0 +1,193 @@
+# fraud_research_agent/utils/columnar_store.py
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+
+
+def _to_datetime(v) -> Optional[datetime]:
+    if isinstance(v, datetime):
+        return v
+    if isinstance(v, str):
+        try:
+            return datetime.fromisoformat(v)
+        except ValueError:
+            return None
+    return None
+
+
+class _Column:
+    """
+    单个字段的列式表示（构建一次，后续统计全部基于整数数组）。
+
+    - codes: 每行标量取值的类别编码（-1 表示缺失或列表）
+    - list_rows/list_codes: 展开后的 (行号, 类别编码)，列表元素与标量取值都计入
+    - years/months: 每行解析出的年、月（-1 表示无法解析），按需构建
+    - nonempty: 每行取值是否非空
+    """
+
+    def __init__(self, values: List):
+        n = len(values)
+        self.values = values
+        self.nonempty = np.fromiter((bool(v) for v in values), dtype=bool, count=n)
+
+        non_null = [v for v in values if v is not None]
+        self.has_list = any(isinstance(v, list) for v in non_null)
+        self.all_str = all(isinstance(v, str) for v in non_null)
+
+        # 类别按首次出现的顺序编码，保证统计结果的顺序与逐条 Counter 一致
+        self.categories: List = []
+        self.is_str_category: List[bool] = []
+        index: Dict = {}
+
+        def intern(v) -> int:
+            code = index.get(v)
+            if code is None:
+                code = index[v] = len(self.categories)
+                self.categories.append(v)
+                self.is_str_category.append(isinstance(v, str))
+            return code
+
+        codes = np.full(n, -1, dtype=np.int32)
+        list_rows, list_codes = [], []
+        for row, v in enumerate(values):
+            if v is None:
+                continue
+            if isinstance(v, list):
+                for item in v:
+                    list_rows.append(row)
+                    list_codes.append(intern(item))
+            else:
+                code = intern(v)
+                codes[row] = code
+                list_rows.append(row)
+                list_codes.append(code)
+
+        self.codes = codes
+        self.list_rows = np.asarray(list_rows, dtype=np.int64)
+        self.list_codes = np.asarray(list_codes, dtype=np.int32)
+        self._years = None
+        self._months = None
+
+        # 所有非空取值都能解析为日期时视为日期列（与 auto 推断一致）；每个不同取值只解析一次
+        self.is_date = not self.has_list and all(_to_datetime(v) is not None for v in self.categories)
+
+    def _parse_dates(self):
+        category_dates = [_to_datetime(v) for v in self.categories]
+        category_years = np.asarray([dt.year if dt else -1 for dt in category_dates] + [-1], dtype=np.int32)
+        category_months = np.asarray([dt.month if dt else -1 for dt in category_dates] + [-1], dtype=np.int32)
+        # codes 中的 -1 正好索引到末尾追加的 -1
+        self._years = category_years[self.codes]
+        self._months = category_months[self.codes]
+
+    @property
+    def years(self) -> np.ndarray:
+        if self._years is None:
+            self._parse_dates()
+        return self._years
+
+    @property
+    def months(self) -> np.ndarray:
+        if self._months is None:
+            self._parse_dates()
+        return self._months
+
+
+class ColumnarPaperStore:
+    """
+    列式论文存储：在报告阶段构建一次，之后的分布统计、交叉统计与非空过滤均为向量化计算。
+    """
+
+    def __init__(self, papers: List[Dict]):
+        self.rows = list(papers)
+        self.size = len(self.rows)
+        self.fields = list(dict.fromkeys(k for paper in self.rows for k in paper))
+        self._columns = {field: _Column([paper.get(field) for paper in self.rows]) for field in self.fields}
+
+    def column(self, field: str) -> _Column:
+        """获取字段的列，不存在的字段视为全部缺失"""
+        if field not in self._columns:
+            self._columns[field] = _Column([None] * self.size)
+        return self._columns[field]
+
+    def resolve_strategy(self, field: str, strategy: Optional[str] = None) -> str:
+        """auto 模式下推断统计方式：日期 -> year，含列表 -> list，全字符串 -> string"""
+        if strategy is not None and strategy != "auto":
+            return strategy
+        col = self.column(field)
+        if col.is_date:
+            return "year"
+        if col.has_list:
+            return "list"
+        if col.all_str:
+            return "string"
+        raise ValueError(f"无法自动推断 {field} 的统计方式")
+
+    def count_distribution(self, field: str, strategy: Optional[str] = None) -> Dict[str, int]:
+        """统计字段取值分布，结果按取值首次出现的顺序排列"""
+        strategy = self.resolve_strategy(field, strategy)
+        col = self.column(field)
+
+        if strategy == "year":
+            years = col.years[col.years >= 0]
+            unique, first_index, counts = np.unique(years, return_index=True, return_counts=True)
+            order = np.argsort(first_index)
+            return {str(int(unique[i])): int(counts[i]) for i in order}
+
+        if strategy == "string":
+            codes = col.codes[col.codes >= 0]
+            codes = codes[np.asarray(col.is_str_category, dtype=bool)[codes]] if len(codes) else codes
+        elif strategy == "list":
+            codes = col.list_codes
+        else:
+            raise ValueError(f"未知 strategy: {strategy}")
+
+        counts = np.bincount(codes, minlength=len(col.categories))
+        return {col.categories[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+    def group_count(self, field: str, by: str, strategy: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """
+        交叉统计：按 by 字段（日期字段按年份）分组统计 field 的取值分布。
+
+        Returns:
+            {分组值: {取值: 数量}}
+        """
+        strategy = self.resolve_strategy(field, strategy)
+        if strategy == "year":
+            raise ValueError(f"{field} 是日期字段，请将其作为分组字段 by")
+        col = self.column(field)
+        by_col = self.column(by)
+
+        if by_col.is_date:
+            group_keys = by_col.years
+            group_labels = lambda key: str(int(key))
+        else:
+            group_keys = by_col.codes
+            group_labels = lambda key: by_col.categories[key]
+
+        if strategy == "list":
+            rows, codes = col.list_rows, col.list_codes
+        else:
+            rows = np.flatnonzero(col.codes >= 0)
+            codes = col.codes[rows]
+            if len(codes):
+                keep = np.asarray(col.is_str_category, dtype=bool)[codes]
+                rows, codes = rows[keep], codes[keep]
+
+        groups = group_keys[rows] if len(rows) else np.zeros(0, dtype=np.int32)
+        valid = groups >= 0
+        groups, codes = groups[valid], codes[valid]
+        if len(groups) == 0:
+            return {}
+
+        # (分组, 取值) 组合编码后一次 unique 计数，只保留出现过的组合
+        n_categories = len(col.categories)
+        pairs, counts = np.unique(groups.astype(np.int64) * n_categories + codes, return_counts=True)
+        result: Dict[str, Dict[str, int]] = {}
+        for pair, count in zip(pairs, counts):
+            group, code = divmod(int(pair), n_categories)
+            result.setdefault(group_labels(group), {})[col.categories[code]] = int(count)
+        return result
+
+    def filter_nonempty(self, field: str) -> List[Dict]:
+        """返回指定字段非空的论文"""
+        return [self.rows[i] for i in np.flatnonzero(self.column(field).nonempty)]
@@ -0,0 +1,22 @@
+# fraud_research_agent/utils/context_utils.py
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    在创建方的 contextvars 上下文中执行任务的线程池。
+
+    运行指标、报告会话等按上下文隔离的状态因此对工作线程可见：
+    同一进程中并发的多次运行，各自线程池中的任务只会记录到所属的运行。
+    使用创建时而非提交时的上下文，因为任务也会在 Future 回调中提交（如筛选完成后提交提取），
+    回调所在的工作线程不带有运行的上下文。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._context = contextvars.copy_context()
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        # 每个任务使用上下文的独立副本：同一个 Context 不能被多个线程同时进入
+        return super().submit(self._context.copy().run, fn, *args, **kwargs)
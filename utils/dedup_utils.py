@@ -0,0 +1,80 @@
+# fraud_research_agent/utils/dedup_utils.py
+import re
+import zlib
+from typing import Dict, List, Optional
+import numpy as np
+from fraud_research_agent.config import settings
+
+_VERSION_SUFFIX = re.compile(r"v(\d+)$")
+_MERSENNE_PRIME = (1 << 31) - 1
+
+
+def normalize_arxiv_id(paper_id: str) -> str:
+    """去掉 arXiv ID 的版本后缀，例如 2301.01234v2 -> 2301.01234"""
+    return _VERSION_SUFFIX.sub("", str(paper_id).strip())
+
+
+def paper_freshness(paper: Dict) -> tuple:
+    """同一篇论文不同记录的新旧排序键：先比较 arXiv 版本号，再比较更新时间"""
+    match = _VERSION_SUFFIX.search(str(paper.get("id", "")).strip())
+    return int(match.group(1)) if match else 0, str(paper.get("updated") or "")
+
+
+def shingles(text: str, size: int = 3) -> List[str]:
+    """标题+摘要的词级 n-gram（小写、仅保留字母数字）"""
+    tokens = re.findall(r"[a-z0-9]+", text.lower())
+    if len(tokens) <= size:
+        return [" ".join(tokens)] if tokens else []
+    return [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+
+class NearDuplicateDetector:
+    """
+    基于 MinHash + LSH 的在线近重复检测。
+
+    每篇论文计算一次 MinHash 签名（numpy 向量化），按 band 分桶；只与落入相同桶的候选比较签名，
+    整体开销随论文数线性增长。估计的 Jaccard 相似度不低于 threshold 即视为重复。
+    """
+
+    def __init__(self, threshold: Optional[float] = None, num_perm: int = 128, bands: int = 16, seed: int = 1):
+        self.threshold = settings.DEDUP_SIMILARITY_THRESHOLD if threshold is None else threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.RandomState(seed)
+        # 哈希族 (a * x + b) mod p，p = 2^31 - 1；a、x 均小于 p，乘积不溢出 uint64
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._signatures: List[np.ndarray] = []
+        self._ids: List[str] = []
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        grams = shingles(text)
+        if not grams:
+            return None
+        x = np.fromiter((zlib.crc32(g.encode("utf-8")) % _MERSENNE_PRIME for g in grams), dtype=np.uint64, count=len(grams))
+        hashed = (x[:, None] * self._a[None, :] + self._b[None, :]) % np.uint64(_MERSENNE_PRIME)
+        return hashed.min(axis=0)
+
+    def add(self, paper_id: str, text: str) -> Optional[str]:
+        """
+        登记一篇论文；若与已登记论文近重复，返回其 ID（该论文不登记），否则返回 None。
+        """
+        sig = self.signature(text)
+        if sig is None:
+            return None
+
+        band_keys = [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+        candidates = set()
+        for band, key in enumerate(band_keys):
+            candidates.update(self._buckets[band].get(key, ()))
+        for index in sorted(candidates):
+            if np.mean(self._signatures[index] == sig) >= self.threshold:
+                return self._ids[index]
+
+        index = len(self._ids)
+        self._ids.append(paper_id)
+        self._signatures.append(sig)
+        for band, key in enumerate(band_keys):
+            self._buckets[band].setdefault(key, []).append(index)
+        return None
@@ -0,0 +1,88 @@
+# fraud_research_agent/utils/embedding_utils.py
+import re
+import zlib
+import threading
+from typing import List, Optional
+import numpy as np
+from fraud_research_agent.config import settings
+
+
+class HashingEmbedder:
+    """
+    纯本地、无需下载模型的哈希向量化：将字符 n-gram 哈希到固定维度并做 L2 归一化。
+    适合类别名、短语等短文本的近似匹配。
+    """
+
+    def __init__(self, dim: int = 1024, ngram: int = 3):
+        self.dim = dim
+        self.ngram = ngram
+
+    def _features(self, text: str) -> List[str]:
+        text = " ".join(re.sub(r"[^\w]+", " ", str(text).lower()).split())
+        padded = f" {text} "
+        if len(padded) <= self.ngram:
+            return [padded]
+        return [padded[i:i + self.ngram] for i in range(len(padded) - self.ngram + 1)]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """返回形状为 (len(texts), dim) 的 L2 归一化矩阵"""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                vectors[row, zlib.crc32(feature.encode("utf-8")) % self.dim] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class SentenceTransformerEmbedder:
+    """基于本地 sentence-transformers 模型（CPU 即可）的向量化"""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """返回形状为 (len(texts), dim) 的 L2 归一化矩阵"""
+        return np.asarray(
+            self.model.encode(list(texts), normalize_embeddings=True, show_progress_bar=False),
+            dtype=np.float32,
+        )
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """
+    获取进程内共享的向量化器。
+
+    配置了 EMBEDDING_MODEL 且已安装 sentence-transformers 时使用本地模型，否则回退到 HashingEmbedder。
+    """
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            if settings.EMBEDDING_MODEL:
+                try:
+                    _embedder = SentenceTransformerEmbedder(settings.EMBEDDING_MODEL)
+                except ImportError:
+                    print("[WARN] 未安装 sentence-transformers，使用哈希向量化")
+            if _embedder is None:
+                _embedder = HashingEmbedder()
+        return _embedder
+
+
+def nearest_neighbors(queries: np.ndarray, index: np.ndarray) -> Optional[tuple]:
+    """
+    对归一化向量做余弦最近邻检索。
+
+    Returns:
+        (最近邻下标数组, 相似度数组)；index 为空时返回 None
+    """
+    if len(queries) == 0 or len(index) == 0:
+        return None
+    similarity = queries @ index.T
+    best = similarity.argmax(axis=1)
+    return best, similarity[np.arange(len(queries)), best]
@@ -1,13 +1,80 @@
 # fraud_research_agent/utils/global_state.py
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+
+class ReportSession:
+    """
+    一次报告生成的会话上下文：持有论文数据及其列式存储、统计缓存（均按需构建一次）。
+
+    通过 contextvars 绑定到当前上下文，工具在每次调用时解析当前会话，
+    因此同一进程中可以并发生成多个主题的报告，彼此的数据互不可见。
+    report_dir 为该报告的输出目录（图表等），未指定时为 None，由工具使用默认目录。
+    """
+
+    def __init__(self, papers: Optional[List[Dict]] = None, report_dir: Optional[str] = None):
+        self.papers = papers if papers is not None else []
+        self.report_dir = report_dir
+        self._store = None
+        self._stats = None
+        self._lock = threading.Lock()
+
+    @property
+    def store(self):
+        """列式论文存储"""
+        with self._lock:
+            if self._store is None:
+                from fraud_research_agent.utils.columnar_store import ColumnarPaperStore
+                self._store = ColumnarPaperStore(self.papers)
+            return self._store
+
+    @property
+    def stats(self):
+        """统计缓存（构建时预计算各字段分布）"""
+        store = self.store
+        with self._lock:
+            if self._stats is None:
+                from fraud_research_agent.utils.paper_stats import PaperStatistics
+                self._stats = PaperStatistics(store)
+            return self._stats
+
+
+# 当前上下文的会话；未绑定时使用空会话
+_current_session: ContextVar[Optional[ReportSession]] = ContextVar("report_session", default=None)
+_empty_session = ReportSession()
+
+
+def get_session() -> ReportSession:
+    """获取当前上下文的报告会话"""
+    session = _current_session.get()
+    return session if session is not None else _empty_session
+
+
+@contextmanager
+def report_session(papers: List[Dict], report_dir: Optional[str] = None):
+    """在 with 块内将一份论文数据（及其报告输出目录）绑定为当前上下文的报告会话"""
+    session = ReportSession(papers, report_dir=report_dir)
+    token = _current_session.set(session)
+    try:
+        yield session
+    finally:
+        _current_session.reset(token)
 
-# 全局变量存储论文数据
-global_papers = []
 
 def set_global_papers(papers):
-    """设置全局论文数据"""
-    global global_papers
-    global_papers = papers
+    """为当前上下文设置论文数据（开启新会话）"""
+    _current_session.set(ReportSession(papers))
 
 def get_global_papers():
-    """获取全局论文数据"""
-    return global_papers
\ No newline at end of file
+    """获取当前上下文的论文数据"""
+    return get_session().papers
+
+def get_paper_store():
+    """获取当前上下文的列式论文存储"""
+    return get_session().store
+
+def get_paper_stats():
+    """获取当前上下文论文集合的统计缓存"""
+    return get_session().stats
@@ -0,0 +1,164 @@
+# fraud_research_agent/utils/llm_cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+from fraud_research_agent.config import settings
+
+
+class LLMResponseCache(BaseCache):
+    """
+    基于 SQLite 的持久化 LLM 响应缓存。
+
+    - 以 (模型参数 llm_string, 提示词) 的 sha256 作为键，llm_string 中包含模型名称与调用参数
+    - 超过 max_entries 时按最近访问时间做 LRU 淘汰
+    - 超过 ttl_seconds 的条目视为过期（ttl_seconds <= 0 表示永不过期）
+    - 记录命中/未命中次数；enabled=False 时完全旁路缓存
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_entries: int = 100000,
+        ttl_seconds: float = 0,
+        enabled: bool = True
+    ):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # 记录当前线程最近一次查找是否命中，供指标回调区分缓存命中与真实调用
+        self._local = threading.local()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed_at ON llm_cache (accessed_at)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    @staticmethod
+    def _make_key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """按提示词与模型参数查找缓存"""
+        self._local.hit = False
+        if not self.enabled:
+            return None
+
+        key = self._make_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._is_expired(row[1], now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self._size -= 1
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        try:
+            generations = [loads(gen) for gen in json.loads(row[0])]
+            self._local.hit = True
+            return generations
+        except Exception as e:
+            print(f"[WARN] LLM 缓存条目无法反序列化，视为未命中. 错误: {e}")
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """写入缓存，并在超出容量时淘汰最久未访问的条目"""
+        if not self.enabled:
+            return
+
+        key = self._make_key(prompt, llm_string)
+        response = json.dumps([dumps(gen) for gen in return_val], ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            if not exists:
+                self._size += 1
+
+            overflow = self._size - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self._size -= overflow
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        """清空缓存与计数"""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def pop_lookup_hit(self) -> bool:
+        """返回当前线程最近一次查找是否命中，并清除该标记"""
+        hit = getattr(self._local, "hit", False)
+        self._local.hit = False
+        return hit
+
+    def stats(self) -> Dict[str, Any]:
+        """返回命中统计"""
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": self._size,
+        }
+
+
+# 进程内共享的缓存实例
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """获取进程内共享的 LLM 响应缓存"""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache(
+                db_path=settings.LLM_CACHE_PATH,
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                enabled=settings.LLM_CACHE_ENABLED,
+            )
+        return _llm_cache
@@ -0,0 +1,271 @@
+# fraud_research_agent/utils/llm_governor.py
+import time
+import random
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+import httpx
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatGeneration, ChatResult
+from fraud_research_agent.config import settings
+from fraud_research_agent.utils.prompt_compaction import count_tokens
+from fraud_research_agent.utils.run_metrics import get_run_metrics
+
+# 视为可重试的 HTTP 状态码：限流与服务端临时错误
+_RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504, 529}
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """提供商限流（429）或超时，作为并发过载信号"""
+    name = type(error).__name__
+    return (
+        _status_code(error) == 429
+        or isinstance(error, (TimeoutError, httpx.TimeoutException))
+        or "RateLimit" in name or "Timeout" in name
+    )
+
+
+def is_retryable(error: BaseException) -> bool:
+    """限流、超时、连接错误与 5xx 可重试；参数错误、鉴权失败等直接抛出"""
+    if is_rate_limited(error):
+        return True
+    if _status_code(error) in _RETRYABLE_STATUS:
+        return True
+    return isinstance(error, (ConnectionError, httpx.TransportError)) or "APIConnection" in type(error).__name__
+
+
+def estimate_tokens(prompt: Any) -> int:
+    """估计一次调用的 token 数：输入 token 数加上预估的输出 token"""
+    if isinstance(prompt, (list, tuple)):
+        text = "".join(str(getattr(message, "content", message)) for message in prompt)
+    else:
+        text = str(getattr(prompt, "content", prompt))
+    return count_tokens(text) + settings.LLM_OUTPUT_TOKENS_ESTIMATE
+
+
+class LLMGovernor:
+    """
+    所有 LLM 调用的统一入口，负责：
+
+    - AIMD 自适应并发：成功时并发上限加性增长，遇到 429/超时或延迟超过目标时乘性减半
+    - 带抖动的指数退避重试（full jitter），只重试限流、超时、连接错误与 5xx
+    - 每分钟 token 预算（滑动窗口，按估计值预留，调用结束后按实际用量修正）
+    - 熔断器：连续失败达到阈值后暂停发送请求，冷却结束后放行一个探测请求，成功则恢复
+
+    提供商的请求速率（次/秒）仍由 get_llm 中按提供商共享的速率限制器控制。
+    """
+
+    def __init__(
+        self,
+        initial_concurrency: Optional[int] = None,
+        min_concurrency: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ):
+        self.min_concurrency = min_concurrency or settings.LLM_CONCURRENCY_MIN
+        self.max_concurrency = max_concurrency or settings.LLM_CONCURRENCY_MAX
+        self.limit = float(initial_concurrency or settings.LLM_CONCURRENCY_INITIAL)
+        self.limit = min(self.max_concurrency, max(self.min_concurrency, self.limit))
+        self.max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.tokens_per_minute = settings.LLM_TOKENS_PER_MINUTE if tokens_per_minute is None else tokens_per_minute
+
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._consecutive_failures = 0
+        self._circuit_open_until = 0.0
+        self._probing = False
+        # 最近 60 秒的 token 用量：[时间戳, token 数]
+        self._token_window: deque = deque()
+        self._condition = threading.Condition()
+        self.counters = {"calls": 0, "retries": 0, "throttled": 0, "failures": 0, "circuit_opens": 0}
+
+    # ---------- 准入 ----------
+    def _tokens_used(self, now: float) -> int:
+        while self._token_window and now - self._token_window[0][0] >= 60:
+            self._token_window.popleft()
+        return sum(entry[1] for entry in self._token_window)
+
+    def _admission_wait(self, now: float, tokens: int) -> float:
+        """返回还需等待的秒数，0 表示可以放行（调用方需持有锁）"""
+        if now < self._circuit_open_until:
+            return self._circuit_open_until - now
+        if self._circuit_open_until and self._probing:
+            # 熔断冷却结束后只放行一个探测请求
+            return 0.5
+        if self.in_flight >= int(self.limit):
+            return 1.0
+        if self.tokens_per_minute > 0:
+            used = self._tokens_used(now)
+            # 单次估计超过预算时，窗口清空后仍放行，避免永久阻塞
+            if used and used + tokens > self.tokens_per_minute:
+                return max(0.05, 60 - (now - self._token_window[0][0]))
+        return 0.0
+
+    def _acquire(self, tokens: int) -> Dict[str, Any]:
+        with self._condition:
+            while True:
+                wait = self._admission_wait(time.time(), tokens)
+                if wait <= 0:
+                    break
+                self._condition.wait(timeout=wait)
+            self.in_flight += 1
+            probe = bool(self._circuit_open_until)
+            self._probing = self._probing or probe
+            usage = [time.time(), tokens]
+            if self.tokens_per_minute > 0:
+                self._token_window.append(usage)
+            return {"usage": usage, "probe": probe}
+
+    def _release(self, reservation: Dict[str, Any], actual_tokens: Optional[int], latency: float,
+                 error: Optional[BaseException]) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            if reservation["probe"]:
+                self._probing = False
+            if actual_tokens is not None:
+                reservation["usage"][1] = actual_tokens
+
+            now = time.time()
+            started = reservation["usage"][0]
+            if error is None:
+                self._consecutive_failures = 0
+                self._circuit_open_until = 0.0
+                if latency > settings.LLM_LATENCY_TARGET_SECONDS:
+                    self._decrease(started)
+                else:
+                    # 加性增长：约每个并发窗口的请求全部成功后上限 +1
+                    self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            else:
+                self.counters["failures"] += 1
+                if is_rate_limited(error):
+                    self.counters["throttled"] += 1
+                    self._decrease(started)
+                self._consecutive_failures += 1
+                # 探测请求失败立即重新熔断；熔断期间仍在途的请求失败不重复计数
+                if reservation["probe"] or (
+                    now >= self._circuit_open_until
+                    and self._consecutive_failures >= settings.LLM_CIRCUIT_FAILURE_THRESHOLD
+                ):
+                    self._circuit_open_until = now + settings.LLM_CIRCUIT_COOLDOWN_SECONDS
+                    self._consecutive_failures = 0
+                    self.counters["circuit_opens"] += 1
+                    print(f"⛔ LLM 连续失败，熔断 {settings.LLM_CIRCUIT_COOLDOWN_SECONDS} 秒")
+            self._condition.notify_all()
+
+    def _decrease(self, started: float) -> None:
+        """
+        乘性减小并发上限。与 TCP 拥塞控制类似，同一轮请求只减一次：
+        上次减小之前已发出的请求再报告过载时忽略。
+        """
+        if started < self._last_decrease:
+            return
+        self._last_decrease = time.time()
+        self.limit = max(self.min_concurrency, self.limit / 2)
+
+    # ---------- 调用 ----------
+    def call(self, fn: Callable, *args, estimated_tokens: Optional[int] = None, **kwargs) -> Any:
+        """
+        在治理下执行一次 LLM 调用（fn 可以是 llm.invoke、chain.invoke 等），失败时按退避策略重试。
+
+        Args:
+            fn: 实际发起调用的函数
+            estimated_tokens: 预估 token 数，用于每分钟预算；默认按输出估计值计
+        Returns:
+            fn 的返回值
+        Raises:
+            重试次数用尽或不可重试的异常
+        """
+        if not settings.LLM_GOVERNOR_ENABLED:
+            return fn(*args, **kwargs)
+
+        tokens = estimated_tokens or settings.LLM_OUTPUT_TOKENS_ESTIMATE
+        attempt = 0
+        while True:
+            reservation = self._acquire(tokens)
+            start = time.time()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self._release(reservation, None, time.time() - start, e)
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                with self._condition:
+                    self.counters["retries"] += 1
+                get_run_metrics().record_llm_retry()
+                # full jitter：在 [0, min(上限, 基数 * 2^attempt)] 内随机等待
+                backoff = min(settings.LLM_BACKOFF_MAX_SECONDS, settings.LLM_BACKOFF_BASE_SECONDS * 2 ** attempt)
+                wait = random.uniform(0, backoff)
+                print(f"⚠️ LLM 调用失败: {type(e).__name__}, {wait:.1f} 秒后重试 {attempt}/{self.max_retries}")
+                time.sleep(wait)
+                continue
+
+            usage = getattr(result, "usage_metadata", None) or {}
+            self._release(reservation, usage.get("total_tokens"), time.time() - start, None)
+            with self._condition:
+                self.counters["calls"] += 1
+            return result
+
+    def invoke(self, llm, prompt: Any, **kwargs) -> Any:
+        """llm.invoke(prompt) 的治理版本"""
+        return self.call(llm.invoke, prompt, estimated_tokens=estimate_tokens(prompt), **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                **self.counters,
+                "concurrency_limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "circuit_open": time.time() < self._circuit_open_until,
+            }
+
+
+# 进程内共享的调度器
+_llm_governor: Optional[LLMGovernor] = None
+_llm_governor_lock = threading.Lock()
+
+
+def get_llm_governor() -> LLMGovernor:
+    """获取进程内共享的 LLM 调度器"""
+    global _llm_governor
+    with _llm_governor_lock:
+        if _llm_governor is None:
+            _llm_governor = LLMGovernor()
+        return _llm_governor
+
+
+def governed_invoke(llm, prompt: Any, **kwargs) -> Any:
+    """通过共享调度器调用 llm.invoke(prompt)"""
+    return get_llm_governor().invoke(llm, prompt, **kwargs)
+
+
+class GovernedChatModel(BaseChatModel):
+    """
+    将 ChatModel 的每次调用交给共享调度器的包装，用于 Agent 等由框架内部发起 LLM 调用的场景：
+    Agent 的每一步 LLM 调用分别受并发、token 预算与熔断控制，重试只重发该次调用，不重跑工具。
+    """
+
+    inner: BaseChatModel
+
+    @property
+    def _llm_type(self) -> str:
+        return f"governed-{self.inner._llm_type}"
+
+    def bind_tools(self, tools, **kwargs):
+        # 由内部模型把工具转换为其请求参数，再绑定到包装上，调用时原样转交
+        bound = self.inner.bind_tools(tools, **kwargs)
+        return self.bind(**getattr(bound, "kwargs", {}))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = get_llm_governor().call(
+            self.inner.invoke, messages, stop=stop, estimated_tokens=estimate_tokens(messages), **kwargs
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
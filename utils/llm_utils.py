@@ -1,19 +1,143 @@
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
-from langchain.chat_models.base import BaseChatModel
+import atexit
+import asyncio
+import threading
+from typing import Dict, Optional, Tuple
+import httpx
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from fraud_research_agent.config import settings
+from fraud_research_agent.utils.llm_cache import get_llm_cache
+from fraud_research_agent.utils.run_metrics import MetricsCallbackHandler
 
 
-def get_llm(model_name: str = "deepseek-chat", model_provider: str = "deepseek") -> BaseChatModel:
+# 按模型提供商共享的速率限制器，保证多个 LLM 实例/线程合计不超过提供商限额
+_rate_limiters: Dict[str, InMemoryRateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+# 所有 LLM 请求共享的 HTTP 客户端（keep-alive 连接池），首次使用时创建
+_http_clients: Dict[str, httpx.Client] = {}
+_http_clients_lock = threading.Lock()
+
+# 基于 OpenAI SDK 的提供商，可通过 http_client/http_async_client 注入共享连接池
+_HTTP_CLIENT_PROVIDERS = {"deepseek", "openai"}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _close_http_clients() -> None:
+    """进程退出时关闭共享的 HTTP 客户端，释放连接池中的 keep-alive 连接"""
+    with _http_clients_lock:
+        sync_client, async_client = _http_clients.pop("sync", None), _http_clients.pop("async", None)
+    if sync_client is not None:
+        sync_client.close()
+    if async_client is not None:
+        try:
+            asyncio.run(async_client.aclose())
+        except Exception as e:
+            # 连接绑定的事件循环已关闭等情况下无法优雅关闭，进程退出时由操作系统回收
+            print(f"⚠️ 关闭异步 HTTP 客户端失败: {e!r}")
+
+
+def get_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    获取进程内共享的同步/异步 HTTP 客户端。
+
+    连接数上限、keep-alive 与超时由 settings.LLM_HTTP_* 配置；安装了 h2 时启用 HTTP/2。
+    Returns:
+        (httpx.Client, httpx.AsyncClient)
+    """
+    with _http_clients_lock:
+        if not _http_clients:
+            options = dict(
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(settings.LLM_HTTP_READ_TIMEOUT, connect=settings.LLM_HTTP_CONNECT_TIMEOUT),
+                http2=settings.LLM_HTTP2 and _http2_available(),
+            )
+            _http_clients["sync"] = httpx.Client(**options)
+            _http_clients["async"] = httpx.AsyncClient(**options)
+            atexit.register(_close_http_clients)
+        return _http_clients["sync"], _http_clients["async"]
+
+
+# 进程内复用的 ChatModel（同一模型/提供商共用一个客户端及其 HTTP 连接池）
+_llms: Dict[Tuple[str, str, bool], BaseChatModel] = {}
+_llms_lock = threading.Lock()
+
+
+def get_rate_limiter(model_provider: str) -> Optional[InMemoryRateLimiter]:
+    """
+    获取某个模型提供商共享的速率限制器。
+
+    Args:
+        model_provider: 模型提供商，例如 "deepseek"
+    Returns:
+        InMemoryRateLimiter；未配置限额时返回 None
     """
-    初始化一个 LLM（这里默认是 DeepSeek）。
-    
+    requests_per_second = settings.LLM_REQUESTS_PER_SECOND.get(model_provider)
+    if not requests_per_second:
+        return None
+
+    with _rate_limiters_lock:
+        if model_provider not in _rate_limiters:
+            _rate_limiters[model_provider] = InMemoryRateLimiter(
+                requests_per_second=requests_per_second,
+                check_every_n_seconds=0.05,
+                max_bucket_size=max(1, requests_per_second),
+            )
+        return _rate_limiters[model_provider]
+
+
+def get_llm(
+    model_name: str = "deepseek-chat",
+    model_provider: str = "deepseek",
+    use_cache: bool = True
+) -> BaseChatModel:
+    """
+    获取一个 LLM（这里默认是 DeepSeek）。
+
+    同一进程内按 (model_name, model_provider, use_cache) 只初始化一次，之后直接复用；
+    OpenAI 兼容的提供商共用 get_http_clients() 的连接池。
+    环境变量（.env 中的 DEEPSEEK_API_KEY）已在导入 settings 时加载。
+
     Args:
         model_name: 模型名称，例如 "deepseek-chat"
         model_provider: 模型提供商，例如 "deepseek"
+        use_cache: 是否使用持久化响应缓存（相同模型、参数与提示词直接复用历史结果）
     Returns:
         已初始化的 LangChain ChatModel
     """
-    # 加载环境变量（读取 .env 文件中的 DEEPSEEK_API_KEY）
-    load_dotenv(override=True)
-    return init_chat_model(model=model_name, model_provider=model_provider)
+    key = (model_name, model_provider, use_cache)
+    llm = _llms.get(key)
+    if llm is not None:
+        return llm
+
+    with _llms_lock:
+        if key not in _llms:
+            # langchain.chat_models 会加载各提供商的集成包，首次需要模型时再导入
+            from langchain.chat_models import init_chat_model
 
+            kwargs = {}
+            if model_provider in _HTTP_CLIENT_PROVIDERS:
+                kwargs["http_client"], kwargs["http_async_client"] = get_http_clients()
+                # 重试由 LLMGovernor 统一负责，关闭 SDK 自带的重试以免叠加
+                if settings.LLM_GOVERNOR_ENABLED:
+                    kwargs["max_retries"] = 0
+            _llms[key] = init_chat_model(
+                model=model_name,
+                model_provider=model_provider,
+                rate_limiter=get_rate_limiter(model_provider),
+                cache=get_llm_cache() if use_cache else False,
+                callbacks=[MetricsCallbackHandler()],
+                **kwargs,
+            )
+        return _llms[key]
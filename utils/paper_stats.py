@@ -0,0 +1,85 @@
+# fraud_research_agent/utils/paper_stats.py
+from typing import Dict, Optional
+from fraud_research_agent.utils.columnar_store import ColumnarPaperStore
+
+
+class PaperStatistics:
+    """
+    报告阶段的统计层：论文加载时预先计算所有字段的分布，之后的查询（分布、交叉表、top-k、增长率）
+    都从缓存返回。缓存与列式存储绑定，论文集合变化时随新的存储一起重建。
+    """
+
+    def __init__(self, store: ColumnarPaperStore):
+        self.store = store
+        self._cache: Dict[tuple, object] = {}
+        # 预计算所有字段在 auto 模式下的分布；无法推断统计方式的字段留到调用时再报错
+        for field in store.fields:
+            try:
+                self.distribution(field)
+            except ValueError:
+                continue
+
+    def _cached(self, key: tuple, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def distribution(self, field: str, strategy: Optional[str] = None) -> Dict[str, int]:
+        """字段取值分布 {取值: 数量}"""
+        strategy = self.store.resolve_strategy(field, strategy)
+        return self._cached(
+            ("distribution", field, strategy),
+            lambda: self.store.count_distribution(field, strategy)
+        )
+
+    def crosstab(self, field: str, by: str = "published", strategy: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """交叉表 {分组值: {取值: 数量}}，分组按键升序排列（日期字段按年份分组）"""
+        strategy = self.store.resolve_strategy(field, strategy)
+        return self._cached(
+            ("crosstab", field, by, strategy),
+            lambda: dict(sorted(self.store.group_count(field, by, strategy).items(), key=lambda kv: str(kv[0])))
+        )
+
+    def top_k(self, field: str, k: int = 10, strategy: Optional[str] = None) -> Dict[str, int]:
+        """数量最多的 k 个取值，按数量降序"""
+        distribution = self.distribution(field, strategy)
+        return self._cached(
+            ("top_k", field, k, self.store.resolve_strategy(field, strategy)),
+            lambda: dict(sorted(distribution.items(), key=lambda kv: kv[1], reverse=True)[:max(k, 0)])
+        )
+
+    def growth(self, field: Optional[str] = None, value: Optional[str] = None, date_field: str = "published") -> Dict[str, Dict]:
+        """
+        逐年数量与同比增长率。
+
+        - 不指定 field 时统计全部论文的年度数量
+        - 指定 field 与 value 时统计该字段取值为（或包含）value 的论文
+
+        论文覆盖的年份范围内没有论文的年份计为 0，增长率按连续年份计算。
+
+        Returns:
+            {年份: {"count": 数量, "growth_rate": 相比上一年的增长率（首年或上一年为 0 时为 None）}}
+        Raises:
+            ValueError: 指定了 field 但未指定 value
+        """
+        if field is not None and value is None:
+            raise ValueError(f"统计 {field} 的增长率需要指定取值 value")
+
+        def compute():
+            all_years = self.distribution(date_field, "year")
+            if field is None:
+                yearly = all_years
+            else:
+                yearly = {year: counts.get(value, 0) for year, counts in self.crosstab(field, date_field).items()}
+            years = [int(year) for year in list(all_years) + list(yearly)]
+            if not years:
+                return {}
+            result, previous = {}, None
+            for year in range(min(years), max(years) + 1):
+                count = yearly.get(str(year), 0)
+                rate = round((count - previous) / previous, 4) if previous else None
+                result[str(year)] = {"count": count, "growth_rate": rate}
+                previous = count
+            return result
+
+        return self._cached(("growth", field, value, date_field), compute)
@@ -0,0 +1,97 @@
+# fraud_research_agent/utils/paper_store.py
+import os
+import json
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    """逐行读取 JSONL 文件，跳过空行与中途崩溃留下的残缺行"""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def write_jsonl(path: str, records: Iterable[Dict]) -> None:
+    """原子地重写 JSONL 文件（先写临时文件再替换）"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
+
+
+def write_json(path: str, data) -> None:
+    """原子地写入 JSON 文件"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class RawPaperStore:
+    """
+    追加写入的原始论文存储。
+
+    - 论文以 JSONL 逐行追加，每次写入只付出本页/本窗口的开销
+    - 旁路 manifest（<path>.manifest.json）按查询词记录已完整抓取的时间区间，续抓时只需读取 manifest
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.manifest_path = path + ".manifest.json"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def append(self, records: Iterable[Dict]) -> None:
+        """追加写入一批论文"""
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+
+    def iter_records(self) -> Iterator[Dict]:
+        """按写入顺序遍历全部论文"""
+        return read_jsonl(self.path)
+
+    def load_manifest(self) -> Dict:
+        """读取 manifest，不存在时返回空结构"""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"coverage": {}}
+
+    def save_manifest(self, manifest: Dict) -> None:
+        """原子地保存 manifest"""
+        write_json(self.manifest_path, manifest)
+
+    def get_coverage(self, key: str) -> List[Tuple[datetime, datetime]]:
+        """获取某个查询词已完整抓取的时间区间（已排序、已合并）"""
+        intervals = self.load_manifest().get("coverage", {}).get(key, [])
+        return [(datetime.fromisoformat(start), datetime.fromisoformat(end)) for start, end in intervals]
+
+    def add_coverage(self, keys: Iterable[str], start: datetime, end: datetime) -> None:
+        """将 [start, end] 记入多个查询词的已抓取区间，并合并重叠区间"""
+        manifest = self.load_manifest()
+        coverage = manifest.setdefault("coverage", {})
+        for key in keys:
+            intervals = sorted(
+                [(datetime.fromisoformat(s), datetime.fromisoformat(e)) for s, e in coverage.get(key, [])]
+                + [(start, end)]
+            )
+            merged = [intervals[0]]
+            for interval_start, interval_end in intervals[1:]:
+                if interval_start <= merged[-1][1]:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], interval_end))
+                else:
+                    merged.append((interval_start, interval_end))
+            coverage[key] = [[s.isoformat(), e.isoformat()] for s, e in merged]
+        self.save_manifest(manifest)
@@ -0,0 +1,131 @@
+# fraud_research_agent/utils/prompt_compaction.py
+import re
+import json
+import threading
+from typing import Callable, Dict, Optional, Tuple
+from fraud_research_agent.config import settings
+from fraud_research_agent.utils.run_metrics import get_run_metrics
+
+# 各提示词中论文只保留的字段（作者、分类、链接、更新时间等对判断与提取没有帮助）
+PROMPT_PAPER_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "relevance": ("title", "abstract"),
+    "batch_relevance": ("title", "abstract"),
+    "single_pass": ("title", "abstract"),
+    "extraction": ("title", "abstract"),
+}
+
+_TRUNCATION_MARK = "…"
+
+# tiktoken 为可选依赖，且首次使用需下载编码文件；不可用时按 ASCII 约 4 字符/token、其他字符（中文等）约 1 字符/token 估算
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        if not _encoding_loaded:
+            _encoding_loaded = True
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding(settings.PROMPT_TOKENIZER_ENCODING)
+            except Exception as e:
+                print(f"⚠️ tiktoken 不可用，token 数改为按字符估算: {type(e).__name__}")
+                _encoding = None
+        return _encoding
+
+
+def _estimated_prefix_length(text: str, max_tokens: int) -> int:
+    """按估算规则返回不超过 max_tokens 个 token 的最长前缀长度（字符数）"""
+    budget = max_tokens * 4  # 以 1/4 token 为单位：ASCII 字符计 1，其他字符计 4
+    for index, char in enumerate(text):
+        budget -= 1 if char.isascii() else 4
+        if budget < 0:
+            return index
+    return len(text)
+
+
+def count_tokens(text: str) -> int:
+    """统计文本的 token 数（tiktoken 不可用时按字符类别估算，非 ASCII 字符各计 1 个 token）"""
+    encoding = _get_encoding()
+    if encoding is None:
+        if text.isascii():
+            return (len(text) + 3) // 4
+        non_ascii = sum(1 for char in text if not char.isascii())
+        return (len(text) - non_ascii + 3) // 4 + non_ascii
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> Tuple[str, bool]:
+    """
+    将文本截断到 max_tokens 个 token 以内，尽量在句子或单词边界处截断。
+
+    Returns:
+        (截断后的文本, 是否发生截断)
+    """
+    if max_tokens <= 0:
+        return text, False
+    encoding = _get_encoding()
+    if encoding is None:
+        length = _estimated_prefix_length(text, max_tokens)
+        if length >= len(text):
+            return text, False
+        head = text[:length]
+    else:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text, False
+        head = encoding.decode(tokens[:max_tokens])
+
+    # 截断点之前最近的句号；句子过短时退回到单词边界
+    sentence_end = head.rfind(". ")
+    if sentence_end >= len(head) // 2:
+        return head[:sentence_end + 1] + " " + _TRUNCATION_MARK, True
+    word_end = head.rfind(" ")
+    if word_end > 0:
+        head = head[:word_end]
+    return head + _TRUNCATION_MARK, True
+
+
+def compact_paper(paper: Dict, prompt_name: str = "extraction") -> Tuple[str, bool]:
+    """
+    按提示词的字段白名单将论文压缩为紧凑 JSON：去掉多余空白，摘要超出 token 预算时截断。
+
+    Returns:
+        (紧凑 JSON 字符串, 摘要是否被截断)
+    """
+    fields = PROMPT_PAPER_FIELDS.get(prompt_name, ("title", "abstract"))
+    compact = {field: " ".join(str(paper.get(field, "")).split()) for field in fields}
+    truncated = False
+    if settings.PROMPT_COMPACTION and "abstract" in compact:
+        budget = settings.PROMPT_ABSTRACT_TOKENS.get(prompt_name, 0)
+        compact["abstract"], truncated = truncate_to_tokens(compact["abstract"], budget)
+    return json.dumps(compact, ensure_ascii=False, separators=(",", ":")), truncated
+
+
+def minimize_whitespace(text: str) -> str:
+    """去掉每行的缩进与行内连续空白，合并连续空行"""
+    lines = [re.sub(r"[ \t]+", " ", line).strip() for line in text.strip().splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines))
+
+
+def finalize_prompt(prompt_name: str, text: str, baseline: Optional[Callable[[], str]] = None,
+                    truncated: int = 0) -> str:
+    """
+    提示词最终处理：压缩空白并记录 token 数。
+
+    Args:
+        prompt_name: 提示词名称，用于按提示词汇总 token 数
+        text: 已填充的提示词
+        baseline: 返回未压缩提示词的函数（整篇论文缩进 JSON），用于统计节省的 token
+        truncated: 本提示词中摘要被截断的论文数
+    Returns:
+        最终发送给 LLM 的提示词
+    """
+    if settings.PROMPT_COMPACTION:
+        text = minimize_whitespace(text)
+    if settings.PROMPT_TOKEN_REPORT:
+        baseline_tokens = count_tokens(baseline()) if baseline is not None else None
+        get_run_metrics().record_prompt(prompt_name, count_tokens(text), baseline_tokens, truncated)
+    return text
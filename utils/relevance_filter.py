@@ -0,0 +1,160 @@
+# fraud_research_agent/utils/relevance_filter.py
+import re
+import math
+import threading
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import numpy as np
+from fraud_research_agent.config import settings
+from fraud_research_agent.utils.embedding_utils import SentenceTransformerEmbedder, get_embedder
+
+# 判定结果：低于低阈值直接丢弃，高于高阈值直接判为相关，其余交给 LLM
+DROP, AMBIGUOUS, ACCEPT = -1, 0, 1
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were which with "
+    "we our us can via using based into than their these those such also been not but".split()
+)
+
+
+def _tokenize(text: str) -> List[str]:
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+def paper_text(paper: Dict) -> str:
+    """用于相关性打分的论文文本：标题 + 摘要"""
+    return f"{paper.get('title', '')} {paper.get('abstract', '')}"
+
+
+class TfidfScorer:
+    """
+    无需模型的 TF-IDF 余弦打分，每批论文的打分通过 numpy 一次完成。
+
+    IDF 在打分前一次性计算（fit），之后固定不变：同一篇论文无论落在哪一批，分数都相同，
+    才能与固定阈值比较。未调用 fit 时以第一批论文计算 IDF。
+    """
+
+    def __init__(self):
+        self.doc_freq: Counter = Counter()
+        self.n_docs = 0
+        self._fitted = False
+        self._lock = threading.Lock()
+
+    def fit(self, texts: Iterable[str]) -> None:
+        """以候选论文全集（或固定的参考语料）计算文档频率"""
+        doc_freq, n_docs = Counter(), 0
+        for text in texts:
+            doc_freq.update(set(_tokenize(text)))
+            n_docs += 1
+        with self._lock:
+            self.doc_freq, self.n_docs, self._fitted = doc_freq, n_docs, True
+
+    def score(self, topic: str, texts: List[str]) -> np.ndarray:
+        docs = [_tokenize(text) for text in texts]
+        with self._lock:
+            if not self._fitted:
+                for tokens in docs:
+                    self.doc_freq.update(set(tokens))
+                self.n_docs += len(docs)
+                self._fitted = True
+            vocab = {}
+            for token in _tokenize(topic):
+                vocab.setdefault(token, len(vocab))
+            doc_ids, term_ids = [], []
+            for row, tokens in enumerate(docs):
+                for token in tokens:
+                    doc_ids.append(row)
+                    term_ids.append(vocab.setdefault(token, len(vocab)))
+            terms = list(vocab)
+            idf = np.asarray(
+                [math.log((1 + self.n_docs) / (1 + self.doc_freq[t])) + 1 for t in terms],
+                dtype=np.float64
+            )
+
+        n_terms = len(terms)
+        topic_counts = np.bincount([vocab[t] for t in _tokenize(topic)], minlength=n_terms).astype(np.float64)
+        topic_weights = np.where(topic_counts > 0, 1 + np.log(np.maximum(topic_counts, 1)), 0) * idf
+        topic_norm = np.linalg.norm(topic_weights)
+        if not doc_ids or topic_norm == 0:
+            return np.zeros(len(texts))
+
+        # (文档, 词) 组合计数得到词频，次线性 tf * idf 加权后按文档聚合出点积与范数
+        pairs, counts = np.unique(
+            np.asarray(doc_ids, dtype=np.int64) * n_terms + np.asarray(term_ids, dtype=np.int64),
+            return_counts=True
+        )
+        rows, cols = np.divmod(pairs, n_terms)
+        weights = (1 + np.log(counts)) * idf[cols]
+        dots = np.bincount(rows, weights=weights * topic_weights[cols], minlength=len(texts))
+        norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=len(texts)))
+        norms[norms == 0] = 1.0
+        return dots / (norms * topic_norm)
+
+
+class EmbeddingScorer:
+    """基于本地向量模型的余弦打分（主题向量只计算一次）"""
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self._topic_vectors: Dict[str, np.ndarray] = {}
+
+    def score(self, topic: str, texts: List[str]) -> np.ndarray:
+        if topic not in self._topic_vectors:
+            self._topic_vectors[topic] = self.embedder.embed([topic])[0]
+        return self.embedder.embed(texts) @ self._topic_vectors[topic]
+
+
+class RelevancePreFilter:
+    """
+    LLM 相关性判断前的本地语义预筛选。
+
+    对主题与论文标题/摘要按批打分（配置了本地向量模型时用向量余弦，否则用 TF-IDF 余弦），
+    低于 low 的论文直接判为不相关，高于 high 的直接判为相关，只有中间地带交给 LLM。
+    """
+
+    def __init__(self, low: Optional[float] = None, high: Optional[float] = None, chunk_size: Optional[int] = None):
+        self.low = settings.RELEVANCE_LOW_THRESHOLD if low is None else low
+        self.high = settings.RELEVANCE_HIGH_THRESHOLD if high is None else high
+        self.chunk_size = max(1, settings.RELEVANCE_PREFILTER_CHUNK_SIZE if chunk_size is None else chunk_size)
+        embedder = get_embedder()
+        if isinstance(embedder, SentenceTransformerEmbedder):
+            self.scorer = EmbeddingScorer(embedder)
+        else:
+            self.scorer = TfidfScorer()
+        self.counts = Counter()
+        # 被预筛选直接丢弃的论文 id：台账中单独标记，下次运行重新筛选而不是当作 LLM 的最终判定
+        self.dropped: Set[str] = set()
+
+    def fit(self, papers: Iterable[Dict]) -> None:
+        """以候选论文全集计算 TF-IDF 的文档频率（向量打分无需拟合）"""
+        if isinstance(self.scorer, TfidfScorer):
+            self.scorer.fit(paper_text(paper) for paper in papers)
+
+    def screen(self, query: str, papers: Iterable[Dict]) -> Iterator[Tuple[Dict, int]]:
+        """
+        按输入顺序逐篇产出 (论文, 判定)，判定为 DROP / AMBIGUOUS / ACCEPT。
+        论文按 chunk_size 分批打分，流式输入时最多攒一批。
+
+        输入为列表时先以全部论文计算 IDF；流式输入无法预知全集，以第一批论文计算（之后固定）。
+        """
+        if isinstance(papers, (list, tuple)):
+            self.fit(papers)
+        papers = iter(papers)
+        while True:
+            chunk = list(islice(papers, self.chunk_size))
+            if not chunk:
+                break
+            scores = self.scorer.score(query, [paper_text(paper) for paper in chunk])
+            verdicts = np.where(scores < self.low, DROP, np.where(scores >= self.high, ACCEPT, AMBIGUOUS))
+            for paper, verdict in zip(chunk, verdicts.tolist()):
+                self.counts[verdict] += 1
+                if verdict == DROP:
+                    self.dropped.add(paper.get("id"))
+                yield paper, verdict
+
+    def summary(self) -> str:
+        return (
+            f"直接丢弃 {self.counts[DROP]} 篇，直接判为相关 {self.counts[ACCEPT]} 篇，"
+            f"交给 LLM 判断 {self.counts[AMBIGUOUS]} 篇"
+        )
@@ -0,0 +1,337 @@
+# fraud_research_agent/utils/run_metrics.py
+import time
+import uuid
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from langchain_core.callbacks import BaseCallbackHandler
+from fraud_research_agent.config import settings
+from fraud_research_agent.utils.llm_cache import get_llm_cache
+from fraud_research_agent.utils.paper_store import write_json
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+
+# 当前上下文所在的 span，用于记录父子关系
+_current_span_id: ContextVar[Optional[str]] = ContextVar("current_span_id", default=None)
+
+
+class RunMetrics:
+    """
+    一次运行的结构化指标（线程安全）：
+
+    - stages: 各阶段的耗时、调用次数、输入/输出论文数
+    - llm: LLM 调用次数、缓存命中、错误、重试、耗时与 token 数（llm_governor 为调度器的并发上限、限流与熔断计数）
+    - arxiv: arXiv 窗口抓取次数、耗时、论文数、重试与不完整窗口数
+    - batch: 批量 API 模式的请求数、失败回退数与 token 数
+    - prompts: 按提示词统计的 token 数、未压缩时的 token 数与摘要截断次数
+    - latency_percentiles: LLM 与 arXiv 单次调用耗时的 p50/p90/p99
+    - 开启 tracemalloc 时，各阶段记录 Python 堆内存峰值 peak_memory_mb
+    - spans: 可选的 OpenTelemetry 风格 span 记录（安装了 opentelemetry 时同时上报给其 tracer）
+    """
+
+    def __init__(self, name: str = "run", record_spans: Optional[bool] = None):
+        self.name = name
+        self.run_id = uuid.uuid4().hex
+        self.started_at = time.time()
+        self.record_spans = settings.RUN_METRICS_SPANS if record_spans is None else record_spans
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.llm = {
+            "calls": 0, "cached": 0, "errors": 0, "retries": 0,
+            "latency_seconds": 0.0, "input_tokens": 0, "output_tokens": 0
+        }
+        self.arxiv = {"calls": 0, "latency_seconds": 0.0, "papers": 0, "retries": 0, "incomplete": 0}
+        self.batch = {"requests": 0, "failed": 0, "input_tokens": 0, "output_tokens": 0}
+        self.prompts: Dict[str, Dict[str, int]] = {}
+        # 单次调用耗时样本，用于计算分位数（缓存命中不计入 LLM 样本）
+        self.latencies: Dict[str, List[float]] = {"llm": [], "arxiv": []}
+        self._open_stages: List[Dict[str, Any]] = []
+        self.spans: List[Dict[str, Any]] = []
+        self.dropped_spans = 0
+        self._lock = threading.Lock()
+        self._tracer = otel_trace.get_tracer("fraud_research_agent") if otel_trace and self.record_spans else None
+
+    # ---------- span ----------
+    def record_span(self, name: str, start: float, end: float, attributes: Optional[Dict] = None,
+                    parent_id: Optional[str] = None, status: str = "ok", span_id: Optional[str] = None) -> None:
+        """记录一个已结束的 span"""
+        if not self.record_spans:
+            return
+        span = {
+            "trace_id": self.run_id,
+            "span_id": span_id or uuid.uuid4().hex[:16],
+            "parent_id": parent_id,
+            "name": name,
+            "start": start,
+            "end": end,
+            "duration_seconds": round(end - start, 6),
+            "status": status,
+            "attributes": attributes or {},
+        }
+        with self._lock:
+            if len(self.spans) < settings.RUN_METRICS_MAX_SPANS:
+                self.spans.append(span)
+            else:
+                self.dropped_spans += 1
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """计时并记录一个 span；嵌套调用时自动记录父 span"""
+        span_id = uuid.uuid4().hex[:16]
+        parent_id = _current_span_id.get()
+        token = _current_span_id.set(span_id)
+        otel_cm = self._tracer.start_as_current_span(name, attributes=attributes) if self._tracer else None
+        if otel_cm is not None:
+            otel_cm.__enter__()
+        start = time.time()
+        status = "ok"
+        exc_info = (None, None, None)
+        try:
+            yield attributes
+        except BaseException as e:
+            status = "error"
+            exc_info = (type(e), e, e.__traceback__)
+            raise
+        finally:
+            end = time.time()
+            if otel_cm is not None:
+                # 传入异常信息，OpenTelemetry 据此记录异常并将 span 状态置为 ERROR
+                otel_cm.__exit__(*exc_info)
+            _current_span_id.reset(token)
+            self.record_span(name, start, end, attributes, parent_id, status, span_id)
+
+    # ---------- stage ----------
+    def _sample_memory(self) -> None:
+        """将上次采样以来的内存峰值计入所有未结束的阶段，然后重置峰值（需已开启 tracemalloc）"""
+        if not tracemalloc.is_tracing():
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        for open_stage in self._open_stages:
+            open_stage["peak"] = max(open_stage["peak"], peak)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def stage(self, name: str, papers_in: Optional[int] = None):
+        """
+        统计一个流水线阶段。with 块内可设置 info["papers_out"]、info["papers_in"] 等数值计数。
+        """
+        info: Dict[str, Any] = {"papers_in": papers_in, "papers_out": None}
+        memory = {"peak": 0}
+        with self._lock:
+            self._sample_memory()
+            self._open_stages.append(memory)
+        start = time.time()
+        try:
+            with self.span(f"stage.{name}") as attributes:
+                yield info
+                attributes.update({k: v for k, v in info.items() if v is not None})
+        finally:
+            elapsed = time.time() - start
+            with self._lock:
+                self._sample_memory()
+                self._open_stages = [open_stage for open_stage in self._open_stages if open_stage is not memory]
+                record = self.stages.setdefault(
+                    name, {"calls": 0, "wall_time_seconds": 0.0, "papers_in": 0, "papers_out": 0}
+                )
+                record["calls"] += 1
+                record["wall_time_seconds"] += elapsed
+                # papers_in/papers_out 及其他数值型计数（如 reused）按调用累加
+                for key, value in info.items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        record[key] = record.get(key, 0) + value
+                if tracemalloc.is_tracing():
+                    peak_mb = round(memory["peak"] / 1024 / 1024, 2)
+                    record["peak_memory_mb"] = max(record.get("peak_memory_mb", 0), peak_mb)
+
+    # ---------- 调用记录 ----------
+    def record_llm_call(self, latency: float, input_tokens: int = 0, output_tokens: int = 0,
+                        cached: bool = False, error: bool = False) -> None:
+        with self._lock:
+            self.llm["calls"] += 1
+            self.llm["latency_seconds"] += latency
+            self.llm["input_tokens"] += input_tokens
+            self.llm["output_tokens"] += output_tokens
+            self.llm["cached"] += int(cached)
+            self.llm["errors"] += int(error)
+            if not cached:
+                self.latencies["llm"].append(latency)
+
+    def record_llm_retry(self, count: int = 1) -> None:
+        with self._lock:
+            self.llm["retries"] += count
+
+    def record_arxiv_call(self, latency: float, papers: int, retries: int, complete: bool) -> None:
+        with self._lock:
+            self.arxiv["calls"] += 1
+            self.arxiv["latency_seconds"] += latency
+            self.arxiv["papers"] += papers
+            self.arxiv["retries"] += retries
+            self.arxiv["incomplete"] += int(not complete)
+            self.latencies["arxiv"].append(latency)
+
+    def record_batch(self, requests: int, failed: int, input_tokens: int, output_tokens: int) -> None:
+        with self._lock:
+            self.batch["requests"] += requests
+            self.batch["failed"] += failed
+            self.batch["input_tokens"] += input_tokens
+            self.batch["output_tokens"] += output_tokens
+
+    def record_prompt(self, name: str, tokens: int, baseline_tokens: Optional[int] = None, truncated: int = 0) -> None:
+        with self._lock:
+            record = self.prompts.setdefault(name, {"count": 0, "tokens": 0, "baseline_tokens": 0, "truncated": 0})
+            record["count"] += 1
+            record["tokens"] += tokens
+            record["baseline_tokens"] += tokens if baseline_tokens is None else baseline_tokens
+            record["truncated"] += truncated
+
+    # ---------- 汇总 ----------
+    def summary(self) -> Dict[str, Any]:
+        """机器可读的运行汇总"""
+        with self._lock:
+            stages = {name: dict(record) for name, record in self.stages.items()}
+            llm = dict(self.llm)
+            arxiv = dict(self.arxiv)
+            batch = dict(self.batch)
+            prompts = {name: dict(record) for name, record in self.prompts.items()}
+            spans = list(self.spans)
+            dropped_spans = self.dropped_spans
+            latencies = {kind: sorted(samples) for kind, samples in self.latencies.items()}
+
+        for record in stages.values():
+            record["wall_time_seconds"] = round(record["wall_time_seconds"], 3)
+        llm["latency_seconds"] = round(llm["latency_seconds"], 3)
+        arxiv["latency_seconds"] = round(arxiv["latency_seconds"], 3)
+        uncached = llm["calls"] - llm["cached"]
+        llm["avg_latency_seconds"] = round(llm["latency_seconds"] / uncached, 3) if uncached else None
+
+        for record in prompts.values():
+            record["avg_tokens"] = round(record["tokens"] / record["count"], 1)
+            record["saved_ratio"] = (
+                round(1 - record["tokens"] / record["baseline_tokens"], 4) if record["baseline_tokens"] else None
+            )
+
+        # 单篇成本：以信息提取阶段的输入论文数为分母，便于跨版本比较
+        papers = stages.get("extraction", {}).get("papers_in", 0)
+        per_paper = None
+        if papers:
+            per_paper = {
+                "llm_calls": round(llm["calls"] / papers, 4),
+                "input_tokens": round(llm["input_tokens"] / papers, 2),
+                "output_tokens": round(llm["output_tokens"] / papers, 2),
+            }
+
+        # llm_governor 依赖本模块记录重试，在此处再导入以避免循环导入
+        from fraud_research_agent.utils.llm_governor import get_llm_governor
+
+        summary = {
+            "run_id": self.run_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "wall_time_seconds": round(time.time() - self.started_at, 3),
+            "stages": stages,
+            "llm": llm,
+            "llm_cache": get_llm_cache().stats(),
+            "llm_governor": get_llm_governor().stats(),
+            "arxiv": arxiv,
+            "batch": batch,
+            "prompts": prompts,
+            "latency_percentiles": {kind: percentiles(samples) for kind, samples in latencies.items()},
+            "per_paper": per_paper,
+        }
+        if self.record_spans:
+            summary["spans"] = spans
+            summary["dropped_spans"] = dropped_spans
+        return summary
+
+    def write(self, path: Optional[str] = None) -> str:
+        """将汇总写入 JSON 文件并返回路径"""
+        path = path or settings.RUN_METRICS_PATH
+        write_json(path, self.summary())
+        return path
+
+
+def percentiles(samples: List[float], points=(50, 90, 99)) -> Optional[Dict[str, float]]:
+    """计算已排序样本的分位数（最近秩法），样本为空时返回 None"""
+    if not samples:
+        return None
+    return {
+        f"p{p}": round(samples[min(len(samples) - 1, max(0, -(-p * len(samples) // 100) - 1))], 4)
+        for p in points
+    }
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """LangChain 回调：记录每次 LLM 调用的耗时、token 数与缓存命中，写入当前运行的指标"""
+
+    def __init__(self):
+        self._starts: Dict[uuid.UUID, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _on_start(self, serialized, run_id, parent_run_id):
+        name = (serialized or {}).get("name") or "llm"
+        with self._lock:
+            self._starts[run_id] = (time.time(), name)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        self._on_start(serialized, run_id, parent_run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._on_start(serialized, run_id, parent_run_id)
+
+    def _pop_start(self, run_id):
+        with self._lock:
+            return self._starts.pop(run_id, (time.time(), "llm"))
+
+    def on_llm_end(self, response, *, run_id, parent_run_id=None, **kwargs):
+        start, name = self._pop_start(run_id)
+        end = time.time()
+        # 命中响应缓存时没有真实请求，不计 token
+        cached = get_llm_cache().pop_lookup_hit()
+        input_tokens = output_tokens = 0
+        if not cached:
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+            if not input_tokens and not output_tokens:
+                token_usage = (response.llm_output or {}).get("token_usage") or {}
+                input_tokens = token_usage.get("prompt_tokens", 0)
+                output_tokens = token_usage.get("completion_tokens", 0)
+
+        metrics = get_run_metrics()
+        metrics.record_llm_call(end - start, input_tokens, output_tokens, cached=cached)
+        metrics.record_span(f"llm.{name}", start, end, {
+            "cached": cached, "input_tokens": input_tokens, "output_tokens": output_tokens
+        })
+
+    def on_llm_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        start, name = self._pop_start(run_id)
+        end = time.time()
+        metrics = get_run_metrics()
+        metrics.record_llm_call(end - start, error=True)
+        metrics.record_span(f"llm.{name}", start, end, {"error": repr(error)}, status="error")
+
+
+# 当前上下文所属运行的指标；与报告会话一样通过 contextvars 隔离，同一进程中并发的多次运行互不覆盖。
+# 线程池中的任务需经 ContextThreadPoolExecutor 提交才能继承提交方的运行。未开始运行时使用默认指标
+_current_run: ContextVar[Optional[RunMetrics]] = ContextVar("run_metrics", default=None)
+_default_run = RunMetrics()
+
+
+def start_run(name: str = "run") -> RunMetrics:
+    """在当前上下文开始一次新的运行指标统计"""
+    metrics = RunMetrics(name)
+    _current_run.set(metrics)
+    return metrics
+
+
+def get_run_metrics() -> RunMetrics:
+    """获取当前上下文所属运行的指标"""
+    metrics = _current_run.get()
+    return metrics if metrics is not None else _default_run
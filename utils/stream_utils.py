@@ -0,0 +1,61 @@
+# fraud_research_agent/utils/stream_utils.py
+import queue
+import threading
+import contextvars
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_END = object()
+
+
+def bounded_prefetch(iterable: Iterable[T], maxsize: int) -> Iterator[T]:
+    """
+    在后台线程中迭代 iterable，并通过有界队列把元素交给调用方。
+
+    生产者（如 arXiv 抓取）与消费者（如论文分类）并行推进；
+    队列满时生产者阻塞，内存占用以 maxsize 为上限。生产者抛出的异常会在消费端重新抛出；
+    消费端提前停止时生产者随之退出，并关闭源迭代器。
+    """
+    buffer = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+
+    def _put(item) -> bool:
+        """放入队列；消费端已停止时放弃并返回 False，避免队列满时生产者永久阻塞"""
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce():
+        iterator = None
+        try:
+            iterator = iter(iterable)
+            for item in iterator:
+                if not _put(item):
+                    return
+            _put(_END)
+        except BaseException as e:
+            _put(e)
+        finally:
+            # 关闭源生成器，使其 finally / with 块（如抓取线程池）得以清理
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    # 生产者在调用方的上下文中运行，抓取时记录的运行指标归属于当前运行
+    producer = threading.Thread(target=contextvars.copy_context().run, args=(_produce,), daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
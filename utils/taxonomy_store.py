@@ -0,0 +1,93 @@
+# fraud_research_agent/utils/taxonomy_store.py
+import os
+import json
+from typing import Dict, List, Optional, Tuple
+from fraud_research_agent.config import settings
+from fraud_research_agent.utils.embedding_utils import get_embedder, nearest_neighbors
+from fraud_research_agent.utils.paper_store import write_json
+
+
+def _normalize(value) -> str:
+    return " ".join(str(value).lower().split())
+
+
+class TaxonomyStore:
+    """
+    单个字段的持久化类别体系：{"categories": [...], "mapping": {原始值: 类别}}。
+
+    解析新取值时依次尝试：
+    1. 精确匹配（忽略大小写与多余空白）已见过的原始值或类别名
+    2. 本地向量索引（类别名与已见原始值的向量）最近邻，相似度不低于阈值时采用其类别
+    其余取值交给 LLM 映射，结果再写回存储，使类别标签在多次运行之间保持稳定。
+    """
+
+    def __init__(self, field: str, store_dir: Optional[str] = None):
+        if store_dir is None:
+            store_dir = os.path.join(settings.DATA_DIR, 'processed', 'taxonomy')
+        os.makedirs(store_dir, exist_ok=True)
+        self.field = field
+        self.path = os.path.join(store_dir, f"{field}.json")
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        self.categories: List[str] = data.get("categories", [])
+        self.mapping: Dict[str, str] = data.get("mapping", {})
+        self._index = None
+
+    def _build_index(self):
+        """构建向量索引：每个类别名及已见原始值各占一行，指向对应类别"""
+        keys = list(self.categories) + list(self.mapping)
+        targets = list(self.categories) + list(self.mapping.values())
+        vectors = get_embedder().embed(keys) if keys else None
+        self._index = (vectors, targets)
+
+    def resolve(self, values: List, threshold: Optional[float] = None) -> Tuple[Dict, List]:
+        """
+        用已有类别体系解析取值。
+
+        Returns:
+            ({原始值: 类别} 已解析部分, 未解析的取值列表)
+        """
+        if threshold is None:
+            threshold = settings.TAXONOMY_SIMILARITY_THRESHOLD
+
+        exact = {_normalize(k): v for k, v in self.mapping.items()}
+        exact.update({_normalize(c): c for c in self.categories})
+
+        resolved, pending = {}, []
+        for value in values:
+            category = exact.get(_normalize(value))
+            if category is not None:
+                resolved[value] = category
+            else:
+                pending.append(value)
+
+        if not pending or not exact:
+            return resolved, pending
+
+        if self._index is None:
+            self._build_index()
+        vectors, targets = self._index
+        result = nearest_neighbors(get_embedder().embed([str(v) for v in pending]), vectors)
+        if result is None:
+            return resolved, pending
+
+        unresolved = []
+        for value, best, score in zip(pending, *result):
+            if score >= threshold:
+                resolved[value] = targets[best]
+            else:
+                unresolved.append(value)
+        return resolved, unresolved
+
+    def update(self, mapping: Dict) -> None:
+        """合并新的映射与类别并持久化"""
+        for value, category in mapping.items():
+            self.mapping[str(value)] = category
+            if category not in self.categories:
+                self.categories.append(category)
+        self._index = None
+        write_json(self.path, {"categories": self.categories, "mapping": self.mapping})